@@ -0,0 +1,139 @@
+"""
+Benchmark: per-row vs. vectorized CSV cleaning in mining.ingest.
+
+Writes a messy synthetic transactions CSV (mixed case, extra whitespace,
+duplicates, invalid products, empty and single-item rows), imports it with
+both pipelines, checks that the store contents and report counters are
+identical and prints the speedup, both for the cleaning stage alone (on
+chunks already parsed by pandas) and for the whole import. The imported
+store is also saved, reopened memory-mapped and saved over its own file
+to check that the binary format round-trips.
+
+The target is a speedup of at least MIN_CLEANING_SPEEDUP (10x) for the
+cleaning stage, which is what the vectorized pipeline replaces; the full
+import also includes pandas' CSV parsing, which both pipelines share. The
+script exits with status 1 if the results differ or the cleaning speedup
+is below the target.
+
+    python benchmarks/bench_ingest.py --rows 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mining import datafile, ingest  # noqa: E402
+from mining.store import TransactionStore  # noqa: E402
+
+# Required speedup of the vectorized cleaning stage over the per-row loop
+MIN_CLEANING_SPEEDUP = 10
+
+PRODUCTS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             'data', 'products.csv')
+
+
+def write_messy_csv(path, rows, products, seed=0):
+    """Writes `rows` transactions shaped like a raw POS export."""
+    rng = random.Random(seed)
+    invalid = ['unknown item', 'gift card', 'bag']
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('transaction_id,items\n')
+        for t_id in range(1, rows + 1):
+            roll = rng.random()
+            if roll < 0.05:
+                items = []
+            elif roll < 0.10:
+                items = [rng.choice(products)]
+            else:
+                items = rng.sample(products, rng.randint(2, 7))
+                if rng.random() < 0.1:
+                    items.append(items[0].upper())
+                if rng.random() < 0.05:
+                    items.append(rng.choice(invalid))
+            items = [f'  {item} ' if rng.random() < 0.1 else item.title() if rng.random() < 0.2 else item
+                     for item in items]
+            f.write(f'{t_id},"{",".join(items)}"\n')
+
+
+def timed_import(path, valid_products, vectorized):
+    store = TransactionStore()
+    start = time.perf_counter()
+    stats, _ = ingest.import_csv(path, store, valid_products, vectorized=vectorized)
+    return time.perf_counter() - start, stats, store
+
+
+def timed_cleaning(chunks, valid_products, vectorized):
+    clean_chunk = ingest.clean_chunk_vectorized if vectorized else ingest.clean_transactions
+    store = TransactionStore()
+    stats = ingest.ImportStats()
+    next_id = 1
+    start = time.perf_counter()
+    for df_items in chunks:
+        next_id = clean_chunk(df_items, ',', valid_products, store, next_id, stats)
+    return time.perf_counter() - start, stats, store
+
+
+def same_results(a, b, compare_stats=True):
+    (_, stats_a, store_a), (_, stats_b, store_b) = a, b
+    same_counters = not compare_stats or (stats_a.report_args() == stats_b.report_args()
+                                          and stats_a.errors == stats_b.errors)
+    same_store = (list(store_a.ids) == list(store_b.ids)
+                  and all(sorted(store_a.transaction(r)[1]) == sorted(store_b.transaction(r)[1])
+                          for r in range(len(store_a))))
+    return same_counters and same_store
+
+
+def same_after_resave(store, path):
+    """Saves `store`, reopens it memory-mapped and saves it over its own file."""
+    datafile.save_store(store, path)
+    mapped = datafile.open_store(path)
+    datafile.save_store(mapped, path)
+    reopened = datafile.open_store(path, mmap=False)
+    del mapped
+    return same_results((0, None, store), (0, None, reopened), compare_stats=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    valid_products = ingest.read_valid_products(PRODUCTS_FILE)
+    products = sorted(valid_products)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'transactions.csv')
+        write_messy_csv(path, args.rows, products)
+        print(f"Input: {args.rows:,} rows, {os.path.getsize(path) / 2**20:.1f} MB")
+
+        chunks = list(ingest.iter_csv_chunks(path))
+        clean_loop = timed_cleaning(chunks, valid_products, vectorized=False)
+        clean_vec = timed_cleaning(chunks, valid_products, vectorized=True)
+        del chunks
+
+        import_loop = timed_import(path, valid_products, vectorized=False)
+        import_vec = timed_import(path, valid_products, vectorized=True)
+        round_trip = same_after_resave(import_vec[2], os.path.join(tmp, 'transactions' + datafile.FILE_EXTENSION))
+
+    identical = same_results(clean_loop, clean_vec) and same_results(import_loop, import_vec)
+    cleaning_speedup = clean_loop[0] / clean_vec[0]
+
+    print(f"{'':14}{'per-row':>10}{'vectorized':>12}{'speedup':>10}")
+    for label, loop, vec in (('Cleaning', clean_loop, clean_vec), ('Full import', import_loop, import_vec)):
+        print(f"{label:14}{loop[0]:>9.2f}s{vec[0]:>11.2f}s{loop[0] / vec[0]:>9.1f}x")
+    print(f"Counters: {import_vec[1].report_args()}")
+    print(f"Store contents and counters identical: {identical}")
+    print(f"Store file round-trips after saving over itself: {round_trip}")
+    print(f"Cleaning speedup {cleaning_speedup:.1f}x (target: at least {MIN_CLEANING_SPEEDUP}x)")
+
+    if not (identical and round_trip and cleaning_speedup >= MIN_CLEANING_SPEEDUP):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+"""
+Benchmark: every mining algorithm and backend on a synthetic IBM-Quest-style
+dataset (mining.synthetic).
+
+Each configuration is run `--warmups` times untimed, then `--repeats` times
+timed with time.perf_counter(). One more run under tracemalloc records the
+peak memory allocated while mining, which also covers NumPy buffers. It is
+a separate run because tracing slows the code down. Every configuration must
+find the same itemsets and rules, or the benchmark exits with status 1.
+
+Results are printed as a table and can be written to JSON (one file per
+run, with the environment and dataset) or appended to a CSV (one row per
+configuration and run) to track them over time. With --baseline, timings
+are compared with an earlier JSON file, and the run fails when a
+configuration got slower than --tolerance allows.
+
+    python benchmarks/bench_mining.py --transactions 100000 --support 0.005 \\
+        --json results.json --csv history.csv
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from mining.engine import run_algorithm  # noqa: E402
+from mining.synthetic import quest_store  # noqa: E402
+
+# Label -> (algorithm, options) for every backend combination
+CONFIGS = {
+    'Apriori/tidset': ('Apriori', {'backend': 'tidset'}),
+    'Apriori/bitset': ('Apriori', {'backend': 'bitset'}),
+    'Apriori/hashtree': ('Apriori', {'backend': 'hashtree'}),
+    'Eclat/tidset': ('Eclat', {'backend': 'tidset', 'diffsets': False}),
+    'Eclat/diffsets': ('Eclat', {'backend': 'tidset', 'diffsets': True}),
+    'Eclat/auto': ('Eclat', {'backend': 'tidset', 'diffsets': 'auto'}),
+    'Eclat/bitset': ('Eclat', {'backend': 'bitset'}),
+    'FP-Growth': ('FP-Growth', {}),
+}
+
+CSV_FIELDS = ['timestamp', 'commit', 'config', 'transactions', 'avg_length', 'items', 'pattern_length',
+              'skew', 'seed', 'support', 'confidence', 'repeats', 'time_min_ms', 'time_median_ms',
+              'time_mean_ms', 'peak_memory_mb', 'itemsets', 'rules']
+
+
+def git_commit():
+    """Short hash of the checked-out commit, or None outside a git work tree."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_config(store, algorithm, options, support, confidence, warmups, repeats):
+    """Times one configuration and returns its result row (without dataset fields)."""
+    for _ in range(warmups):
+        run_algorithm(algorithm, store, support, confidence, **options)
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        frequent_itemsets, rules, _ = run_algorithm(algorithm, store, support, confidence, **options)
+        times.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    try:
+        run_algorithm(algorithm, store, support, confidence, **options)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'time_min_ms': round(min(times), 2),
+        'time_median_ms': round(statistics.median(times), 2),
+        'time_mean_ms': round(statistics.mean(times), 2),
+        'times_ms': [round(t, 2) for t in times],
+        'peak_memory_mb': round(peak / 2**20, 2),
+        'itemsets': len(frequent_itemsets),
+        'rules': len(rules),
+    }, frequent_itemsets, {(rule['antecedents'], rule['consequents']) for rule in rules}
+
+
+def write_csv(path, report):
+    """Appends one row per configuration, writing the header if the file is new."""
+    new_file = not os.path.exists(path) or not os.path.getsize(path)
+    dataset, params = report['dataset'], report['parameters']
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        if new_file:
+            writer.writeheader()
+        for result in report['results']:
+            writer.writerow({'timestamp': report['timestamp'], 'commit': report['environment']['commit'],
+                             'transactions': dataset['n_transactions'], 'avg_length': dataset['avg_length'],
+                             'items': dataset['n_items'], 'pattern_length': dataset['avg_pattern_length'],
+                             'skew': dataset['skew'], 'seed': dataset['seed'], **params, **result})
+
+
+def compare(report, baseline_path, tolerance):
+    """Prints median-time ratios against a baseline JSON report; returns the configs that regressed."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline_report = json.load(f)
+    baseline = {result['config']: result for result in baseline_report['results']}
+
+    regressed = []
+    print(f"\nAgainst {baseline_path} (tolerance {tolerance:.0%}):")
+    if (baseline_report['dataset'], baseline_report['parameters']) != (report['dataset'], report['parameters']):
+        print("  Warning: the baseline used a different dataset or parameters")
+    for result in report['results']:
+        before = baseline.get(result['config'])
+        if before is None:
+            continue
+        ratio = result['time_median_ms'] / max(before['time_median_ms'], 1e-9)
+        flag = ''
+        if ratio > 1 + tolerance:
+            regressed.append(result['config'])
+            flag = '  REGRESSION'
+        print(f"{result['config']:18}{before['time_median_ms']:>12.1f}ms{result['time_median_ms']:>12.1f}ms"
+              f"{ratio:>8.2f}x{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--transactions', type=int, default=10000)
+    parser.add_argument('--avg-length', type=float, default=10)
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--pattern-length', type=float, default=4)
+    parser.add_argument('--skew', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--support', type=float, default=0.01)
+    parser.add_argument('--confidence', type=float, default=0.5)
+    parser.add_argument('--warmups', type=int, default=1)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--configs', nargs='+', choices=list(CONFIGS), default=list(CONFIGS))
+    parser.add_argument('--json', help="write the full report to this JSON file")
+    parser.add_argument('--csv', help="append one row per configuration to this CSV file")
+    parser.add_argument('--baseline', help="earlier JSON report to compare median times against")
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    dataset = {'n_transactions': args.transactions, 'avg_length': args.avg_length, 'n_items': args.items,
+               'avg_pattern_length': args.pattern_length, 'skew': args.skew, 'seed': args.seed}
+    start = time.perf_counter()
+    store = quest_store(**dataset)
+    _, offsets, _ = store.arrays()
+    print(f"Dataset: {len(store):,} baskets, {store.n_items:,} items, "
+          f"{np.diff(offsets).mean():.1f} items/basket (generated in {time.perf_counter() - start:.2f}s)")
+    del offsets
+
+    report = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'environment': {'commit': git_commit(), 'python': platform.python_version(),
+                        'numpy': np.__version__, 'platform': platform.platform(),
+                        'cpus': os.cpu_count()},
+        'dataset': dataset,
+        'parameters': {'support': args.support, 'confidence': args.confidence,
+                       'warmups': args.warmups, 'repeats': args.repeats},
+        'results': [],
+    }
+
+    print(f"{'':18}{'min':>10}{'median':>10}{'peak MB':>10}{'itemsets':>10}{'rules':>8}")
+    reference = None
+    identical = True
+    for label in args.configs:
+        algorithm, options = CONFIGS[label]
+        result, frequent_itemsets, rules = bench_config(store, algorithm, options, args.support,
+                                                        args.confidence, args.warmups, args.repeats)
+        report['results'].append({'config': label, 'algorithm': algorithm, **options, **result})
+        print(f"{label:18}{result['time_min_ms']:>8.1f}ms{result['time_median_ms']:>8.1f}ms"
+              f"{result['peak_memory_mb']:>10.1f}{result['itemsets']:>10}{result['rules']:>8}")
+
+        if reference is None:
+            reference = (frequent_itemsets, rules)
+        elif (frequent_itemsets, rules) != reference:
+            print(f"  {label} does not match {args.configs[0]}")
+            identical = False
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.csv:
+        write_csv(args.csv, report)
+
+    regressed = compare(report, args.baseline, args.tolerance) if args.baseline else []
+    print(f"Itemsets and rules identical: {identical}")
+
+    if not identical or regressed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark: round-trip latency of the local recommendation service
+(mining.service) over loopback, for single baskets and batches, plus the
+time the index itself needs per basket.
+
+Rules are mined from a synthetic IBM-Quest-style dataset
+(mining.synthetic), and query baskets are random transactions from it.
+Half-way through the single-basket run the rule set is reloaded, so the
+latencies include a hot swap. The run fails (exit status 1) if any
+request errors or if the p99 latency is above --max-p99-ms.
+
+    python benchmarks/bench_service.py --transactions 100000 --support 0.005 --requests 20000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mining.engine import run_algorithm  # noqa: E402
+from mining.rule_index import BasketRuleIndex  # noqa: E402
+from mining.service import RecommendationServer  # noqa: E402
+from mining.synthetic import quest_store  # noqa: E402
+
+
+def percentiles(times_ms):
+    ordered = sorted(times_ms)
+    return {'p50_ms': round(statistics.median(ordered), 4),
+            'p99_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 4),
+            'max_ms': round(ordered[-1], 4)}
+
+
+async def round_trips(host, port, requests, reload_at=None):
+    """Sends the requests one after another on one connection; returns (latencies in ms, errors)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    times, errors = [], 0
+    for position, request in enumerate(requests):
+        if position == reload_at:
+            # Reload from a second connection while this one keeps querying
+            reload_task = asyncio.ensure_future(_reload(host, port))
+        line = json.dumps(request).encode('utf-8') + b'\n'
+        start = time.perf_counter()
+        writer.write(line)
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        times.append((time.perf_counter() - start) * 1000)
+        errors += 'error' in response
+    if reload_at is not None:
+        errors += 'error' in await reload_task
+    writer.close()
+    return times, errors
+
+
+async def _reload(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'{"op": "reload"}\n')
+    await writer.drain()
+    response = json.loads(await reader.readline())
+    writer.close()
+    return response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--transactions', type=int, default=20000)
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--support', type=float, default=0.005)
+    parser.add_argument('--confidence', type=float, default=0.2)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--batch', type=int, default=32, help="baskets per batched request")
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--max-p99-ms', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    store = quest_store(args.transactions, n_items=args.items, seed=args.seed)
+    _, rules, performance_data = run_algorithm('FP-Growth', store, args.support, args.confidence)
+    names = store.item_names
+    rng = random.Random(args.seed)
+    baskets = [[names[i] for i in store.row_items(rng.randrange(len(store)))] for _ in range(args.requests)]
+
+    index = BasketRuleIndex(rules)
+    start = time.perf_counter()
+    for basket in baskets:
+        index.recommend(set(basket), args.k)
+    in_process_us = (time.perf_counter() - start) / len(baskets) * 1e6
+    print(f"{len(rules):,} rules, {len(index.by_antecedent):,} antecedents (mined in "
+          f"{performance_data['Time (ms)']:.0f} ms); index lookup {in_process_us:.1f} us per basket")
+
+    async def run():
+        server = RecommendationServer(lambda: BasketRuleIndex(rules), port=0)
+        await server.start()
+        single = [{'id': n, 'basket': basket, 'k': args.k} for n, basket in enumerate(baskets)]
+        batched = [{'id': n, 'baskets': baskets[n:n + args.batch], 'k': args.k}
+                   for n in range(0, len(baskets), args.batch)]
+        results = (await round_trips(server.host, server.port, single, reload_at=len(single) // 2),
+                   await round_trips(server.host, server.port, batched))
+        await server.close()
+        return results, server.version
+
+    ((single_ms, single_errors), (batch_ms, batch_errors)), version = asyncio.run(run())
+    single_stats, batch_stats = percentiles(single_ms), percentiles(batch_ms)
+    print(f"single basket:     {single_stats}  ({single_errors} errors, index version {version} after reload)")
+    print(f"batch of {args.batch:<3}:      {batch_stats}  "
+          f"({batch_stats['p50_ms'] / args.batch * 1000:.1f} us per basket, {batch_errors} errors)")
+
+    if single_errors or batch_errors or single_stats['p99_ms'] > args.max_p99_ms:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
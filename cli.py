@@ -0,0 +1,413 @@
+"""
+Command-line batch mode: import, mine, compare and recommend without the GUI.
+
+    python cli.py import data/sample_transactions.csv --out history.tstore
+    python cli.py mine history.tstore --algorithm FP-Growth --support 0.05 --confidence 0.3
+    python cli.py mine history.tstore --support 0.01 --epsilon 0.005 --verify
+    python cli.py compare history.tstore --support 0.05 --json
+    python cli.py recommend history.tstore milk bread
+    python cli.py serve history.tstore --port 8765
+
+DATA is a .tstore file (see mining.datafile) or a transactions CSV, which
+is cleaned against the product inventory (--products) on every run.
+With --json every command prints one JSON document to stdout instead of
+text.
+
+Exit codes: 0 success, 1 error (unreadable input, failed run), 2 bad
+arguments, 3 the run worked but found nothing (no rules or no
+recommendations).
+
+Only the standard library is imported at startup. NumPy, pandas and the
+mining engine are imported by the command that needs them, so --help and
+argument errors return at once.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_EMPTY = 3
+
+PRODUCTS_INVENTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'products.csv')
+# The keys of mining.ALGORITHMS, repeated so that parsing arguments does not import the engine
+ALGORITHM_NAMES = ['Apriori', 'Eclat', 'FP-Growth']
+# Mining options (see _mining_options) each algorithm's runner accepts
+ALGORITHM_OPTIONS = {
+    'Apriori': {'backend', 'mode', 'workers'},
+    'Eclat': {'backend', 'mode', 'workers', 'memory_budget'},
+    'FP-Growth': {'mode'},
+}
+
+
+class CliError(Exception):
+    """An error reported as one line on stderr, with exit code `code`."""
+
+    def __init__(self, message, code=EXIT_ERROR):
+        super().__init__(message)
+        self.code = code
+
+
+# --INPUT--
+
+def _import_csvs(filepaths, store, products, first_id=1):
+    """Cleans the CSVs into `store` (like the GUI import). Returns (ImportStats, next_id)."""
+    import pandas as pd
+    from mining import ingest
+
+    try:
+        valid_products = ingest.read_valid_products(products)
+    except FileNotFoundError:
+        raise CliError(f"Product inventory '{products}' not found.")
+
+    stats = ingest.ImportStats()
+    for filepath in filepaths:
+        try:
+            if os.path.getsize(filepath) >= ingest.PARALLEL_IMPORT_MIN_BYTES:
+                import_csv = ingest.import_csv_parallel
+            else:
+                import_csv = ingest.import_csv
+            file_stats, first_id = import_csv(filepath, store, valid_products, first_id=first_id)
+        except FileNotFoundError:
+            raise CliError(f"'{filepath}' not found.")
+        except pd.errors.EmptyDataError:
+            raise CliError(f"'{filepath}' is empty or missing data after the header.")
+        except ValueError as e:
+            raise CliError(f"'{filepath}': {e}")
+        stats.merge(file_stats)
+    return stats, first_id
+
+
+def load_store(filepath, products):
+    """Opens a .tstore file, or imports a CSV into a new store. Returns (store, ImportStats or None)."""
+    from mining import TransactionStore, datafile
+
+    if filepath.endswith(datafile.FILE_EXTENSION):
+        try:
+            return datafile.open_store(filepath), None
+        except (OSError, ValueError) as e:
+            raise CliError(f"Could not open dataset: {e}")
+    store = TransactionStore()
+    stats, _ = _import_csvs([filepath], store, products)
+    return store, stats
+
+
+def import_report(stats):
+    """The preprocessing counters of an import, as plain data."""
+    return {
+        'total_transactions_scanned': stats.total_initial,
+        'removed_empty': stats.removed_empty,
+        'removed_single_item': stats.removed_single,
+        'duplicates': stats.duplicates,
+        'invalid_products': stats.invalids,
+        'valid_transactions': stats.valid_transactions,
+        'total_removed': stats.total_initial - stats.valid_transactions,
+        'final_total_items': stats.final_item_count,
+        'final_unique_products': stats.final_unique_count,
+        'errors': stats.errors,
+    }
+
+
+def _mining_options(args):
+    """Keyword options for run_algorithm() from the optional mining arguments that were given."""
+    options = {}
+    for name in ('backend', 'mode', 'workers', 'memory_budget'):
+        value = getattr(args, name, None)
+        if value is not None:
+            options[name] = value
+    return options
+
+
+def _run(algorithm, store, args, instrument=False):
+    """run_algorithm() with the command's thresholds; raises CliError instead of returning one."""
+    from mining import run_algorithm, run_approximate
+
+    options = _mining_options(args)
+    sampling = getattr(args, 'epsilon', None) is not None
+    # Mine a sample with `algorithm` instead of the full data; it takes none of the options
+    accepted = set() if sampling else ALGORITHM_OPTIONS[algorithm]
+    unsupported = [name.replace('_', '-') for name in options if name not in accepted]
+    if unsupported and sampling:
+        raise CliError(f"--epsilon cannot be combined with --{unsupported[0]}.", EXIT_USAGE)
+    if unsupported:
+        raise CliError(f"{algorithm} does not accept --{unsupported[0]}.", EXIT_USAGE)
+
+    try:
+        if sampling:
+            frequent_itemsets, rules, performance_data = run_approximate(
+                store, args.support, args.confidence, epsilon=args.epsilon, delta=args.delta,
+                verify=args.verify, sample_algorithm=algorithm, instrument=instrument)
+        else:
+            frequent_itemsets, rules, performance_data = run_algorithm(
+                algorithm, store, args.support, args.confidence, instrument=instrument, **options)
+    except ValueError as e:
+        raise CliError(str(e), EXIT_USAGE)
+    if not isinstance(performance_data, dict):
+        raise CliError(f"Analysis failed: {performance_data}")
+    return frequent_itemsets, rules, performance_data
+
+
+def rule_record(rule):
+    return {'antecedents': list(rule['antecedents']), 'consequents': list(rule['consequents']),
+            'support': rule['support'], 'confidence': rule['confidence'], 'lift': rule['lift']}
+
+
+# --COMMANDS--
+
+def cmd_import(args):
+    from mining import TransactionStore, datafile
+
+    store, first_id = TransactionStore(), 1
+    if args.append and os.path.exists(args.out):
+        try:
+            store = datafile.open_store(args.out, mmap=False)
+        except (OSError, ValueError) as e:
+            raise CliError(f"Could not open dataset: {e}")
+        ids = store.arrays()[2]
+        first_id = int(ids.max()) + 1 if len(ids) else 1
+        del ids
+
+    stats, _ = _import_csvs(args.csv, store, args.products, first_id)
+    try:
+        datafile.save_store(store, args.out)
+    except OSError as e:
+        raise CliError(f"Could not save dataset: {e}")
+
+    result = {'output': args.out, 'transactions': len(store), 'items': store.n_items,
+              'report': import_report(stats)}
+    if args.json:
+        return result, EXIT_OK
+
+    print(f"Imported {stats.valid_transactions} transactions into {args.out} (total: {len(store)}).")
+    for key, value in result['report'].items():
+        print(f"- {key.replace('_', ' ').capitalize()}: {value}")
+    return result, EXIT_OK
+
+
+def cmd_mine(args):
+    store, _ = load_store(args.data, args.products)
+    frequent_itemsets, rules, performance_data = _run(args.algorithm, store, args, args.instrument)
+
+    ranked = sorted((rule_record(rule) for rule in rules), key=lambda r: (-r['confidence'], -r['lift']))
+    shown = ranked[:args.limit] if args.limit else ranked
+    result = {'algorithm': args.algorithm, 'transactions': len(store), 'itemsets': len(frequent_itemsets),
+              'rules': shown, 'performance': performance_data}
+    code = EXIT_OK if ranked else EXIT_EMPTY
+    if args.json:
+        return result, code
+
+    print(f"{args.algorithm}: {len(frequent_itemsets)} frequent itemsets, {len(ranked)} rules "
+          f"from {len(store)} transactions in {performance_data['Time (ms)']} ms")
+    for rule in shown:
+        print(f"  {', '.join(rule['antecedents'])} -> {', '.join(rule['consequents'])}  "
+              f"(support {rule['support']:.3f}, confidence {rule['confidence']:.3f}, lift {rule['lift']:.2f})")
+    if len(shown) < len(ranked):
+        print(f"  ... {len(ranked) - len(shown)} more (--limit 0 shows all)")
+    return result, code
+
+
+def cmd_compare(args):
+    store, _ = load_store(args.data, args.products)
+    all_perf = []
+    for algorithm in args.algorithms:
+        _, _, performance_data = _run(algorithm, store, args, args.instrument)
+        all_perf.append(performance_data)
+
+    result = {'transactions': len(store), 'support': args.support, 'confidence': args.confidence,
+              'results': all_perf}
+    if args.json:
+        return result, EXIT_OK
+
+    print(f"Parameters: Min Support={args.support * 100}%, Min Confidence={args.confidence * 100}%")
+    print(f"{'Algorithm':<12}{'Rules Generated':>16}{'Time (ms)':>12}{'Memory (MB)':>13}")
+    for perf in all_perf:
+        print(f"{perf['Algorithm']:<12}{perf['Rules Generated']:>16}{perf['Time (ms)']:>12}{perf['Memory (MB)']:>13}")
+    for perf in all_perf:
+        if 'Instrumentation' in perf:
+            phases = ', '.join(f"{name} {ms} ms" for name, ms in perf['Instrumentation']['Phases (ms)'].items())
+            print(f"{perf['Algorithm']} phases: {phases}")
+    return result, EXIT_OK
+
+
+def cmd_recommend(args):
+    from mining import RuleIndex
+
+    store, _ = load_store(args.data, args.products)
+    if not len(store):
+        raise CliError("No transactions available.")
+    rule_index = RuleIndex.build(store, args.support, args.confidence, algorithm=args.algorithm, top_k=args.top)
+
+    recommendations = {}
+    for product in args.products_to_match:
+        product = product.strip().lower()
+        recommendations[product] = [
+            {'product': assoc_prod, 'confidence': rule['confidence'], 'lift': rule['lift'],
+             'support': rule['support']}
+            for assoc_prod, rule in rule_index.lookup(product)
+        ]
+
+    result = {'rules': rule_index.n_rules, 'recommendations': recommendations}
+    code = EXIT_OK if any(recommendations.values()) else EXIT_EMPTY
+    if args.json:
+        return result, code
+
+    for product, found in recommendations.items():
+        print(f"Customers who bought {product.title()} also bought:")
+        if not found:
+            print("  (no significant associations)")
+        for rec in found:
+            print(f"  - {rec['product'].title():<15} {round(rec['confidence'] * 100, 1)}% of the time "
+                  f"(lift {rec['lift']:.2f})")
+    return result, code
+
+
+def read_rules(filepath):
+    """Rules from a JSON file: a list of rule records, or the output of 'mine --json'."""
+    try:
+        with open(filepath, encoding='utf-8') as f:
+            document = json.load(f)
+    except (OSError, ValueError) as e:
+        raise CliError(f"Could not read rules: {e}")
+    return document['rules'] if isinstance(document, dict) else document
+
+
+def cmd_serve(args):
+    import asyncio
+    import signal
+
+    from mining.rule_index import BasketRuleIndex
+    from mining.service import RecommendationServer
+
+    if not args.data and not args.rules:
+        raise CliError("serve needs a dataset or --rules.", EXIT_USAGE)
+
+    def load_index():
+        # Run again on every reload, so re-mined data or a rewritten rules file is picked up
+        if args.rules:
+            rules = read_rules(args.rules)
+        else:
+            store, _ = load_store(args.data, args.products)
+            _, rules, _ = _run(args.algorithm, store, args)
+        return BasketRuleIndex(rules, top_k=args.top)
+
+    async def reload(server):
+        try:
+            print(f"Reloaded rules (version {await server.reload()})", file=sys.stderr)
+        except Exception as e:
+            print(f"Reload failed, still serving the previous rules: {e}", file=sys.stderr)
+
+    async def serve():
+        server = RecommendationServer(load_index, args.host, args.port)
+        await server.start()
+        if hasattr(signal, 'SIGHUP'):
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGHUP, lambda: asyncio.ensure_future(reload(server)))
+        print(f"Serving {server.index.n_rules} rules on {server.host}:{server.port}", file=sys.stderr)
+        await server.serve_forever()
+
+    asyncio.run(serve())
+    return None, EXIT_OK
+
+
+# --ARGUMENTS--
+
+def _json_default(value):
+    # NumPy scalars in performance data
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--json', action='store_true', help="print one JSON document instead of text")
+    common.add_argument('--products', default=PRODUCTS_INVENTORY_FILE,
+                        help="product inventory CSV used to validate imported transactions")
+
+    thresholds = argparse.ArgumentParser(add_help=False)
+    thresholds.add_argument('data', help="a .tstore dataset or a transactions CSV")
+    thresholds.add_argument('--support', type=float, default=0.2, help="minimum support ratio")
+    thresholds.add_argument('--confidence', type=float, default=0.5, help="minimum confidence")
+
+    mining_options = argparse.ArgumentParser(add_help=False)
+    mining_options.add_argument('--backend', choices=['tidset', 'bitset', 'hashtree'])
+    mining_options.add_argument('--mode', choices=['all', 'closed', 'maximal'])
+    mining_options.add_argument('--workers', type=int, help="worker processes (Apriori, Eclat)")
+    mining_options.add_argument('--memory-budget', type=int, metavar='BYTES',
+                                help="mine Eclat out of core within this many bytes")
+    mining_options.add_argument('--epsilon', type=float,
+                                help="mine a random sample instead, with supports within +/- EPSILON")
+    mining_options.add_argument('--delta', type=float, default=0.05,
+                                help="probability that a sampled support is off by more than --epsilon")
+    mining_options.add_argument('--verify', action='store_true',
+                                help="with --epsilon, check the sample's itemsets in one pass over all the data")
+    mining_options.add_argument('--instrument', action='store_true', help="add phase timings and counters")
+
+    parser = argparse.ArgumentParser(prog='cli.py', description=__doc__.split('\n\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    command = commands.add_parser('import', parents=[common], help="clean CSVs into a .tstore dataset")
+    command.add_argument('csv', nargs='+', help="transactions CSV files")
+    command.add_argument('--out', required=True, help="dataset file to write")
+    command.add_argument('--append', action='store_true', help="add to the dataset in --out if it exists")
+    command.set_defaults(handler=cmd_import)
+
+    command = commands.add_parser('mine', parents=[common, thresholds, mining_options],
+                                  help="mine one algorithm and list its rules")
+    command.add_argument('--algorithm', choices=ALGORITHM_NAMES, default='FP-Growth')
+    command.add_argument('--limit', type=int, default=20, help="rules to list, best first (0 = all)")
+    command.set_defaults(handler=cmd_mine)
+
+    command = commands.add_parser('compare', parents=[common, thresholds, mining_options],
+                                  help="run every algorithm and compare their performance")
+    command.add_argument('--algorithms', nargs='+', choices=ALGORITHM_NAMES, default=ALGORITHM_NAMES)
+    command.set_defaults(handler=cmd_compare)
+
+    command = commands.add_parser('recommend', parents=[common], help="products bought with the given ones")
+    command.add_argument('data', help="a .tstore dataset or a transactions CSV")
+    command.add_argument('products_to_match', nargs='+', metavar='product')
+    command.add_argument('--support', type=float, default=0.05, help="minimum support ratio")
+    command.add_argument('--confidence', type=float, default=0.2, help="minimum confidence")
+    command.add_argument('--algorithm', choices=ALGORITHM_NAMES, default='FP-Growth')
+    command.add_argument('--top', type=int, help="recommendations per product")
+    command.set_defaults(handler=cmd_recommend)
+
+    command = commands.add_parser('serve', parents=[common],
+                                  help="serve basket recommendations over TCP (newline-delimited JSON)")
+    command.add_argument('data', nargs='?', help="a .tstore dataset or a transactions CSV to mine")
+    command.add_argument('--rules', help="JSON rules file (e.g. from 'mine --json --limit 0') instead of mining")
+    command.add_argument('--support', type=float, default=0.05, help="minimum support ratio")
+    command.add_argument('--confidence', type=float, default=0.2, help="minimum confidence")
+    command.add_argument('--algorithm', choices=ALGORITHM_NAMES, default='FP-Growth')
+    command.add_argument('--top', type=int, help="consequents kept per antecedent")
+    command.add_argument('--host', default='127.0.0.1')
+    command.add_argument('--port', type=int, default=8765)
+    command.set_defaults(handler=cmd_serve)
+    return parser
+
+
+def main(argv=None):
+    """Runs one command and returns its exit code."""
+    args = build_parser().parse_args(argv)
+    try:
+        # In JSON mode stdout carries only the document; progress output goes to stderr
+        with contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext():
+            result, code = args.handler(args)
+    except CliError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return e.code
+    except KeyboardInterrupt:
+        return 130
+
+    if args.json and result is not None:
+        json.dump(result, sys.stdout, indent=2, default=_json_default)
+        sys.stdout.write('\n')
+    return code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,13 +1,14 @@
-import time
 import tkinter as tk
-import itertools
 from tkinter import filedialog, messagebox, ttk
 import csv
-from collections import Counter, defaultdict
+from collections import Counter
 import pandas as pd
+import numpy as np
 from io import StringIO # Used for reading CSV content as a file-like object
 import os
-import psutil
+
+import mining
+from mining import TransactionStore, datafile, ingest
 
 
 PRODUCTS = [
@@ -15,11 +16,14 @@ PRODUCTS = [
     'Apples', 'Bananas', 'Chicken', 'Cheese', 'Water'
 ]
 
-all_transactions = []
+# Integer-encoded, columnar store of every created/imported transaction
+transaction_store = TransactionStore()
 current_basket = []
 transaction_id_counter = 1
 
 PRODUCTS_INVENTORY_FILE = 'data/products.csv'
+JOB_POLL_MS = 100  # how often the status bar checks background mining jobs
+TABLE_PAGE_SIZE = 100  # transactions shown per page of the table
 
 class SupermarketApp:
     def __init__(self, master):
@@ -27,7 +31,17 @@ class SupermarketApp:
         master.title("🛒 Supermarket Simulator: Transaction Creator")
         
         self.VALID_PRODUCTS_SET = set() 
+        self.rule_index = None  # recommendation rules, rebuilt when the data or thresholds change
+        self.results_cache = mining.ResultCache()  # mining results by dataset + thresholds
+        self.incremental_miner = mining.IncrementalMiner()  # keeps recommendation itemsets current
+        self.jobs = mining.JobRunner()  # mining runs on a background thread
+        self.active_jobs = []
+        self.table_page = 0
+        self.table_filter = []      # lowercase item names every shown transaction must hold
+        self.table_rows = None      # store rows matching the filter (None = every row)
+        self.table_rows_version = None
         self.load_valid_products_list(PRODUCTS_INVENTORY_FILE)
+        master.protocol("WM_DELETE_WINDOW", self.on_close)
 
         self.frame_import = tk.Frame(master, padx=10, pady=10, bd=2, relief=tk.GROOVE)
         self.frame_import.pack(fill='x', pady=5)
@@ -35,6 +49,7 @@ class SupermarketApp:
 
         ttk.Separator(master, orient='horizontal').pack(fill='x', pady=10)
         
+        self.setup_status_bar()
         self.setup_recommendation_controls()
 
         self.frame_main = tk.Frame(master)
@@ -66,9 +81,25 @@ class SupermarketApp:
         tk.Label(self.frame_import, text="Import Transactions from CSV:", font=('Arial', 10, 'bold')).pack(side='left', padx=5)
         self.import_button = tk.Button(self.frame_import, text="📂 Load CSV File", command=self.import_transactions_from_csv)
         self.import_button.pack(side='left', padx=10)
+        self.open_dataset_button = tk.Button(self.frame_import, text="📂 Open Dataset", command=self.open_dataset)
+        self.open_dataset_button.pack(side='left', padx=5)
+        self.save_dataset_button = tk.Button(self.frame_import, text="💾 Save Dataset", command=self.save_dataset)
+        self.save_dataset_button.pack(side='left', padx=5)
         self.import_status_label = tk.Label(self.frame_import, text="No file loaded.")
         self.import_status_label.pack(side='left', padx=10)
 
+    def setup_status_bar(self):
+        """Creates the background job indicator (status text, activity bar and Cancel button)."""
+        status_frame = tk.Frame(self.master, padx=10, pady=2)
+        status_frame.pack(side='bottom', fill='x')
+
+        self.job_status_label = tk.Label(status_frame, text="Idle", anchor='w', fg='gray')
+        self.job_status_label.pack(side='left', fill='x', expand=True)
+        self.btn_cancel_job = tk.Button(status_frame, text="Cancel", command=self.cancel_jobs, state=tk.DISABLED)
+        self.btn_cancel_job.pack(side='right', padx=5)
+        self.job_progress = ttk.Progressbar(status_frame, mode='indeterminate', length=120)
+        self.job_progress.pack(side='right', padx=5)
+
     def setup_product_section(self):
         """Creates the clickable buttons for products."""
         for product in PRODUCTS:
@@ -104,6 +135,25 @@ class SupermarketApp:
 
         self.transactions_tree.pack(fill='both', expand=True)
 
+        # Paging and filtering: only the current page is ever inserted into the Treeview
+        nav_frame = tk.Frame(self.frame_transactions, pady=5)
+        nav_frame.pack(fill='x')
+
+        tk.Label(nav_frame, text="Filter by item(s):").pack(side='left')
+        self.table_filter_var = tk.StringVar()
+        filter_entry = tk.Entry(nav_frame, textvariable=self.table_filter_var, width=30)
+        filter_entry.pack(side='left', padx=5)
+        filter_entry.bind('<Return>', lambda event: self.apply_table_filter())
+        tk.Button(nav_frame, text="Filter", command=self.apply_table_filter).pack(side='left', padx=2)
+        tk.Button(nav_frame, text="Clear", command=self.clear_table_filter).pack(side='left', padx=2)
+
+        tk.Button(nav_frame, text="Last ⏭", command=self.show_last_table_page).pack(side='right', padx=2)
+        tk.Button(nav_frame, text="Next ▶", command=lambda: self.show_table_page(self.table_page + 1)).pack(side='right', padx=2)
+        self.table_page_label = tk.Label(nav_frame, text="")
+        self.table_page_label.pack(side='right', padx=10)
+        tk.Button(nav_frame, text="◀ Prev", command=lambda: self.show_table_page(self.table_page - 1)).pack(side='right', padx=2)
+        tk.Button(nav_frame, text="⏮ First", command=lambda: self.show_table_page(0)).pack(side='right', padx=2)
+
 
     def add_product_to_basket(self, product):
         """Adds a product to the current basket."""
@@ -122,33 +172,24 @@ class SupermarketApp:
         for product in current_basket:
             self.basket_listbox.insert(tk.END, product)
             
-        # Enable/Disable the create transction button
-        if current_basket:
+        # Enable/Disable the create transction button (the data is read-only while mining)
+        if current_basket and not self.active_jobs:
             self.btn_create_transaction.config(state=tk.NORMAL)
         else:
             self.btn_create_transaction.config(state=tk.DISABLED)
 
     def create_transaction(self):
         """Saves the current basket as a transaction and clears the basket."""
-        global all_transactions, transaction_id_counter
-        
-        # Get unique items from the basket
-        unique_items = sorted(list(set(current_basket)))
-
-        # Create the new transaction object
-        new_transaction = {
-            'id': transaction_id_counter,
-            'items': unique_items,
-            'count': len(unique_items)
-        }
+        global transaction_id_counter
         
-        # Add to global list and increment counter
-        all_transactions.append(new_transaction)
+        # Add the unique basket items to the store and increment counter
+        new_transaction_id = transaction_id_counter
+        row = transaction_store.append(new_transaction_id, current_basket)
         transaction_id_counter += 1
 
-        self.render_transactions_table()
+        self.append_transaction_row(row)
         self.clear_basket()
-        messagebox.showinfo("Success", f"Transaction T{new_transaction['id']} created successfully!")
+        messagebox.showinfo("Success", f"Transaction T{new_transaction_id} created successfully!")
 
 
     def import_transactions_from_csv(self):
@@ -169,154 +210,190 @@ class SupermarketApp:
         if success:
             self.render_transactions_table()
             self.update_product_dropdown()
-            total_transactions = len(all_transactions)
+            total_transactions = len(transaction_store)
             
             status_text = f"Imported {imported_count} transactions. (Total: {total_transactions} loaded)."
             if error_count > 0:
                  status_text += f" {error_count} lines skipped (errors/empty)."
             
             self.import_status_label.config(text=status_text, fg='darkgreen')
-        
-            try:
-                self.compare_performance(min_support=0.2, min_confidence=0.5)
-            except Exception as e:
-                print(f"Algorithm execution failed: {e}")
+
+            self.start_job("Comparing algorithms", self.compare_performance, min_support=0.2, min_confidence=0.5)
 
         else:
             self.import_status_label.config(text=f"Import failed. {imported_count}", fg='red')
 
 
-    def _parse_csv_data(self, filepath):
-        global all_transactions, transaction_id_counter
-        
-        # TRACKING VARIABLES
-        initial_total_transactions = 0
-        removed_empty_transactions = 0
-        removed_single_transactions = 0
-        total_duplicate_items_detected = 0
-        total_invalid_items_detected = 0
-
-        # FINAL STATS
-        final_items_count = 0
-        final_unique_products_set = set()
-
-        imported_count = 0
-        error_count = 0
-        
+    def save_dataset(self):
+        """Saves the cleaned transactions in the binary dataset format."""
+        filepath = filedialog.asksaveasfilename(
+            defaultextension=datafile.FILE_EXTENSION,
+            filetypes=[("Transaction datasets", "*" + datafile.FILE_EXTENSION)]
+        )
+        if not filepath:
+            return
+
         try:
-            #Read the CSV content using pandas, setting the first row (index 0) as the header.
-            df = pd.read_csv(filepath, header=0, encoding='utf-8') 
-            
-            #Basic validation: Must have at least two columns. 
-            if df.shape[1] < 2:
-                # If there aren't two columns of data after the header is read, error
-                return False, "CSV format error: Expected at least two columns (ID, Items).", error_count
-            
-            # Reset column indexing for easier reference (assuming ID is column 0, Items is column 1)
-            # .fillna prevents 'nan' strings from appearing in the transactions.
+            datafile.save_store(transaction_store, filepath)
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not save dataset: {e}")
+            return
+        self.import_status_label.config(text=f"Saved {len(transaction_store)} transactions.", fg='darkgreen')
 
-            df_items = df.iloc[:, 1].fillna('')
-            initial_total_transactions = len(df_items)
+    def open_dataset(self):
+        """Replaces the loaded transactions with a dataset saved by save_dataset()."""
+        global transaction_store, transaction_id_counter
 
-            #Determines the separator used within the 'Items' column (Column 1)
-            sample_items = df_items.head(10).astype(str).str.cat(sep='')
-            
-            if ',' in sample_items:
-                item_separator = ','
-            elif '|' in sample_items:
-                item_separator = '|'
-            elif ';' in sample_items:
-                item_separator = ';'
+        filepath = filedialog.askopenfilename(
+            defaultextension=datafile.FILE_EXTENSION,
+            filetypes=[("Transaction datasets", "*" + datafile.FILE_EXTENSION)]
+        )
+        if not filepath:
+            return
+
+        try:
+            transaction_store = datafile.open_store(filepath)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Could not open dataset: {e}")
+            return
+
+        ids = transaction_store.arrays()[2]
+        transaction_id_counter = int(ids.max()) + 1 if len(ids) else 1
+        del ids
+
+        self.render_transactions_table()
+        self.update_product_dropdown()
+        self.import_status_label.config(text=f"Opened {len(transaction_store)} transactions.", fg='darkgreen')
+
+    def _parse_csv_data(self, filepath):
+        """
+        Streams the CSV into the transaction store (in parallel for large files) and prints the report.
+        A failed import leaves the store and transaction_id_counter as they were.
+        """
+        global transaction_id_counter
+
+        try:
+            # Large exports are split across a process pool to use every core
+            if os.path.getsize(filepath) >= ingest.PARALLEL_IMPORT_MIN_BYTES:
+                import_csv = ingest.import_csv_parallel
             else:
-                item_separator = ',' 
-
-            for items_string in df_items:
-                try:                    
-                    # Split the string by the determined separator, filter out empty strings, and trim whitespace
-                    raw_items_found = [item.strip().lower() for item in items_string.split(item_separator)]
-
-                    # Remove empty strings resulting from extra delimiters like ',,'
-                    cleaned_items = [item for item in raw_items_found if item]
-                    
-                    # Tracking empty transactions
-                    if not cleaned_items:
-                        removed_empty_transactions += 1
-                        # If there are no items, skip them
-                        continue
-                        # Otherwise, process the unique items as usual
-                    items_pre_validation = list(set(cleaned_items))
-                    
-                    # tracking duplicate items
-                    total_duplicate_items_detected += (len(cleaned_items) - len(items_pre_validation))
-                    
-                    valid_items = []
-                    for item in items_pre_validation:
-                        if item in self.VALID_PRODUCTS_SET:
-                            valid_items.append(item)
-                        else:
-                            # Tracking invalid items
-                            total_invalid_items_detected += 1
-                    
-                    unique_items = valid_items
-                    item_count = len(unique_items)
-
-                    # Removing transactions containing only one item
-                    if item_count < 2:
-                        # tracking single-item transactions
-                        if item_count == 1:
-                            removed_single_transactions += 1
-                        continue
-
-                    # Create transaction data structure
-                    new_transaction = {
-                        'id': transaction_id_counter,
-                        'items': unique_items,
-                        'count': item_count
-                    }
-
-                    all_transactions.append(new_transaction)
-                    transaction_id_counter += 1
-                    imported_count += 1
-                    
-                    #Updating final dataset statistics
-                    final_items_count += item_count
-                    final_unique_products_set.update(unique_items)
-
-                except Exception as e:
-                    print(f"Error processing item string '{items_string}': {e}")
-                    error_count += 1
-           
-           # REPORT GENERATION
-            self._generate_report(
-                initial_total_transactions,
-                removed_empty_transactions,
-                removed_single_transactions,
-                total_duplicate_items_detected,
-                total_invalid_items_detected,
-                imported_count,
-                final_items_count,
-                len(final_unique_products_set)
-            )
-            return True, imported_count, error_count
-            
+                import_csv = ingest.import_csv
+
+            stats, transaction_id_counter = import_csv(
+                filepath, transaction_store, self.VALID_PRODUCTS_SET,
+                first_id=transaction_id_counter)
+
+            # REPORT GENERATION (counters accumulated across all chunks)
+            self._generate_report(*stats.report_args())
+            return True, stats.valid_transactions, stats.errors
+
         except FileNotFoundError:
-            return False, "File not found.", error_count
+            return False, "File not found.", 0
         except pd.errors.EmptyDataError:
-            return False, "CSV file is empty or missing data after header.", error_count
+            return False, "CSV file is empty or missing data after header.", 0
+        except ValueError as e:
+            return False, str(e), 0
         except Exception as e:
-            return False, f"An unexpected error occurred: {e}", error_count
+            return False, f"An unexpected error occurred: {e}", 0
+
+    # --TRANSACTIONS TABLE (one page at a time)--
+
+    def _table_size(self):
+        """Number of transactions the table can page through (after filtering)."""
+        if self.table_rows is None:
+            return len(transaction_store)
+        return len(self.table_rows)
+
+    def _table_store_row(self, position):
+        """Store row shown at `position` of the (filtered) table."""
+        if self.table_rows is None:
+            return position
+        return int(self.table_rows[position])
+
+    def _insert_table_row(self, row):
+        transaction_id, items = transaction_store.transaction(row)
+        self.transactions_tree.insert("", tk.END,
+                                      values=(f"T{transaction_id}",
+                                              ", ".join(items),
+                                              len(items)))
+
+    def _update_table_page_label(self):
+        n_pages = max(1, -(-self._table_size() // TABLE_PAGE_SIZE))
+        matching = f" matching {', '.join(self.table_filter)}" if self.table_filter else ""
+        self.table_page_label.config(
+            text=f"Page {self.table_page + 1} of {n_pages} ({self._table_size()} transactions{matching})")
+
+    def _match_table_filter(self):
+        """Rows holding every filtered item (any capitalization), from the store's items column."""
+        rows = None
+        for name in self.table_filter:
+            item_ids = [item_id for item_name, item_id in transaction_store.item_index.items()
+                        if item_name.lower() == name]
+            matches = transaction_store.rows_containing(item_ids)
+            rows = matches if rows is None else np.intersect1d(rows, matches, assume_unique=True)
+        return rows
 
     def render_transactions_table(self):
-        """Clears and re-populates the transaction Treeview widget."""
+        """Re-populates the Treeview with the current page (at most TABLE_PAGE_SIZE rows)."""
+        # The filter is re-applied whenever the store changed behind the table (import, open)
+        if self.table_filter and self.table_rows_version != transaction_store.version:
+            self.table_rows = self._match_table_filter()
+        self.table_rows_version = transaction_store.version
+
         for item in self.transactions_tree.get_children():
             self.transactions_tree.delete(item)
 
-        # Insert new data
-        for transaction in all_transactions:
-            self.transactions_tree.insert("", tk.END, 
-                                          values=(f"T{transaction['id']}", 
-                                                  ", ".join(transaction['items']), 
-                                                  transaction['count']))
+        n_pages = max(1, -(-self._table_size() // TABLE_PAGE_SIZE))
+        self.table_page = min(max(self.table_page, 0), n_pages - 1)
+
+        # Insert only this page, decoded straight from the store
+        start = self.table_page * TABLE_PAGE_SIZE
+        for position in range(start, min(start + TABLE_PAGE_SIZE, self._table_size())):
+            self._insert_table_row(self._table_store_row(position))
+        self._update_table_page_label()
+
+    def show_table_page(self, page):
+        """Shows page `page` (0-based, clamped to the pages there are)."""
+        self.table_page = page
+        self.render_transactions_table()
+
+    def show_last_table_page(self):
+        self.show_table_page(max(0, -(-self._table_size() // TABLE_PAGE_SIZE) - 1))
+
+    def append_transaction_row(self, row):
+        """
+        Shows a newly created transaction without redrawing the table: its row
+        is added to the filter matches if it qualifies, inserted if it falls on
+        the last page being shown, and the table jumps to the last page otherwise.
+        """
+        if self.table_filter:
+            names = {name.lower() for name in transaction_store.transaction(row)[1]}
+            if not all(name in names for name in self.table_filter):
+                self.table_rows_version = transaction_store.version
+                self._update_table_page_label()
+                return
+            self.table_rows = np.append(self.table_rows, row)
+        self.table_rows_version = transaction_store.version
+
+        position = self._table_size() - 1
+        shown = len(self.transactions_tree.get_children())
+        if position // TABLE_PAGE_SIZE == self.table_page and shown == position % TABLE_PAGE_SIZE:
+            self._insert_table_row(row)
+            self._update_table_page_label()
+        else:
+            self.show_last_table_page()
+
+    def apply_table_filter(self):
+        """Filters the table to transactions containing every comma-separated item in the filter box."""
+        self.table_filter = [name.strip().lower() for name in self.table_filter_var.get().split(',')
+                             if name.strip()]
+        self.table_rows = self._match_table_filter() if self.table_filter else None
+        self.table_rows_version = transaction_store.version
+        self.show_table_page(0)
+
+    def clear_table_filter(self):
+        self.table_filter_var.set("")
+        self.apply_table_filter()
             
     def load_valid_products_list(self, filepath):
         """
@@ -324,16 +401,9 @@ class SupermarketApp:
         the VALID_PRODUCTS_SET for validation.
         """
         try:
-            # Load the inventory CSV. We assume 'product_name' is in the second column (index 1) 
-            df_inventory = pd.read_csv(filepath, encoding='utf-8')
-            
-            # --- Standardize and Collect Product Names ---
-            # Access the 'product_name' column (or second column if no header)
-            # Convert all product names to lowercase and strip whitespace
-            valid_names = df_inventory.iloc[:, 1].astype(str).str.strip().str.lower()
-
-            # Populate the class set with unique, standardized names
-            self.VALID_PRODUCTS_SET = set(valid_names)
+            # Load the inventory CSV. We assume 'product_name' is in the second column (index 1),
+            # standardized to lowercase with whitespace stripped
+            self.VALID_PRODUCTS_SET = ingest.read_valid_products(filepath)
 
             print(f"Loaded {len(self.VALID_PRODUCTS_SET)} unique valid products for validation.")
             if hasattr(self, 'product_choice'):
@@ -387,251 +457,117 @@ class SupermarketApp:
         self.import_status_label.config(text=status_text, fg='darkgreen')
 
 
-    # --APRIORI ALGORITHM IMPLEMENTATION--
-
-    def _apriori_gen(self, Lk_minus_1):
-        """Generates candidate k-itemsets (Ck) from frequent (k-1)-itemsets (Lk-1)."""
-        Ck = set()
-        list_Lk_minus_1 = sorted([tuple(sorted(t)) for t in Lk_minus_1]) # Ensure sorted tuples
+    # --BACKGROUND JOBS--
 
-        if not list_Lk_minus_1:
-            return Ck
-
-        k = len(list_Lk_minus_1[0]) + 1
-        
-        # Join Step: Combine every pair of itemsets Lk-1
-        for i in range(len(list_Lk_minus_1)):
-            for j in range(i + 1, len(list_Lk_minus_1)):
-                L1 = list(list_Lk_minus_1[i])
-                L2 = list(list_Lk_minus_1[j])
-                
-                # Check if the first (k-2) items are the same
-                if L1[:-1] == L2[:-1]:
-                    candidate = tuple(sorted(set(L1) | set(L2)))
-                    
-                    # Pruning Step: Check if all (k-1) subsets of the candidate are in Lk-1
-                    is_valid = True
-                    for subset_tuple in itertools.combinations(candidate, k - 1):
-                        if subset_tuple not in Lk_minus_1:
-                            is_valid = False
-                            break
-                    
-                    if is_valid:
-                        Ck.add(candidate)
-                        
-        return Ck
-    
-    def run_apriori(self, min_support_ratio=0.2, min_confidence=0.5):
+    def start_job(self, label, function, *args, on_done=None, **kwargs):
         """
-        Executes the Apriori algorithm with simplified core logic using TID-sets 
-        for fast support counting.
+        Runs function(*args, **kwargs) on the mining thread. Progress is shown
+        in the status bar and on_done(result) is called on the Tk thread.
         """
-        transaction_items = [t['items'] for t in all_transactions]
-        if not transaction_items:
-            return None, "No transactions available."
-
-        process = psutil.Process(os.getpid())
-        start_time = time.time()
-        start_memory = process.memory_info().rss
-
-        # vertical Data Format Preparation (Used for Efficient Counting)
-        item_transaction_map, N = self._encode_data_vertical(transaction_items)
-        min_support_count = min_support_ratio * N
-        frequent_itemsets = {} 
-
-        # L1 (Frequent 1-Itemsets)
-        L1 = set()
-        for item, tids in item_transaction_map.items():
-            support = len(tids)
-            if support >= min_support_count:
-                item_tuple = tuple([item])
-                L1.add(item_tuple)
-                frequent_itemsets[item_tuple] = support
-        
-        Lk_minus_1 = L1
-        
-        while Lk_minus_1:
-            Ck = self._apriori_gen(Lk_minus_1)
-            Lk = set()
-            
-            for candidate in Ck:
-                candidate_tids = item_transaction_map[candidate[0]].copy() 
-                for item in candidate[1:]:
-                    candidate_tids.intersection_update(item_transaction_map[item])
-                
-                support = len(candidate_tids)
-                
-                if support >= min_support_count:
-                    Lk.add(candidate)
-                    frequent_itemsets[candidate] = support
-            
-            Lk_minus_1 = Lk
+        job = self.jobs.submit(label, function, *args, **kwargs)
+        job.on_done = on_done
+        self.active_jobs.append(job)
+        if len(self.active_jobs) == 1:
+            self._set_busy(True)
+            self.master.after(JOB_POLL_MS, self._poll_jobs)
+        self.job_status_label.config(text=f"{label}...", fg='black')
+        return job
+
+    def _poll_jobs(self):
+        """Shows job progress and finishes completed jobs; reschedules itself while any are running."""
+        for job in list(self.active_jobs):
+            messages = job.poll()
+            if messages and not job.cancelled:
+                self.job_status_label.config(text=f"{job.label}: {messages[-1]}...", fg='black')
+            if not job.done():
+                continue
 
-        # extract Association Rules
-        rules = self._apriori_rules_gen(frequent_itemsets, N, min_confidence)
-        
-        end_time = time.time()
-        end_memory = process.memory_info().rss
-        
-        performance_data = {
-            'Algorithm': 'Apriori', 
-            'Time (ms)': round((end_time - start_time) * 1000, 2), 
-            'Rules Generated': len(rules), 
-            'Memory (MB)': round((end_memory - start_memory) / (1024 * 1024), 2)
-        }
-        return rules, performance_data
-    
-    def _encode_data_vertical(self, transaction_items):
-        """Converts transaction list into vertical TID-set format."""
-        
-        item_transaction_map = defaultdict(set)
-        
-        for t_id, items in enumerate(transaction_items):
-            for item in items:
-                item_transaction_map[item].add(t_id)
-                
-        return item_transaction_map, len(transaction_items)
+            self.active_jobs.remove(job)
+            try:
+                result = job.result()
+            except mining.Cancelled:
+                print(f"[INFO] {job.label} cancelled.")
+                self.job_status_label.config(text=f"{job.label} cancelled.", fg='gray')
+                continue
+            except Exception as e:
+                print(f"{job.label} failed: {e}")
+                self.job_status_label.config(text=f"{job.label} failed.", fg='red')
+                messagebox.showerror("Error", f"{job.label} failed: {e}")
+                continue
 
-    def _eclat_recursive(self, prefix, tid_set_map, N, min_support_count, frequent_sets):
+            self.job_status_label.config(text=f"{job.label} done.", fg='darkgreen')
+            if job.on_done is not None:
+                job.on_done(result)
 
-        for item_A, tid_set_A in tid_set_map.items():
-            
-            candidate_itemset = prefix + (item_A,)
-            
-            # Record the frequent itemset
-            frequent_sets[candidate_itemset] = len(tid_set_A)
-            
-            new_tid_set_map = {}
-            
-            # Find potential extensions (items that appear AFTER item_A in the sorted list)
-            # This is the DFS (depth-first search) traversal
-            sorted_items = sorted(tid_set_map.keys())
-            
-            # Optimization: Only extend with items lexicographically greater than item_A
-            start_index = sorted_items.index(item_A) + 1
-            
-            for item_B in sorted_items[start_index:]:
-                tid_set_B = tid_set_map[item_B]
-                
-                # Efficient Intersection Operation (Support Counting)
-                intersect_tid_set = tid_set_A.intersection(tid_set_B)
-                
-                if len(intersect_tid_set) >= min_support_count:
-                    new_tid_set_map[item_B] = intersect_tid_set
-            
-            # Recurse if the new equivalence class is not empty
-            if new_tid_set_map:
-                self._eclat_recursive(candidate_itemset, new_tid_set_map, N, min_support_count, frequent_sets)
+        if self.active_jobs:
+            self.master.after(JOB_POLL_MS, self._poll_jobs)
+        else:
+            self._set_busy(False)
+
+    def cancel_jobs(self):
+        """Cancels every queued or running job; running ones stop at their next checkpoint."""
+        for job in self.active_jobs:
+            job.cancel()
+        self.job_status_label.config(text="Cancelling...", fg='gray')
+
+    def _set_busy(self, busy):
+        """Starts/stops the activity bar and locks the controls that change the data while mining."""
+        state = tk.DISABLED if busy else tk.NORMAL
+        for button in (self.import_button, self.open_dataset_button):
+            button.config(state=state)
+        self.btn_cancel_job.config(state=tk.NORMAL if busy else tk.DISABLED)
+        if busy:
+            self.job_progress.start(15)
+        else:
+            self.job_progress.stop()
+        self.update_basket_display()
+
+    def on_close(self):
+        self.jobs.shutdown(self.active_jobs)
+        self.master.destroy()
+
+
+    # --MINING (delegates to the headless `mining` engine)--
+
+    def run_apriori(self, min_support_ratio=0.2, min_confidence=0.5):
+        """Runs Apriori over the loaded transactions. Returns (rules, performance_data)."""
+        _, rules, performance_data = self.results_cache.run(
+            'Apriori', transaction_store, min_support_ratio, min_confidence)
+        return rules, performance_data
 
     def run_eclat(self, min_support_ratio=0.2, min_confidence=0.5):
-        """Executes the Eclat algorithm with performance tracking."""
-        
-        transaction_items = [t['items'] for t in all_transactions]
-        if not transaction_items:
-            return None, "No transactions available."
-
-        # Performance Tracking Setup
-        process = psutil.Process(os.getpid())
-        start_time = time.time()
-        start_memory = process.memory_info().rss
-        
-        # vertical Data Format Preparation (TID-sets)
-        item_tid_sets, N = self._encode_data_vertical(transaction_items)
-        min_support_count = min_support_ratio * N
-        frequent_itemsets = {}
-        
-        initial_tid_set_map = {
-            item: tids for item, tids in item_tid_sets.items() 
-            if len(tids) >= min_support_count
-        }
-
-        # executes Recursive DFS
-        self._eclat_recursive(
-            prefix=tuple(), 
-            tid_set_map=initial_tid_set_map, 
-            N=N, 
-            min_support_count=min_support_count, 
-            frequent_sets=frequent_itemsets
-        )
+        """Runs Eclat over the loaded transactions. Returns (rules, performance_data)."""
+        _, rules, performance_data = self.results_cache.run(
+            'Eclat', transaction_store, min_support_ratio, min_confidence)
+        return rules, performance_data
 
-        # extract Association Rules (using the same Apriori rule generation logic)
-        rules = self._apriori_rules_gen(frequent_itemsets, N, min_confidence)
-        
-        # Performance Tracking Finalization
-        end_time = time.time()
-        end_memory = process.memory_info().rss
-        
-        performance_data = {
-            'Algorithm': 'Eclat',
-            'Time (ms)': round((end_time - start_time) * 1000, 2),
-            'Rules Generated': len(rules),
-            'Memory (MB)': round((end_memory - start_memory) / (1024 * 1024), 2),
-            'Support': min_support_ratio,
-            'Confidence': min_confidence
-        }
-        
+    def run_fpgrowth(self, min_support_ratio=0.2, min_confidence=0.5):
+        """Runs FP-Growth over the loaded transactions. Returns (rules, performance_data)."""
+        _, rules, performance_data = self.results_cache.run(
+            'FP-Growth', transaction_store, min_support_ratio, min_confidence)
         return rules, performance_data
-    
-    def _apriori_rules_gen(self, frequent_itemsets, N, min_confidence):
-        """Generates association rules from frequent itemsets based on minimum confidence."""
-        rules = [] # Stores (antecedent, consequent, support, confidence, lift)
-        
-        for itemset, support_count in frequent_itemsets.items():
-            support_itemset = support_count / N
-            
-            # Only interested in itemsets with two or more items (to form a rule A -> B)
-            if len(itemset) < 2:
-                continue
-                
-            # Generate all possible non-empty subsets (antecedents)
-            for k in range(1, len(itemset)):
-                for antecedent_tuple in itertools.combinations(itemset, k):
-                    
-                    antecedent = tuple(sorted(list(antecedent_tuple)))
-                    consequent = tuple(sorted(list(set(itemset) - set(antecedent))))
-                    
-                    # Retrieve support for the antecedent (A)
-                    support_A_count = frequent_itemsets.get(antecedent)
-                    
-                    if support_A_count is None: continue 
-                    
-                    support_A = support_A_count / N
-                    
-                    # Calculate Confidence: Confidence(A -> B) = Support(A U B) / Support(A)
-                    confidence = support_itemset / support_A
-                    
-                    if confidence >= min_confidence:
-                        # Calculate Lift
-                        support_B_count = frequent_itemsets.get(consequent)
-                        support_B = support_B_count / N if support_B_count else 0
-                        
-                        # Lift(A -> B) = Confidence(A -> B) / Support(B)
-                        lift = confidence / support_B if support_B > 0 else 0
-                        
-                        rules.append({
-                            'antecedents': antecedent,
-                            'consequents': consequent,
-                            'support': support_itemset,
-                            'confidence': confidence,
-                            'lift': lift
-                        })
-                            
-        return rules
-    
-    def compare_performance(self, min_support=0.2, min_confidence=0.5):
-        """Runs both algorithms and presents a performance comparison table."""
-        
-        # --- Run Apriori ---
-        apriori_rules, apriori_perf = self.run_apriori(min_support, min_confidence)
-        
-        # --- Run Eclat ---
-        eclat_rules, eclat_perf = self.run_eclat(min_support, min_confidence)
+
+    def compare_performance(self, min_support=0.2, min_confidence=0.5, instrument=False):
+        """
+        Runs every mining algorithm and presents a performance comparison table.
+        Results are served from the results cache when possible. Progress and
+        cancellation come from the job's recorder, not from instrumentation.
+        With instrument=True the algorithms that are not served from the
+        cache are mined with phase timers and counters, and their per-phase
+        breakdown is printed as well.
+        """
         
-        if apriori_perf is None or eclat_perf is None:
-            messagebox.showerror("Error", "Analysis failed. Check console for details.")
-            return
+        # --- Run Apriori, Eclat and FP-Growth ---
+        all_perf = []
+        for name in mining.ALGORITHMS:
+            _, _, perf = self.results_cache.run(name, transaction_store, min_support, min_confidence,
+                                                instrument=instrument)
+            if not isinstance(perf, dict):
+                # Runs on the mining thread: the error dialog is shown by _poll_jobs()
+                raise RuntimeError(f"Analysis failed: {perf}")
+            all_perf.append(perf)
 
-        df_comparison = pd.DataFrame([apriori_perf, eclat_perf])
+        df_comparison = pd.DataFrame(all_perf)
         
         print("\n" + "="*50)
         print("           ALGORITHM PERFORMANCE COMPARISON ")
@@ -640,10 +576,34 @@ class SupermarketApp:
         print("-" * 50)
         
         # Use a simplified text output for the console report
-        print(df_comparison[['Algorithm', 'Rules Generated', 'Time (ms)', 'Memory (MB)']].to_string(index=False))
+        print(df_comparison[['Algorithm', 'Rules Generated', 'Time (ms)', 'Memory (MB)', 'Cached']].to_string(index=False))
         print("="*50)
+
+        if instrument:
+            self.print_instrumentation(all_perf)
         
         return df_comparison
+
+    def print_instrumentation(self, all_perf):
+        """Prints the per-phase timings and counters of instrumented runs, one column per algorithm."""
+        reports = {perf['Algorithm']: perf['Instrumentation'] for perf in all_perf if 'Instrumentation' in perf}
+        if not reports:
+            return
+
+        print("Phase breakdown (ms):")
+        df_phases = pd.DataFrame({name: report['Phases (ms)'] for name, report in reports.items()})
+        print(df_phases.fillna(0).to_string())
+        print("-" * 50)
+
+        print("Counters:")
+        df_counters = pd.DataFrame({name: report['Counters'] for name, report in reports.items()})
+        print(df_counters.fillna(0).astype(int).to_string())
+        print("-" * 50)
+
+        print("Frequent itemsets per level:")
+        df_levels = pd.DataFrame({name: report['Levels'].get('frequent itemsets', {}) for name, report in reports.items()})
+        print(df_levels.fillna(0).astype(int).to_string())
+        print("="*50)
     
     def setup_recommendation_controls(self):
         """Creates ONLY the dropdown and button. Output goes to terminal."""
@@ -683,6 +643,18 @@ class SupermarketApp:
                 self.product_choice['values'] = []
                 self.product_choice.set("No products loaded")
 
+    def get_rule_index(self, min_support_ratio=0.05, min_confidence=0.2):
+        """
+        Returns the recommendation RuleIndex. When the data changed, only the
+        transactions added since the last refresh are mined (IncrementalMiner).
+        """
+        if self.rule_index is None or not self.rule_index.is_current(
+                transaction_store, min_support_ratio, min_confidence, algorithm='Incremental'):
+            _, rules, _ = self.incremental_miner.run(transaction_store, min_support_ratio, min_confidence)
+            self.rule_index = mining.RuleIndex(
+                rules or [], source=(transaction_store.version, min_support_ratio, min_confidence, 'Incremental'))
+        return self.rule_index
+
     def show_recommendations_in_terminal(self):
         # 1. Validation
         selected_product = self.product_choice.get().strip().lower()
@@ -691,45 +663,44 @@ class SupermarketApp:
             print("\n[ERROR] Please select a product from the dropdown first.")
             return
 
-        # 2. Run Algorithm
-        rules, _ = self.run_apriori(min_support_ratio=0.05, min_confidence=0.2)
+        # 2. Get the rule index (mined in the background once per dataset/threshold change)
+        if self.rule_index is not None and self.rule_index.is_current(
+                transaction_store, 0.05, 0.2, algorithm='Incremental'):
+            self.print_recommendations(selected_product, self.rule_index)
+        else:
+            self.start_job("Mining recommendation rules", self.get_rule_index,
+                           min_support_ratio=0.05, min_confidence=0.2,
+                           on_done=lambda rule_index: self.print_recommendations(selected_product, rule_index))
 
-        if not rules:
+    def print_recommendations(self, selected_product, rule_index):
+        """Prints the recommendation report for one product from a RuleIndex."""
+        if not rule_index.n_rules:
             print("\n[INFO] No rules generated. Try importing a larger CSV or lowering support.")
-            print(f"[DEBUG] Total transactions: {len(all_transactions)}")
+            print(f"[DEBUG] Total transactions: {len(transaction_store)}")
             return
 
-        # 3. Filter Rules and Keep Only the BEST rule for each consequent product
-        best_recommendations = {}  # Dictionary: product -> best_rule_data
-        
-        for rule in rules:
-            if selected_product in rule['antecedents']:
-                for assoc_prod in rule['consequents']:
-                    conf_val = rule['confidence'] * 100
-                    
-                    # If this product isn't in our dict yet, OR if this rule has better confidence
-                    if assoc_prod not in best_recommendations or conf_val > best_recommendations[assoc_prod]['conf']:
-                        # Visual Bar Logic for Terminal
-                        if conf_val >= 70:
-                            bar_visual = "#" * 10 + " (Strong)"
-                        elif conf_val >= 50:
-                            bar_visual = "#" * 6 + " (Moderate)"
-                        else:
-                            bar_visual = "#" * 4 + " (Weak)"
-                        
-                        best_recommendations[assoc_prod] = {
-                            'prod': assoc_prod.title(), 
-                            'conf': conf_val, 
-                            'conf_str': round(conf_val, 1),
-                            'bar': bar_visual,
-                            'support': rule['support'],
-                        }
-
-        # 4. Convert to list and Sort by confidence
-        recommendations = list(best_recommendations.values())
-        recommendations.sort(key=lambda x: x['conf'], reverse=True)
-
-        # 5. PRINT TO TERMINAL
+        # 3. Best rule for each consequent product, already sorted by confidence
+        recommendations = []
+        for assoc_prod, rule in rule_index.lookup(selected_product):
+            conf_val = rule['confidence'] * 100
+
+            # Visual Bar Logic for Terminal
+            if conf_val >= 70:
+                bar_visual = "#" * 10 + " (Strong)"
+            elif conf_val >= 50:
+                bar_visual = "#" * 6 + " (Moderate)"
+            else:
+                bar_visual = "#" * 4 + " (Weak)"
+
+            recommendations.append({
+                'prod': assoc_prod.title(),
+                'conf': conf_val,
+                'conf_str': round(conf_val, 1),
+                'bar': bar_visual,
+                'support': rule['support'],
+            })
+
+        # 4. PRINT TO TERMINAL
         print("\n" + "="*60)
         print(f" RECOMMENDATION REPORT FOR: {selected_product.title()}")
         print("="*60)
@@ -752,13 +723,11 @@ class SupermarketApp:
         else:
             print("No significant associations found for this product.")
             print(f"\n[DEBUG INFO]")
-            print(f"- Total rules generated: {len(rules)}")
+            print(f"- Total rules generated: {rule_index.n_rules}")
             print(f"- Looking for '{selected_product}' in antecedents")
             
             # Show what products ARE in the rules
-            all_antecedents = set()
-            for rule in rules:
-                all_antecedents.update(rule['antecedents'])
+            all_antecedents = rule_index.antecedent_items
             
             if all_antecedents:
                 print(f"- Products with associations: {', '.join(sorted(all_antecedents))}")
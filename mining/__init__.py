@@ -0,0 +1,41 @@
+"""
+Headless association rule mining engine.
+
+Nothing in this package imports tkinter, so it can be used from batch
+workers, process pools, servers or a profiler without a Tk root.
+"""
+
+from mining.engine import (ALGORITHMS, run_algorithm, run_approximate, run_apriori, run_eclat, run_fpgrowth,
+                           run_topk)
+from mining.apriori import apriori
+from mining.eclat import eclat
+from mining.fpgrowth import fp_growth
+from mining.rules import RuleTable, apriori_rules_gen
+from mining.rule_index import RuleIndex
+from mining.cache import ResultCache
+from mining.incremental import IncrementalMiner
+from mining.instrument import Instrumentation
+from mining.jobs import Cancelled, JobRunner
+from mining.store import TransactionStore
+
+__all__ = [
+    'ALGORITHMS',
+    'run_algorithm',
+    'run_apriori',
+    'run_eclat',
+    'run_fpgrowth',
+    'run_topk',
+    'run_approximate',
+    'apriori',
+    'eclat',
+    'fp_growth',
+    'apriori_rules_gen',
+    'RuleTable',
+    'RuleIndex',
+    'ResultCache',
+    'IncrementalMiner',
+    'Instrumentation',
+    'JobRunner',
+    'Cancelled',
+    'TransactionStore',
+]
@@ -0,0 +1,217 @@
+from collections import defaultdict
+
+import numpy as np
+
+from mining import instrument
+from mining.bitset import count_candidates, encode_data_bitset, popcount
+from mining.hashtree import HashTree, ItemsetTrie
+from mining.vertical import BACKENDS, encode_data_vertical
+
+# Apriori can also count horizontally, one pass over the baskets per level
+# through a hash tree of the candidates
+APRIORI_BACKENDS = BACKENDS + ('hashtree',)
+
+# Support counting reports to the instrumentation recorder after this many
+# candidates (or baskets), so a background job can be cancelled mid-level
+_REPORT_EVERY = 4096
+
+
+# --APRIORI ALGORITHM IMPLEMENTATION--
+
+def apriori_gen(Lk_minus_1, recorder=None):
+    """
+    Generates candidate k-itemsets (Ck) from frequent (k-1)-itemsets (Lk-1),
+    given as sorted tuples. Returns the candidates as a sorted list.
+    A recorder (mining.instrument) is told how many were joined and pruned.
+    """
+    Ck = []
+    if not Lk_minus_1:
+        return Ck
+    joined = 0
+
+    # Group itemsets by their (k-2)-prefix: only siblings in a group can be joined
+    prefix_groups = defaultdict(list)
+    for itemset in Lk_minus_1:
+        prefix_groups[itemset[:-1]].append(itemset[-1])
+
+    # Trie index of Lk-1 for the pruning step
+    trie = ItemsetTrie(Lk_minus_1)
+
+    for prefix in sorted(prefix_groups):
+        last_items = sorted(prefix_groups[prefix])
+        joined += len(last_items) * (len(last_items) - 1) // 2
+
+        # Join Step: every pair of siblings (a < b) gives prefix + (a, b)
+        for i, item_a in enumerate(last_items):
+            for item_b in last_items[i + 1:]:
+                candidate = prefix + (item_a, item_b)
+
+                # Pruning Step: the subsets dropping item_a or item_b are the two
+                # siblings themselves, so only those dropping a prefix item are checked
+                is_valid = True
+                for j in range(len(prefix)):
+                    if candidate[:j] + candidate[j + 1:] not in trie:
+                        is_valid = False
+                        break
+
+                if is_valid:
+                    Ck.append(candidate)
+
+    if recorder is not None:
+        recorder.count('candidates joined', joined)
+        recorder.count('candidates pruned', joined - len(Ck))
+    return Ck
+
+
+def _generate_level(Lk_minus_1, recorder):
+    """apriori_gen() timed and counted as one level of the search."""
+    with recorder.phase('candidate generation'):
+        Ck = apriori_gen(Lk_minus_1, recorder)
+    if Ck:
+        recorder.level('candidates', len(Ck[0]), len(Ck))
+    return Ck
+
+
+def apriori(store, min_support_ratio=0.2, backend='tidset'):
+    """
+    Finds all frequent itemsets of a TransactionStore with the Apriori
+    algorithm. `backend` selects how supports are counted: vertically with
+    TID-sets ('tidset') or bitsets ('bitset'), or horizontally with a hash
+    tree of the candidates ('hashtree').
+
+    Returns (frequent_itemsets, N) where frequent_itemsets maps sorted tuples
+    of item ids to their absolute support count.
+    """
+    if backend not in APRIORI_BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}'. Choose from: {', '.join(APRIORI_BACKENDS)}")
+    if backend == 'bitset':
+        return _apriori_bitset(store, min_support_ratio)
+    if backend == 'hashtree':
+        return _apriori_hashtree(store, min_support_ratio)
+
+    recorder = instrument.active()
+
+    # vertical Data Format Preparation (Used for Efficient Counting)
+    with recorder.phase('encode'):
+        item_transaction_map, N = encode_data_vertical(store)
+    min_support_count = min_support_ratio * N
+    frequent_itemsets = {}
+
+    # L1 (Frequent 1-Itemsets)
+    L1 = set()
+    for item, tids in item_transaction_map.items():
+        support = len(tids)
+        if support >= min_support_count:
+            item_tuple = tuple([item])
+            L1.add(item_tuple)
+            frequent_itemsets[item_tuple] = support
+
+    Lk_minus_1 = L1
+
+    while Lk_minus_1:
+        Ck = _generate_level(Lk_minus_1, recorder)
+        Lk = set()
+
+        with recorder.phase('support counting'):
+            for start in range(0, len(Ck), _REPORT_EVERY):
+                block = Ck[start:start + _REPORT_EVERY]
+                for candidate in block:
+                    candidate_tids = item_transaction_map[candidate[0]].copy()
+                    for item in candidate[1:]:
+                        candidate_tids.intersection_update(item_transaction_map[item])
+
+                    support = len(candidate_tids)
+
+                    if support >= min_support_count:
+                        Lk.add(candidate)
+                        frequent_itemsets[candidate] = support
+                recorder.count('intersections', len(block) * (len(block[0]) - 1))
+
+        Lk_minus_1 = Lk
+
+    return frequent_itemsets, N
+
+
+def _apriori_bitset(store, min_support_ratio):
+    """Apriori level loop where each level's candidates are counted in one vectorized batch."""
+    recorder = instrument.active()
+    min_support_count = min_support_ratio * len(store)
+    with recorder.phase('encode'):
+        item_ids, bits, N = encode_data_bitset(store, min_support_count)
+
+    # L1 straight from the bitset popcounts; row_of maps item id -> bitset row
+    frequent_itemsets = {(int(item),): int(support)
+                         for item, support in zip(item_ids, popcount(bits))}
+    row_of = {int(item): row for row, item in enumerate(item_ids)}
+
+    Lk_minus_1 = set(frequent_itemsets)
+
+    while Lk_minus_1:
+        Ck = _generate_level(Lk_minus_1, recorder)
+        if not Ck:
+            break
+
+        supports = []
+        with recorder.phase('support counting'):
+            for start in range(0, len(Ck), _REPORT_EVERY):
+                block = Ck[start:start + _REPORT_EVERY]
+                candidate_rows = np.array([[row_of[item] for item in candidate] for candidate in block])
+                supports.extend(count_candidates(bits, candidate_rows).tolist())
+                recorder.count('intersections', len(block) * (len(block[0]) - 1))
+
+        Lk = set()
+        for candidate, support in zip(Ck, supports):
+            if support >= min_support_count:
+                Lk.add(candidate)
+                frequent_itemsets[candidate] = support
+
+        Lk_minus_1 = Lk
+
+    return frequent_itemsets, N
+
+
+def _apriori_hashtree(store, min_support_ratio):
+    """Horizontal Apriori: each level is counted in one pass over the baskets through a HashTree."""
+    recorder = instrument.active()
+    N = len(store)
+    min_support_count = min_support_ratio * N
+
+    with recorder.phase('encode'):
+        items, _, _ = store.arrays()
+        supports = np.bincount(items, minlength=store.n_items).tolist()
+        del items
+
+        frequent_itemsets = {(item,): support for item, support in enumerate(supports)
+                             if support and support >= min_support_count}
+
+        # Baskets trimmed to frequent items; no infrequent item can be in a candidate
+        frequent_items = {itemset[0] for itemset in frequent_itemsets}
+        baskets = [basket for basket in
+                   ([item for item in basket if item in frequent_items] for basket in store.iter_baskets())
+                   if len(basket) >= 2]
+
+    Lk_minus_1 = set(frequent_itemsets)
+
+    while Lk_minus_1:
+        Ck = _generate_level(Lk_minus_1, recorder)
+        if not Ck:
+            break
+
+        k = len(Ck[0])
+        with recorder.phase('support counting'):
+            tree = HashTree(Ck)
+            baskets = [basket for basket in baskets if len(basket) >= k]
+            for start in range(0, len(baskets), _REPORT_EVERY):
+                for basket in baskets[start:start + _REPORT_EVERY]:
+                    tree.add_basket(basket)
+                recorder.count('basket scans', min(_REPORT_EVERY, len(baskets) - start))
+
+        Lk = set()
+        for candidate, support in tree.counts.items():
+            if support >= min_support_count:
+                Lk.add(candidate)
+                frequent_itemsets[candidate] = support
+
+        Lk_minus_1 = Lk
+
+    return frequent_itemsets, N
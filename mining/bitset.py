@@ -0,0 +1,142 @@
+"""
+Packed bit-array vertical representation.
+
+Each item's TID-list is a row of uint64 words where bit `t` is set when
+transaction row `t` contains the item, i.e. 1 bit per transaction instead
+of a Python int inside a set. Support counting is a vectorized AND over
+whole words followed by a popcount.
+"""
+
+import numpy as np
+
+from mining import instrument
+
+# Byte -> number of set bits, for NumPy builds without np.bitwise_count (< 2.0)
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+# Upper bound on the temporary AND buffer built while counting a batch of candidates
+_BATCH_BYTES = 64 * 1024 * 1024
+
+
+def popcount(words):
+    """Number of set bits along the last axis of a uint64 array."""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    as_bytes = words.view(np.uint8).reshape(words.shape[:-1] + (-1,))
+    return _POPCOUNT_TABLE[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+def encode_data_bitset(store, min_support_count=0):
+    """
+    Converts a TransactionStore into packed bitsets, keeping only items whose
+    support reaches min_support_count.
+
+    Returns (item_ids, bits, N): bits[i] is the bitset of item item_ids[i],
+    and item_ids is sorted ascending.
+    """
+    items, offsets, _ = store.arrays()
+    N = len(store)
+    n_words = (N + 63) // 64
+
+    supports = np.bincount(items, minlength=store.n_items)
+    item_ids = np.flatnonzero(supports >= max(min_support_count, 1))
+
+    # Row position of every kept item id, -1 for dropped ones
+    position = np.full(store.n_items, -1, dtype=np.int64)
+    position[item_ids] = np.arange(len(item_ids))
+
+    rows = np.repeat(np.arange(N, dtype=np.int64), np.diff(offsets))
+    item_rows = position[items]
+    keep = item_rows >= 0
+    rows, item_rows = rows[keep], item_rows[keep]
+
+    bits = np.zeros((len(item_ids), n_words), dtype=np.uint64)
+    np.bitwise_or.at(bits, (item_rows, rows >> 6),
+                     np.left_shift(np.uint64(1), (rows & 63).astype(np.uint64)))
+    return item_ids, bits, N
+
+
+def count_candidates(bits, candidates):
+    """
+    Supports of many candidates at once. `candidates` is a (C, k) array of
+    row indices into `bits`; returns an int64 array of length C.
+    """
+    candidates = np.asarray(candidates, dtype=np.int64)
+    if not len(candidates):
+        return np.zeros(0, dtype=np.int64)
+
+    batch = max(1, _BATCH_BYTES // max(1, bits.shape[1] * 8))
+    supports = np.empty(len(candidates), dtype=np.int64)
+    for start in range(0, len(candidates), batch):
+        chunk = candidates[start:start + batch]
+        acc = bits[chunk[:, 0]]
+        for col in range(1, chunk.shape[1]):
+            acc &= bits[chunk[:, col]]
+        supports[start:start + batch] = popcount(acc)
+    return supports
+
+
+def eclat_bitset_recursive(prefix, class_items, class_bits, supports, min_support_count, frequent_sets):
+    """
+    Eclat DFS over one equivalence class held as bitsets: class_items[i] is
+    an item id, class_bits[i] the bitset of prefix + (class_items[i],) and
+    supports[i] its support.
+    """
+    instrument.active().count('intersections', len(class_items) * (len(class_items) - 1) // 2)
+    for i in range(len(class_items)):
+        eclat_bitset_extend(prefix, class_items, class_bits, supports, i, min_support_count, frequent_sets)
+
+
+def eclat_bitset_extend(prefix, class_items, class_bits, supports, i, min_support_count, frequent_sets):
+    """
+    One step of eclat_bitset_recursive(): records prefix + (class_items[i],)
+    and mines every itemset extending it with the later class members.
+    """
+    candidate_itemset = prefix + (int(class_items[i]),)
+    frequent_sets[candidate_itemset] = int(supports[i])
+
+    if i + 1 == len(class_items):
+        return
+
+    # AND item_A against every later sibling in one vectorized step
+    extensions = class_bits[i + 1:] & class_bits[i]
+    extension_supports = popcount(extensions)
+    keep = extension_supports >= min_support_count
+
+    if keep.any():
+        eclat_bitset_recursive(candidate_itemset, class_items[i + 1:][keep], extensions[keep],
+                               extension_supports[keep], min_support_count, frequent_sets)
+
+
+class BitsetCounter:
+    """Counts the supports of arbitrary itemsets in a store, building its bitsets on first use."""
+
+    def __init__(self, store):
+        self.store = store
+        self.bits = None
+        self.position = None    # item id -> bitset row, -1 if the item never occurs
+
+    def supports(self, itemsets):
+        """Supports of same-size itemsets given as a (C, k) array of item ids."""
+        if self.bits is None:
+            item_ids, self.bits, _ = encode_data_bitset(self.store)
+            self.position = np.full(self.store.n_items, -1, dtype=np.int64)
+            self.position[item_ids] = np.arange(len(item_ids))
+
+        rows = self.position[np.asarray(itemsets, dtype=np.int64)]
+        # An itemset with an item that never occurs here has support 0
+        present = (rows >= 0).all(axis=1)
+        supports = np.zeros(len(rows), dtype=np.int64)
+        supports[present] = count_candidates(self.bits, rows[present])
+        return supports
+
+    def count(self, itemsets):
+        """Returns {itemset: support} for a list of sorted item-id tuples of any sizes."""
+        by_size = {}
+        for itemset in itemsets:
+            by_size.setdefault(len(itemset), []).append(itemset)
+
+        counts = {}
+        for group in by_size.values():
+            counts.update(zip(group, self.supports(group).tolist()))
+        return counts
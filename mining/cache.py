@@ -0,0 +1,183 @@
+"""
+Memoized mining results.
+
+ResultCache keeps the frequent itemsets and rules of recent runs, keyed by
+a content fingerprint of the dataset plus (algorithm, options), with the
+support and confidence recorded per entry. Entries are evicted least
+recently used first once either the entry count or the estimated memory
+exceeds its limit.
+
+Frequent itemsets are monotone in the support threshold. A run at support
+s0 contains every itemset that is frequent at any s >= s0, with the same
+counts. A query at a higher support is therefore answered by filtering a
+cached run and regenerating rules, with no re-mining. The same holds for
+closed itemsets. Maximal itemsets are not monotone, and their rules need
+the data, so mode='maximal' runs are only reused for the exact same
+thresholds.
+"""
+
+import hashlib
+import sys
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from mining.engine import as_store, run_algorithm
+from mining.condensed import condensed_rules_gen
+
+DEFAULT_MAX_ENTRIES = 32
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Rough per-object costs used by the memory estimate
+_RULE_BYTES = 40        # one RuleTable row (five 8-byte columns)
+_DICT_SLOT_BYTES = 100  # dict slot + int count
+
+# Store versions whose fingerprint is remembered (every new transaction is a new version)
+_MAX_FINGERPRINTS = 8
+
+
+def fingerprint(store):
+    """Content hash of a TransactionStore (item dictionary, baskets and ids)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update('\0'.join(store.item_names).encode('utf-8'))
+    for column in store.arrays():
+        digest.update(np.ascontiguousarray(column).data)
+    return digest.hexdigest()
+
+
+def _estimate_bytes(frequent_itemsets, rules_by_confidence):
+    itemset_bytes = sum(sys.getsizeof(itemset) + _DICT_SLOT_BYTES for itemset in frequent_itemsets)
+    n_rules = sum(len(rules) for rules in rules_by_confidence.values())
+    return itemset_bytes + n_rules * _RULE_BYTES
+
+
+class _Entry:
+    __slots__ = ('support', 'N', 'frequent_itemsets', 'rules_by_confidence', 'performance_data', 'nbytes')
+
+    def __init__(self, support, N, frequent_itemsets, performance_data):
+        self.support = support
+        self.N = N
+        self.frequent_itemsets = frequent_itemsets
+        self.rules_by_confidence = {}
+        self.performance_data = performance_data
+        self.nbytes = 0
+
+
+class ResultCache:
+    """LRU, memory-bounded cache of mining results with monotone support reuse."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()    # (fingerprint, algorithm, options, support) -> _Entry
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._fingerprints = {}         # store version -> fingerprint
+
+    def _fingerprint(self, store):
+        key = self._fingerprints.get(store.version)
+        if key is None:
+            key = fingerprint(store)
+            if len(self._fingerprints) >= _MAX_FINGERPRINTS:
+                del self._fingerprints[next(iter(self._fingerprints))]
+            self._fingerprints[store.version] = key
+        return key
+
+    def _find(self, dataset_key, min_support_ratio, exact=False):
+        """Cached entry with the highest support <= min_support_ratio (or equal if exact), or None."""
+        best = None
+        for key, entry in self.entries.items():
+            if exact and entry.support != min_support_ratio:
+                continue
+            if key[:3] == dataset_key and entry.support <= min_support_ratio:
+                if best is None or entry.support > best[1].support:
+                    best = (key, entry)
+        return best
+
+    def _store(self, key, entry):
+        replaced = self.entries.pop(key, None)
+        if replaced is not None:
+            self.nbytes -= replaced.nbytes
+        self.entries[key] = entry
+        self.nbytes += entry.nbytes
+        while len(self.entries) > self.max_entries or (self.nbytes > self.max_bytes and len(self.entries) > 1):
+            _, evicted = self.entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+
+    def _resize(self, entry):
+        self.nbytes -= entry.nbytes
+        entry.nbytes = _estimate_bytes(entry.frequent_itemsets, entry.rules_by_confidence)
+        self.nbytes += entry.nbytes
+
+    def run(self, algorithm, transactions, min_support_ratio=0.2, min_confidence=0.5, **options):
+        """
+        Same as run_algorithm(), but served from the cache when possible.
+
+        performance_data gains a 'Cached' flag. On a hit it is a copy of the
+        original run's data with Support, Confidence, Rules Generated and
+        Time (ms) (the filtering time) updated for this query.
+
+        instrument=... only applies to a miss: a hit is still served from the
+        cache, and its performance_data has no 'Instrumentation' entry.
+        """
+        store = as_store(transactions)
+        if not len(store):
+            return None, None, "No transactions available."
+        instrument = options.pop('instrument', False)
+
+        dataset_key = (self._fingerprint(store), algorithm, tuple(sorted(options.items())))
+        # Maximal itemsets at a lower support are not a superset of those at a higher one
+        mode = options.get('mode', 'all')
+        found = self._find(dataset_key, min_support_ratio, exact=mode == 'maximal')
+        if found is not None and mode == 'maximal' and min_confidence not in found[1].rules_by_confidence:
+            found = None
+
+        if found is None:
+            self.misses += 1
+            frequent_itemsets, rules, performance_data = run_algorithm(
+                algorithm, store, min_support_ratio, min_confidence, instrument=instrument, **options)
+            if not isinstance(performance_data, dict):
+                return frequent_itemsets, rules, performance_data
+
+            # Hits report their own timing, not the instrumented run's
+            entry = _Entry(min_support_ratio, len(store), frequent_itemsets,
+                           {key: value for key, value in performance_data.items() if key != 'Instrumentation'})
+            entry.rules_by_confidence[min_confidence] = rules
+            entry.nbytes = _estimate_bytes(frequent_itemsets, entry.rules_by_confidence)
+            self._store(dataset_key + (min_support_ratio,), entry)
+            return dict(frequent_itemsets), rules, dict(performance_data, Cached=False)
+
+        key, entry = found
+        self.hits += 1
+        self.entries.move_to_end(key)
+        start_time = time.time()
+
+        # Always a new dict, so callers that filter the result do not change the cached one
+        if entry.support != min_support_ratio:
+            min_support_count = min_support_ratio * entry.N
+            frequent_itemsets = {itemset: count for itemset, count in entry.frequent_itemsets.items()
+                                 if count >= min_support_count}
+            rules = condensed_rules_gen(store, frequent_itemsets, entry.N, min_confidence, mode)
+        else:
+            frequent_itemsets = dict(entry.frequent_itemsets)
+            rules = entry.rules_by_confidence.get(min_confidence)
+            if rules is None:
+                rules = condensed_rules_gen(store, frequent_itemsets, entry.N, min_confidence, mode)
+                entry.rules_by_confidence[min_confidence] = rules
+                self._resize(entry)
+
+        performance_data = dict(entry.performance_data,
+                                **{'Time (ms)': round((time.time() - start_time) * 1000, 2),
+                                   'Rules Generated': len(rules),
+                                   'Support': min_support_ratio,
+                                   'Confidence': min_confidence,
+                                   'Cached': True})
+        return frequent_itemsets, rules, performance_data
+
+    def clear(self):
+        """Drops every cached result."""
+        self.entries.clear()
+        self._fingerprints.clear()
+        self.nbytes = 0
@@ -0,0 +1,265 @@
+"""
+Condensed and threshold-free mining modes.
+
+closed   - itemsets with no superset of the same support (CHARM). Lossless:
+           the support of any frequent itemset is the largest support of a
+           closed itemset containing it.
+maximal  - frequent itemsets with no frequent superset. The smallest output
+           that still describes the frequent itemsets, but the supports of
+           their subsets are lost.
+top-K    - the K most frequent itemsets, without choosing a support: the
+           threshold starts at 1 and is raised to the K-th best support
+           found so far while the search runs.
+
+Rules can be generated from each output. Closed itemsets supply subset
+supports through their closures, and maximal ones count the subsets they
+need against the data.
+"""
+
+import heapq
+
+import numpy as np
+
+from mining import instrument
+from mining.bitset import BitsetCounter, encode_data_bitset, popcount
+from mining.rules import apriori_rules_gen, rules_for_itemsets
+from mining.vertical import encode_data_vertical
+
+MODES = ('all', 'closed', 'maximal')
+
+
+def check_mode(mode):
+    """Raises ValueError for an unknown itemset mode."""
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode '{mode}'. Choose from: {', '.join(MODES)}")
+
+
+# --CHARM (CLOSED ITEMSETS)--
+
+def charm(store, min_support_ratio=0.2):
+    """
+    Finds the closed frequent itemsets with CHARM (Zaki & Hsiao): Eclat over
+    itemset/TID-set pairs where a pair whose TID-set is contained in a
+    sibling's absorbs that sibling's items instead of branching.
+
+    Returns (closed_itemsets, N) in the same shape as eclat().
+    """
+    recorder = instrument.active()
+    with recorder.phase('encode'):
+        item_tid_sets, N = encode_data_vertical(store)
+    min_support_count = min_support_ratio * N
+
+    # Ascending support: rare items absorb their frequent siblings early
+    members = sorted(([[item], tids] for item, tids in item_tid_sets.items()
+                      if len(tids) >= min_support_count),
+                     key=lambda member: (len(member[1]), member[0]))
+    closed_itemsets = {}
+    with recorder.phase('search'):
+        _charm_extend((), members, min_support_count, closed_itemsets, {})
+    return closed_itemsets, N
+
+
+def _charm_extend(prefix, members, min_support_count, closed_itemsets, seen):
+    """
+    Mines one class. Each member is [items, tids] for the itemset
+    prefix + items. `seen` maps (support, sum of TIDs) to the closed
+    itemsets found with that TID-set signature, for the subsumption check.
+    """
+    for i in range(len(members)):
+        if members[i] is None:
+            continue
+        items_i, tids_i = members[i]
+        children = []
+
+        for j in range(i + 1, len(members)):
+            if members[j] is None:
+                continue
+            items_j, tids_j = members[j]
+            tids = tids_i & tids_j
+            if len(tids) < min_support_count:
+                continue
+
+            if len(tids) == len(tids_i) and len(tids) == len(tids_j):
+                # t(Xi) = t(Xj): Xj always occurs with Xi, merge and drop Xj
+                items_i = items_i + items_j
+                members[j] = None
+            elif len(tids) == len(tids_i):
+                # t(Xi) within t(Xj): every transaction of Xi also has Xj
+                items_i = items_i + items_j
+            elif len(tids) == len(tids_j):
+                # t(Xj) within t(Xi): Xj only survives as a child of Xi
+                members[j] = None
+                children.append([items_j, tids])
+            else:
+                children.append([items_j, tids])
+
+        itemset = prefix + tuple(items_i)
+        if children:
+            children.sort(key=lambda child: len(child[1]))
+            _charm_extend(itemset, children, min_support_count, closed_itemsets, seen)
+
+        # Closed unless a closed superset with the same TID-set was already found
+        support = len(tids_i)
+        signature = (support, sum(tids_i))
+        itemset_set = frozenset(itemset)
+        if not any(itemset_set <= found for found in seen.get(signature, ())):
+            seen.setdefault(signature, []).append(itemset_set)
+            closed_itemsets[tuple(sorted(itemset))] = support
+
+
+# --FILTERS OVER A FULL FREQUENT ITEMSET DICTIONARY--
+
+def closed_itemsets(frequent_itemsets):
+    """
+    Keeps the closed itemsets of a downward-closed frequent itemset dict
+    (e.g. from apriori()): those with no one-item-larger superset of equal
+    support. Already-closed input is returned unchanged.
+    """
+    not_closed = set()
+    for itemset, support in frequent_itemsets.items():
+        if len(itemset) < 2:
+            continue
+        for i in range(len(itemset)):
+            subset = itemset[:i] + itemset[i + 1:]
+            if frequent_itemsets.get(subset) == support:
+                not_closed.add(subset)
+    return {itemset: support for itemset, support in frequent_itemsets.items()
+            if itemset not in not_closed}
+
+
+def maximal_itemsets(itemsets):
+    """Keeps the itemsets not strictly contained in another one (works on full or closed output)."""
+    maximal = {}
+    containing = {}     # item -> indexes of maximal itemsets holding it
+    for itemset in sorted(itemsets, key=len, reverse=True):
+        supersets = None
+        for item in itemset:
+            holders = containing.get(item, set())
+            supersets = holders if supersets is None else supersets & holders
+            if not supersets:
+                break
+        if supersets:
+            continue
+
+        index = len(maximal)
+        maximal[itemset] = itemsets[itemset]
+        for item in itemset:
+            containing.setdefault(item, set()).add(index)
+    return maximal
+
+
+# --RULES FROM CONDENSED OUTPUTS--
+
+class ClosedSupports:
+    """
+    Support lookup over closed itemsets that answers for any frequent
+    itemset: its support is the largest support of a closed superset.
+    Quacks like the frequent_itemsets dict rules_for_itemsets() expects.
+    """
+
+    def __init__(self, closed):
+        self.closed = closed
+        self.containing = {}    # item -> closed itemsets holding it
+        for itemset in closed:
+            for item in itemset:
+                self.containing.setdefault(item, set()).add(itemset)
+        self.memo = {}
+
+    def get(self, itemset, default=None):
+        support = self.memo.get(itemset)
+        if support is None:
+            supersets = set.intersection(*(self.containing.get(item, set()) for item in itemset))
+            support = max((self.closed[superset] for superset in supersets), default=None)
+            self.memo[itemset] = support
+        return default if support is None else support
+
+    def __getitem__(self, itemset):
+        return self.get(itemset)
+
+
+class CountedSupports:
+    """Support lookup that counts unknown itemsets against the store (for maximal itemsets)."""
+
+    def __init__(self, store, known):
+        self.counter = BitsetCounter(store)
+        self.memo = dict(known)
+
+    def get(self, itemset, default=None):
+        support = self.memo.get(itemset)
+        if support is None:
+            support = int(self.counter.supports([itemset])[0])
+            self.memo[itemset] = support
+        return support
+
+    def __getitem__(self, itemset):
+        return self.get(itemset)
+
+
+def condensed_rules_gen(store, itemsets, N, min_confidence, mode='all'):
+    """
+    Rules from the output of a mining mode. For 'closed' these are the rules
+    whose antecedent and consequent together form a closed itemset. Every
+    other rule has the same support and confidence as one of them. For
+    'maximal' they are the rules within each maximal itemset.
+    """
+    check_mode(mode)
+    if mode == 'all':
+        return apriori_rules_gen(itemsets, N, min_confidence)
+    supports = ClosedSupports(itemsets) if mode == 'closed' else CountedSupports(store, itemsets)
+    sources = [itemset for itemset in itemsets if len(itemset) >= 2]
+    return rules_for_itemsets(sources, supports, N, min_confidence)
+
+
+# --TOP-K--
+
+def topk_itemsets(store, k=10, min_size=1):
+    """
+    The k most frequent itemsets with at least `min_size` items, plus their
+    subsets (so rules can be generated). Ties at the k-th support are all
+    kept. Best-first Eclat over bitsets: extensions are explored in order
+    of descending support, and any whose support falls below the current
+    k-th best is pruned.
+
+    Returns (frequent_itemsets, N) in the same shape as eclat().
+    """
+    if k < 1:
+        raise ValueError(f"k must be at least 1, got {k!r}")
+    recorder = instrument.active()
+    with recorder.phase('encode'):
+        item_ids, bits, N = encode_data_bitset(store)
+        supports = popcount(bits)
+    best = []           # min-heap of the k best supports among itemsets of size >= min_size
+    found = {}
+
+    def threshold():
+        return best[0] if len(best) >= k else 1
+
+    def record(itemset, support):
+        found[tuple(sorted(itemset))] = support
+        if len(itemset) >= min_size:
+            if len(best) < k:
+                heapq.heappush(best, support)
+            elif support > best[0]:
+                heapq.heapreplace(best, support)
+
+    def search(prefix, class_items, class_bits, class_supports):
+        for i in range(len(class_items)):
+            if class_supports[i] < threshold():
+                break
+            itemset = prefix + (int(class_items[i]),)
+            record(itemset, int(class_supports[i]))
+
+            extensions = class_bits[i + 1:] & class_bits[i]
+            extension_supports = popcount(extensions)
+            keep = np.flatnonzero(extension_supports >= threshold())
+            if len(keep):
+                keep = keep[np.argsort(-extension_supports[keep], kind='stable')]
+                search(itemset, class_items[i + 1:][keep], extensions[keep], extension_supports[keep])
+
+    order = np.argsort(-supports, kind='stable')
+    with recorder.phase('search'):
+        search(tuple(), item_ids[order], bits[order], supports[order])
+
+    min_support_count = threshold()
+    return {itemset: support for itemset, support in found.items()
+            if support >= min_support_count}, N
@@ -0,0 +1,143 @@
+"""
+Compact binary file format for a cleaned, integer-encoded TransactionStore.
+
+Layout (little-endian, every array 8-byte aligned):
+
+    header      magic b'TXNSTORE', format version, row count, item count,
+                dictionary length, dictionary byte size
+    dictionary  product names as a UTF-8 JSON list (item id = list position)
+    items       int32[item count]      flat item ids of every basket
+    offsets     int64[row count + 1]   CSR offsets into items
+    ids         int64[row count]       transaction id of every row
+
+open_store() maps the three arrays with np.memmap, so opening a large
+dataset only reads the header and dictionary. Pages are loaded on demand
+and shared between every process that opens the same file.
+"""
+
+import json
+import os
+import struct
+
+import numpy as np
+
+from mining.store import TransactionStore
+
+MAGIC = b'TXNSTORE'
+FORMAT_VERSION = 1
+FILE_EXTENSION = '.tstore'
+
+# magic, version, n_rows, n_item_entries, n_dictionary, dictionary_bytes
+_HEADER = struct.Struct('<8sIqqqq')
+
+
+def _aligned(position):
+    return (position + 7) // 8 * 8
+
+
+def _layout(header):
+    """Byte offsets of the dictionary and the three arrays for a parsed header."""
+    _, _, n_rows, n_entries, _, dictionary_bytes = header
+    dictionary_at = _HEADER.size
+    items_at = _aligned(dictionary_at + dictionary_bytes)
+    offsets_at = _aligned(items_at + 4 * n_entries)
+    ids_at = offsets_at + 8 * (n_rows + 1)
+    return dictionary_at, items_at, offsets_at, ids_at
+
+
+def save_store(store, filepath):
+    """
+    Writes a TransactionStore to `filepath` in the binary format.
+
+    The file is written under a temporary name in the same directory and
+    then moved into place, so saving a store opened with open_store() over
+    its own file never truncates the pages its memory maps are reading.
+    """
+    items, offsets, ids = store.arrays()
+    dictionary = json.dumps(store.item_names, ensure_ascii=False).encode('utf-8')
+
+    header = (MAGIC, FORMAT_VERSION, len(store), len(items), store.n_items, len(dictionary))
+    _, items_at, offsets_at, ids_at = _layout(header)
+
+    tmp_path = f'{filepath}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(_HEADER.pack(*header))
+            f.write(dictionary)
+            for position, array, dtype in ((items_at, items, '<i4'), (offsets_at, offsets, '<i8'),
+                                           (ids_at, ids, '<i8')):
+                f.write(b'\0' * (position - f.tell()))
+                f.write(np.ascontiguousarray(array, dtype=dtype).tobytes())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_header(filepath):
+    """Reads and validates the header. Raises ValueError for a file in another format."""
+    with open(filepath, 'rb') as f:
+        raw = f.read(_HEADER.size)
+    if len(raw) < _HEADER.size or raw[:8] != MAGIC:
+        raise ValueError(f"'{filepath}' is not a transaction store file.")
+    header = _HEADER.unpack(raw)
+    if header[1] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported transaction store format version {header[1]}.")
+    return header
+
+
+def read_item_names(filepath, header=None):
+    """Reads the item dictionary (item id -> product name) of a store file."""
+    header = header or read_header(filepath)
+    n_dictionary, dictionary_bytes = header[4], header[5]
+    with open(filepath, 'rb') as f:
+        f.seek(_layout(header)[0])
+        item_names = json.loads(f.read(dictionary_bytes).decode('utf-8'))
+    if len(item_names) != n_dictionary:
+        raise ValueError(f"'{filepath}' has a corrupt item dictionary.")
+    return item_names
+
+
+def iter_row_chunks(filepath, rows_per_chunk):
+    """
+    Reads the baskets of a store file in blocks of rows_per_chunk rows with
+    plain reads, so only one block is ever in memory (a memory map would
+    keep every page it touched resident). Yields (first_row, items,
+    offsets) with offsets starting at 0 for each block.
+    """
+    header = read_header(filepath)
+    n_rows = header[2]
+    _, items_at, offsets_at, _ = _layout(header)
+    with open(filepath, 'rb') as f:
+        for first_row in range(0, n_rows, rows_per_chunk):
+            n = min(rows_per_chunk, n_rows - first_row)
+            f.seek(offsets_at + 8 * first_row)
+            offsets = np.frombuffer(f.read(8 * (n + 1)), dtype='<i8')
+            f.seek(items_at + 4 * int(offsets[0]))
+            items = np.frombuffer(f.read(4 * int(offsets[-1] - offsets[0])), dtype='<i4')
+            yield first_row, items, offsets - offsets[0]
+
+
+def open_store(filepath, mmap=True):
+    """
+    Opens a file written by save_store(). With mmap=True the columns are
+    read-only memory maps (the store copies them on the first append);
+    otherwise they are read into memory.
+    """
+    header = read_header(filepath)
+    _, _, n_rows, n_entries, _, _ = header
+    _, items_at, offsets_at, ids_at = _layout(header)
+    item_names = read_item_names(filepath, header)
+
+    def column(dtype, offset, length):
+        if mmap and length:
+            return np.memmap(filepath, dtype=dtype, mode='r', offset=offset, shape=(length,))
+        return np.fromfile(filepath, dtype=dtype, count=length, offset=offset)
+
+    return TransactionStore.from_columns(
+        item_names,
+        column('<i4', items_at, n_entries),
+        column('<i8', offsets_at, n_rows + 1),
+        column('<i8', ids_at, n_rows),
+    )
@@ -0,0 +1,162 @@
+from mining import instrument
+from mining.bitset import eclat_bitset_recursive, encode_data_bitset, popcount
+from mining.vertical import check_backend, encode_data_vertical
+
+
+# --ECLAT ALGORITHM IMPLEMENTATION--
+
+def eclat_recursive(prefix, tid_set_map, N, min_support_count, frequent_sets):
+
+    instrument.active().count('intersections', len(tid_set_map) * (len(tid_set_map) - 1) // 2)
+
+    for item_A, tid_set_A in tid_set_map.items():
+
+        candidate_itemset = prefix + (item_A,)
+
+        # Record the frequent itemset
+        frequent_sets[candidate_itemset] = len(tid_set_A)
+
+        new_tid_set_map = {}
+
+        # Find potential extensions (items that appear AFTER item_A in the sorted list)
+        # This is the DFS (depth-first search) traversal
+        sorted_items = sorted(tid_set_map.keys())
+
+        # Optimization: Only extend with items lexicographically greater than item_A
+        start_index = sorted_items.index(item_A) + 1
+
+        for item_B in sorted_items[start_index:]:
+            tid_set_B = tid_set_map[item_B]
+
+            # Efficient Intersection Operation (Support Counting)
+            intersect_tid_set = tid_set_A.intersection(tid_set_B)
+
+            if len(intersect_tid_set) >= min_support_count:
+                new_tid_set_map[item_B] = intersect_tid_set
+
+        # Recurse if the new equivalence class is not empty
+        if new_tid_set_map:
+            eclat_recursive(candidate_itemset, new_tid_set_map, N, min_support_count, frequent_sets)
+
+
+# --dECLAT (DIFFSET) VARIANT--
+
+def declat_recursive(prefix, class_members, use_diffsets, min_support_count, frequent_sets, switch='auto'):
+    """
+    Eclat DFS over diffsets (dEclat). class_members is a list of
+    (item, support, tids) sorted by item, where tids is the TID-set of
+    prefix + (item,) or, when use_diffsets is True, its diffset: the rows
+    containing the prefix but not the item, so support = support(prefix) - |diffset|.
+
+    With switch='auto' a class that still holds TID-sets converts its
+    children to diffsets as soon as they would be smaller than the
+    intersections (i.e. the data is dense at that point of the tree).
+    With switch='always' every class from the second level on uses diffsets.
+    """
+    # Diffset differences are counted as intersections too
+    instrument.active().count('intersections', len(class_members) * (len(class_members) - 1) // 2)
+    for i in range(len(class_members)):
+        declat_extend(prefix, class_members, i, use_diffsets, min_support_count, frequent_sets, switch)
+
+
+def declat_extend(prefix, class_members, i, use_diffsets, min_support_count, frequent_sets, switch='auto'):
+    """
+    One step of declat_recursive(): records prefix + (item i,) and mines
+    every itemset extending it with the later members of the class.
+    """
+    item_A, support_A, tids_A = class_members[i]
+
+    candidate_itemset = prefix + (item_A,)
+    frequent_sets[candidate_itemset] = support_A
+
+    children = []
+
+    if use_diffsets:
+        # d(PAB) = d(PB) - d(PA),  support(PAB) = support(PA) - |d(PAB)|
+        for item_B, _, tids_B in class_members[i + 1:]:
+            diffset = tids_B - tids_A
+            support = support_A - len(diffset)
+            if support >= min_support_count:
+                children.append((item_B, support, diffset))
+        child_diffsets = True
+    else:
+        for item_B, _, tids_B in class_members[i + 1:]:
+            intersect_tid_set = tids_A.intersection(tids_B)
+            if len(intersect_tid_set) >= min_support_count:
+                children.append((item_B, len(intersect_tid_set), intersect_tid_set))
+
+        # Density check: sum of diffset sizes vs. sum of TID-set sizes
+        total_tids = sum(support for _, support, _ in children)
+        total_diffs = support_A * len(children) - total_tids
+        child_diffsets = switch == 'always' or total_diffs < total_tids
+
+        if child_diffsets:
+            # d(PAB) = t(PA) - t(PAB)
+            children = [(item_B, support, tids_A - tids)
+                        for item_B, support, tids in children]
+
+    # Recurse if the new equivalence class is not empty
+    if children:
+        declat_recursive(candidate_itemset, children, child_diffsets,
+                         min_support_count, frequent_sets, switch)
+
+
+def eclat(store, min_support_ratio=0.2, backend='tidset', diffsets='auto'):
+    """
+    Finds all frequent itemsets of a TransactionStore with the Eclat algorithm
+    (depth-first search over TID-set or bitset intersections).
+
+    `diffsets` applies to the tidset backend: False runs plain Eclat, True
+    runs dEclat (diffsets from the second level on) and 'auto' switches each
+    equivalence class to diffsets once the data there is dense enough for
+    them to be smaller than TID-sets.
+
+    Returns (frequent_itemsets, N) in the same shape as apriori().
+    """
+    check_backend(backend)
+    if diffsets not in (True, False, 'auto'):
+        raise ValueError(f"diffsets must be True, False or 'auto', got {diffsets!r}")
+    recorder = instrument.active()
+
+    if backend == 'bitset':
+        if diffsets is True:
+            raise ValueError("Diffsets are only supported with the 'tidset' backend.")
+        min_support_count = min_support_ratio * len(store)
+        with recorder.phase('encode'):
+            item_ids, bits, N = encode_data_bitset(store, min_support_count)
+        frequent_itemsets = {}
+        with recorder.phase('search'):
+            eclat_bitset_recursive(tuple(), item_ids, bits, popcount(bits),
+                                   min_support_count, frequent_itemsets)
+        return frequent_itemsets, N
+
+    # vertical Data Format Preparation (TID-sets)
+    with recorder.phase('encode'):
+        item_tid_sets, N = encode_data_vertical(store)
+    min_support_count = min_support_ratio * N
+    frequent_itemsets = {}
+
+    initial_tid_set_map = {
+        item: tids for item, tids in item_tid_sets.items()
+        if len(tids) >= min_support_count
+    }
+
+    if diffsets:
+        class_members = [(item, len(tids), tids)
+                         for item, tids in sorted(initial_tid_set_map.items())]
+        with recorder.phase('search'):
+            declat_recursive(tuple(), class_members, False, min_support_count, frequent_itemsets,
+                             switch='auto' if diffsets == 'auto' else 'always')
+        return frequent_itemsets, N
+
+    # executes Recursive DFS
+    with recorder.phase('search'):
+        eclat_recursive(
+            prefix=tuple(),
+            tid_set_map=initial_tid_set_map,
+            N=N,
+            min_support_count=min_support_count,
+            frequent_sets=frequent_itemsets
+        )
+
+    return frequent_itemsets, N
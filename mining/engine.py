@@ -0,0 +1,244 @@
+"""
+Entry points that run a full mining job (frequent itemsets + rules) over an
+explicit transaction dataset and report performance figures.
+"""
+
+import os
+import time
+from collections import Counter
+
+import psutil
+
+from mining.apriori import apriori
+from mining.condensed import (charm, check_mode, closed_itemsets, condensed_rules_gen, maximal_itemsets,
+                              topk_itemsets)
+from mining.eclat import eclat
+from mining.fpgrowth import fp_growth
+from mining.instrument import Instrumentation, recording
+from mining.outofcore import outofcore_eclat
+from mining.parallel import count_distribution_apriori, parallel_eclat, son_apriori
+from mining.sampling import approximate_itemsets
+from mining.store import TransactionStore
+
+# performance_data keys for the algorithm options that _run() reports
+OPTION_LABELS = {
+    'backend': 'Backend',
+    'diffsets': 'Diffsets',
+    'workers': 'Workers',
+    'partitions': 'Partitions',
+    'memory_budget': 'Memory Budget (bytes)',
+    'spill_dir': 'Spill Directory',
+    'k': 'K',
+    'min_size': 'Min Size',
+    'epsilon': 'Epsilon',
+    'delta': 'Delta',
+    'verify': 'Verify',
+    'sample_algorithm': 'Sample Algorithm',
+    'seed': 'Seed',
+}
+
+
+def as_store(transactions):
+    """Accepts a TransactionStore as is, or builds one from an iterable of item-name lists."""
+    if isinstance(transactions, TransactionStore):
+        return transactions
+    return TransactionStore.from_baskets(transactions)
+
+
+def decode_itemsets(store, frequent_itemsets):
+    """Maps id-tuple keys back to name tuples (sorted by name)."""
+    names = store.item_names
+    return {tuple(sorted(names[i] for i in itemset)): count
+            for itemset, count in frequent_itemsets.items()}
+
+
+def decode_rules(store, rules):
+    """Returns the RuleTable with item ids replaced by product names."""
+    return rules.decode(store.item_names)
+
+
+def _run(name, find_itemsets, transactions, min_support_ratio, min_confidence, mode='all',
+         instrument=False, **options):
+    """
+    Times one algorithm end to end and packages its performance data.
+    Extra keyword options (e.g. backend='bitset') go to find_itemsets.
+    `mode` condenses the itemsets to the 'closed' or 'maximal' ones before
+    rules are generated from them.
+
+    `instrument` (True, or a mining.instrument.Instrumentation to also
+    trace memory or profile) adds an 'Instrumentation' entry with phase
+    timings, counters and itemsets per level.
+    """
+    check_mode(mode)
+    store = as_store(transactions)
+    if not len(store):
+        return None, None, "No transactions available."
+    recorder = instrument if isinstance(instrument, Instrumentation) else Instrumentation() if instrument else None
+
+    # Performance Tracking Setup
+    process = psutil.Process(os.getpid())
+    start_time = time.time()
+    start_memory = process.memory_info().rss
+
+    with recording(recorder) as active:
+        frequent_itemsets, N = find_itemsets(store, min_support_ratio, **options)
+        if recorder is not None:
+            for k, n in sorted(Counter(map(len, frequent_itemsets)).items()):
+                recorder.level('frequent itemsets', k, n)
+
+        if mode != 'all':
+            with active.phase('condense'):
+                if mode == 'closed':
+                    frequent_itemsets = closed_itemsets(frequent_itemsets)
+                else:
+                    frequent_itemsets = maximal_itemsets(frequent_itemsets)
+
+        # extract Association Rules (shared by every algorithm), then decode ids to names
+        with active.phase('rules'):
+            rules = condensed_rules_gen(store, frequent_itemsets, N, min_confidence, mode)
+        with active.phase('decode'):
+            rules = decode_rules(store, rules)
+            frequent_itemsets = decode_itemsets(store, frequent_itemsets)
+
+    # Performance Tracking Finalization
+    end_time = time.time()
+    end_memory = process.memory_info().rss
+
+    performance_data = {
+        'Algorithm': name,
+        'Time (ms)': round((end_time - start_time) * 1000, 2),
+        'Rules Generated': len(rules),
+        'Memory (MB)': round((end_memory - start_memory) / (1024 * 1024), 2),
+        'Support': min_support_ratio,
+        'Confidence': min_confidence,
+        'Mode': mode,
+        **{OPTION_LABELS.get(key, key.replace('_', ' ').title()): value for key, value in options.items()}
+    }
+    if recorder is not None:
+        performance_data['Instrumentation'] = recorder.report()
+    return frequent_itemsets, rules, performance_data
+
+
+def run_apriori(transactions, min_support_ratio=0.2, min_confidence=0.5, backend='tidset',
+                workers=1, partitions=None, mode='all', instrument=False):
+    """
+    Executes the Apriori algorithm over a TransactionStore (or an iterable of
+    item-name lists). `backend` selects the vertical representation used for
+    support counting ('tidset' or 'bitset').
+
+    workers > 1 (None = one per CPU) counts every level in parallel over one
+    row partition per worker (count distribution). `partitions` instead runs
+    the two-pass SON algorithm over that many partitions, with `workers`
+    processes. Both parallel modes count with bitsets and ignore `backend`.
+
+    mode='closed' or 'maximal' keeps only the closed or maximal frequent
+    itemsets, and the rules are generated from those.
+
+    instrument=True (or a mining.instrument.Instrumentation) adds phase
+    timings and counters to performance_data['Instrumentation'].
+
+    Returns (frequent_itemsets, rules, performance_data); when there is
+    nothing to mine the first two are None and the last is an error message.
+    """
+    if partitions:
+        return _run('Apriori', son_apriori, transactions, min_support_ratio, min_confidence,
+                    mode, instrument, partitions=partitions, workers=workers)
+    if workers != 1:
+        return _run('Apriori', count_distribution_apriori, transactions, min_support_ratio,
+                    min_confidence, mode, instrument, workers=workers)
+    return _run('Apriori', apriori, transactions, min_support_ratio, min_confidence, mode, instrument,
+                backend=backend)
+
+
+def run_eclat(transactions, min_support_ratio=0.2, min_confidence=0.5, backend='tidset',
+              diffsets='auto', workers=1, mode='all', instrument=False, memory_budget=None, spill_dir=None):
+    """
+    Executes the Eclat algorithm. Same inputs and outputs as run_apriori(),
+    plus `diffsets` (False, True or 'auto') to select the dEclat variant on
+    the tidset backend, and `workers` to mine the first-level equivalence
+    classes in a process pool (None = one worker per CPU).
+
+    mode='closed' or 'maximal' runs CHARM instead, which finds the closed
+    itemsets directly (backend, diffsets and workers are not used).
+
+    memory_budget (bytes) mines out of core instead (mining.outofcore),
+    spilling TID-lists to files under spill_dir (default: the system
+    temp directory). Rules still need every itemset in memory; use
+    outofcore_eclat() with a sink when the result itself is too large.
+    """
+    if mode != 'all':
+        return _run('Eclat', charm, transactions, min_support_ratio, min_confidence, mode, instrument)
+    if memory_budget is not None:
+        return _run('Eclat', outofcore_eclat, transactions, min_support_ratio, min_confidence, 'all',
+                    instrument, memory_budget=memory_budget, spill_dir=spill_dir)
+    if backend == 'bitset' and diffsets == 'auto':
+        diffsets = False
+    if workers == 1:
+        return _run('Eclat', eclat, transactions, min_support_ratio, min_confidence, 'all', instrument,
+                    backend=backend, diffsets=diffsets)
+    return _run('Eclat', parallel_eclat, transactions, min_support_ratio, min_confidence, 'all', instrument,
+                backend=backend, diffsets=diffsets, workers=workers)
+
+
+def run_fpgrowth(transactions, min_support_ratio=0.2, min_confidence=0.5, mode='all', instrument=False):
+    """Executes FP-Growth (no candidate generation). Same inputs and outputs as run_apriori()."""
+    return _run('FP-Growth', fp_growth, transactions, min_support_ratio, min_confidence, mode, instrument)
+
+
+def _find_topk(store, _, k=10, min_size=1):
+    return topk_itemsets(store, k, min_size)
+
+
+def run_topk(transactions, k=10, min_confidence=0.5, min_size=1, instrument=False):
+    """
+    Mines the k most frequent itemsets with at least min_size items (ties
+    included) instead of taking a support threshold, and generates rules
+    from them. The 'Support' reported in performance_data is the support
+    the search ended up at.
+    """
+    store = as_store(transactions)
+    frequent_itemsets, rules, performance_data = _run(
+        'Top-K', _find_topk, store, None, min_confidence, 'all', instrument, k=k, min_size=min_size)
+    if frequent_itemsets:
+        performance_data['Support'] = round(min(frequent_itemsets.values()) / len(store), 4)
+    return frequent_itemsets, rules, performance_data
+
+
+# Name -> runner, in the order compare_performance() reports them
+ALGORITHMS = {
+    'Apriori': run_apriori,
+    'Eclat': run_eclat,
+    'FP-Growth': run_fpgrowth,
+}
+
+
+def run_approximate(transactions, min_support_ratio=0.2, min_confidence=0.5, epsilon=0.01, delta=0.05,
+                    verify=False, sample_algorithm='FP-Growth', seed=0, instrument=False):
+    """
+    Mines a random sample of the transactions (mining.sampling) instead of
+    all of them: supports are estimated within +/- epsilon with probability
+    1 - delta, and verify=True checks the result in one pass over the full
+    data. performance_data also reports the 'Sample Size', 'Support Error'
+    and 'Confidence Level', and with verify whether the result is
+    'Possibly Incomplete'.
+    """
+    report = {}
+
+    def find_itemsets(store, min_support_ratio, **options):
+        return approximate_itemsets(store, min_support_ratio, report=report, **options)
+
+    frequent_itemsets, rules, performance_data = _run(
+        'Approximate', find_itemsets, transactions, min_support_ratio, min_confidence, 'all', instrument,
+        epsilon=epsilon, delta=delta, verify=verify, sample_algorithm=sample_algorithm, seed=seed)
+    if isinstance(performance_data, dict):
+        performance_data.update(report)
+    return frequent_itemsets, rules, performance_data
+
+
+def run_algorithm(name, transactions, min_support_ratio=0.2, min_confidence=0.5, **options):
+    """Looks up an algorithm by name and runs it, forwarding options (e.g. backend)."""
+    try:
+        runner = ALGORITHMS[name]
+    except KeyError:
+        raise ValueError(f"Unknown algorithm '{name}'. Choose from: {', '.join(ALGORITHMS)}")
+    return runner(transactions, min_support_ratio, min_confidence, **options)
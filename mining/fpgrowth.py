@@ -0,0 +1,146 @@
+"""
+FP-Growth: mines frequent itemsets from a prefix tree of the transactions
+(FP-tree) by recursively building conditional trees, so no candidate
+itemsets are ever generated or counted.
+"""
+
+import itertools
+
+import numpy as np
+
+from mining import instrument
+
+
+# --FP-TREE--
+
+class FPNode:
+    """One node of an FP-tree: an item, its count and a link to the next node of the same item."""
+
+    __slots__ = ('item', 'count', 'parent', 'children', 'next')
+
+    def __init__(self, item, parent):
+        self.item = item
+        self.count = 0
+        self.parent = parent
+        self.children = {}
+        self.next = None
+
+
+def build_fp_tree(weighted_transactions, item_supports, min_support_count):
+    """
+    Builds an FP-tree from (items, count) pairs.
+
+    Only items whose support in item_supports reaches min_support_count are
+    inserted, ordered by descending support (ties broken by item id) so that
+    common prefixes share nodes. Returns (root, header) where header maps
+    item -> [support, first node in its node-link chain].
+    """
+    header = {item: [support, None] for item, support in item_supports.items()
+              if support >= min_support_count}
+    if not header:
+        return None, header
+
+    rank = {item: (-header[item][0], item) for item in header}
+    root = FPNode(None, None)
+
+    for items, count in weighted_transactions:
+        path = sorted((item for item in items if item in header), key=rank.__getitem__)
+        node = root
+        for item in path:
+            child = node.children.get(item)
+            if child is None:
+                child = FPNode(item, node)
+                node.children[item] = child
+                # Thread the new node onto the front of its item's node-link chain
+                child.next = header[item][1]
+                header[item][1] = child
+            child.count += count
+            node = child
+
+    return root, header
+
+
+def _single_path(root):
+    """Returns the nodes of the tree as a list if it is a single path, otherwise None."""
+    path = []
+    node = root
+    while node.children:
+        if len(node.children) > 1:
+            return None
+        node = next(iter(node.children.values()))
+        path.append(node)
+    return path
+
+
+# --FP-GROWTH ALGORITHM IMPLEMENTATION--
+
+def fp_growth_recursive(root, header, prefix, min_support_count, frequent_sets):
+    """Mines every frequent itemset ending in `prefix` from an (conditional) FP-tree."""
+
+    # Single path: every combination of its nodes is frequent, support = deepest node's count
+    path = _single_path(root)
+    if path is not None:
+        for k in range(1, len(path) + 1):
+            for combination in itertools.combinations(path, k):
+                itemset = tuple(sorted(prefix + tuple(node.item for node in combination)))
+                frequent_sets[itemset] = combination[-1].count
+        return
+
+    # One conditional tree per item of this tree
+    instrument.active().count('conditional trees', len(header))
+
+    # Process items from least to most frequent
+    for item in sorted(header, key=lambda i: (header[i][0], i)):
+        support, node = header[item]
+        new_prefix = prefix + (item,)
+        frequent_sets[tuple(sorted(new_prefix))] = support
+
+        # Conditional pattern base: the prefix path of every node of `item`
+        pattern_base = []
+        conditional_supports = {}
+        while node is not None:
+            path_items = []
+            parent = node.parent
+            while parent.item is not None:
+                path_items.append(parent.item)
+                parent = parent.parent
+            if path_items:
+                pattern_base.append((path_items, node.count))
+                for path_item in path_items:
+                    conditional_supports[path_item] = conditional_supports.get(path_item, 0) + node.count
+            node = node.next
+
+        conditional_root, conditional_header = build_fp_tree(
+            pattern_base, conditional_supports, min_support_count)
+
+        # Recurse if the conditional tree is not empty
+        if conditional_header:
+            fp_growth_recursive(conditional_root, conditional_header, new_prefix,
+                                min_support_count, frequent_sets)
+
+
+def fp_growth(store, min_support_ratio=0.2):
+    """
+    Finds all frequent itemsets of a TransactionStore with FP-Growth.
+
+    Returns (frequent_itemsets, N) in the same shape as apriori() and eclat().
+    """
+    recorder = instrument.active()
+    N = len(store)
+    min_support_count = min_support_ratio * N
+    frequent_itemsets = {}
+
+    with recorder.phase('encode'):
+        items, _, _ = store.arrays()
+        supports = np.bincount(items, minlength=store.n_items)
+        del items
+        item_supports = {item: int(support) for item, support in enumerate(supports.tolist()) if support}
+
+    with recorder.phase('build tree'):
+        root, header = build_fp_tree(((basket, 1) for basket in store.iter_baskets()),
+                                     item_supports, min_support_count)
+    if header:
+        with recorder.phase('search'):
+            fp_growth_recursive(root, header, tuple(), min_support_count, frequent_itemsets)
+
+    return frequent_itemsets, N
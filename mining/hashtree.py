@@ -0,0 +1,106 @@
+"""
+Itemset indexes used by Apriori candidate generation and counting.
+
+ItemsetTrie  - prefix tree of the frequent (k-1)-itemsets, used to prune
+               candidates whose subsets are not frequent.
+HashTree     - the classic Apriori hash tree over the candidate k-itemsets,
+               used to count supports in one horizontal pass over the baskets
+               without testing every candidate against every basket.
+"""
+
+
+class ItemsetTrie:
+    """Prefix tree of sorted item tuples."""
+
+    def __init__(self, itemsets=()):
+        self.root = {}
+        for itemset in itemsets:
+            self.add(itemset)
+
+    def add(self, itemset):
+        node = self.root
+        for item in itemset:
+            node = node.setdefault(item, {})
+
+    def node_for(self, prefix):
+        """Returns the trie node reached by `prefix`, or None if no itemset starts with it."""
+        node = self.root
+        for item in prefix:
+            node = node.get(item)
+            if node is None:
+                return None
+        return node
+
+    def __contains__(self, itemset):
+        return self.node_for(itemset) is not None
+
+
+class _HashNode:
+    __slots__ = ('children', 'itemsets', 'visited')
+
+    def __init__(self):
+        self.children = None    # bucket -> _HashNode once the node is split
+        self.itemsets = []      # candidates stored at a leaf
+        self.visited = -1       # last basket that reached this leaf (avoids double counting)
+
+
+class HashTree:
+    """
+    Hash tree over candidate k-itemsets (sorted tuples). Interior nodes at
+    depth d hash the d-th item of a candidate into one of `fanout` buckets;
+    leaves hold up to `leaf_size` candidates before splitting.
+    """
+
+    def __init__(self, candidates, fanout=16, leaf_size=32):
+        self.fanout = fanout
+        self.leaf_size = leaf_size
+        self.root = _HashNode()
+        self.counts = {}
+        self.k = 0
+        for candidate in candidates:
+            self.k = len(candidate)
+            self.counts[candidate] = 0
+            self._insert(self.root, candidate, 0)
+        self._basket_no = 0
+
+    def _insert(self, node, candidate, depth):
+        while node.children is not None:
+            node = node.children.setdefault(candidate[depth] % self.fanout, _HashNode())
+            depth += 1
+
+        node.itemsets.append(candidate)
+
+        # Split an overfull leaf, unless every item is already hashed
+        if len(node.itemsets) > self.leaf_size and depth < self.k:
+            itemsets, node.itemsets = node.itemsets, []
+            node.children = {}
+            for itemset in itemsets:
+                self._insert(node, itemset, depth)
+
+    def add_basket(self, basket):
+        """Increments the count of every candidate contained in a sorted basket."""
+        if len(basket) < self.k:
+            return
+        self._basket_no += 1
+        self._count(self.root, basket, set(basket), 0, 0)
+
+    def _count(self, node, basket, basket_set, start, depth):
+        if node.children is None:
+            if node.visited == self._basket_no:
+                return
+            node.visited = self._basket_no
+            counts = self.counts
+            for candidate in node.itemsets:
+                for item in candidate:
+                    if item not in basket_set:
+                        break
+                else:
+                    counts[candidate] += 1
+            return
+
+        # Hash every item that can still be the depth-th item of a contained candidate
+        children = node.children
+        for i in range(start, len(basket) - (self.k - depth) + 1):
+            child = children.get(basket[i] % self.fanout)
+            if child is not None:
+                self._count(child, basket, basket_set, i + 1, depth + 1)
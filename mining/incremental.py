@@ -0,0 +1,142 @@
+"""
+Incremental maintenance of frequent itemsets over an append-only store
+(FUP with a negative border).
+
+Besides the frequent itemsets L, the miner keeps the exact support of their
+negative border NB: every itemset that is not frequent but whose subsets
+all are (Apriori's rejected candidates). When baskets are appended, only
+the new rows are scanned to bring every itemset in L and NB up to date.
+
+The new frequent itemsets are then found level-wise from those counts.
+Every candidate whose subsets are all still frequent is already in L or
+NB, as long as nothing in NB crossed the threshold. Only when a border
+itemset becomes frequent can new candidates appear beyond the border;
+just those candidates are counted over the full data.
+"""
+
+import os
+import time
+
+import numpy as np
+import psutil
+
+from mining.apriori import apriori_gen
+from mining.bitset import BitsetCounter
+from mining.engine import as_store, decode_itemsets, decode_rules
+from mining.rules import apriori_rules_gen
+
+
+class IncrementalMiner:
+    """
+    Keeps the frequent itemsets of one TransactionStore current as baskets
+    are appended to it. The first update() mines the whole store; later
+    ones cost time proportional to the new rows, plus a full-data count of
+    any new candidates when a border itemset becomes frequent.
+    """
+
+    def __init__(self, min_support_ratio=0.2):
+        self.min_support_ratio = min_support_ratio
+        self.reset()
+
+    def reset(self):
+        """Forgets all state; the next update() mines from scratch."""
+        self.store = None
+        self.n_rows = 0                                 # rows already counted
+        self.item_counts = np.zeros(0, dtype=np.int64)  # support of every 1-itemset
+        self.tracked = {}                               # k >= 2 itemsets of L and NB -> support
+        self.frequent_itemsets = {}
+        self.last_delta_rows = 0
+        self.last_rescanned = 0
+
+    def update(self, store):
+        """
+        Brings the frequent itemsets up to date with `store` and returns
+        (frequent_itemsets, N) in the same shape as apriori().
+        """
+        if store is not self.store or len(store) < self.n_rows:
+            self.reset()
+            self.store = store
+
+        N = len(store)
+        self.last_delta_rows = N - self.n_rows
+        self.last_rescanned = 0
+        if not self.last_delta_rows:
+            return self.frequent_itemsets, N
+
+        # Count every 1-itemset and every tracked itemset over the new rows only
+        delta = store.row_slice(self.n_rows, N)
+        delta_items, _, _ = delta.arrays()
+        delta_counts = np.bincount(delta_items, minlength=store.n_items)
+        del delta_items
+        item_counts = np.zeros(store.n_items, dtype=np.int64)
+        item_counts[:len(self.item_counts)] = self.item_counts
+        self.item_counts = item_counts + delta_counts
+
+        if self.tracked:
+            for itemset, count in BitsetCounter(delta).count(list(self.tracked)).items():
+                self.tracked[itemset] += count
+        self.n_rows = N
+
+        # Rebuild L and NB level-wise; only candidates never seen before need a full count
+        min_support_count = self.min_support_ratio * N
+        level = [(item,) for item in np.flatnonzero(self.item_counts >= min_support_count).tolist()]
+        frequent_itemsets = {itemset: int(self.item_counts[itemset[0]]) for itemset in level}
+        tracked = {}
+        full_counter = BitsetCounter(store)
+
+        while level:
+            candidates = apriori_gen(level)
+            unknown = [candidate for candidate in candidates if candidate not in self.tracked]
+            unknown_counts = full_counter.count(unknown) if unknown else {}
+            self.last_rescanned += len(unknown)
+
+            level = []
+            for candidate in candidates:
+                count = self.tracked.get(candidate)
+                if count is None:
+                    count = unknown_counts[candidate]
+                tracked[candidate] = count
+                if count >= min_support_count:
+                    frequent_itemsets[candidate] = count
+                    level.append(candidate)
+
+        self.tracked = tracked
+        self.frequent_itemsets = frequent_itemsets
+        return frequent_itemsets, N
+
+    def run(self, transactions, min_support_ratio=0.2, min_confidence=0.5):
+        """
+        Updates the itemsets and generates rules. Same return shape as
+        mining.run_apriori(); changing the support threshold starts over.
+        """
+        store = as_store(transactions)
+        if not len(store):
+            return None, None, "No transactions available."
+        if min_support_ratio != self.min_support_ratio:
+            self.min_support_ratio = min_support_ratio
+            self.reset()
+
+        # Performance Tracking Setup
+        process = psutil.Process(os.getpid())
+        start_time = time.time()
+        start_memory = process.memory_info().rss
+
+        frequent_itemsets, N = self.update(store)
+        rules = decode_rules(store, apriori_rules_gen(frequent_itemsets, N, min_confidence))
+        frequent_itemsets = decode_itemsets(store, frequent_itemsets)
+
+        # Performance Tracking Finalization
+        end_time = time.time()
+        end_memory = process.memory_info().rss
+
+        performance_data = {
+            'Algorithm': 'Incremental',
+            'Time (ms)': round((end_time - start_time) * 1000, 2),
+            'Rules Generated': len(rules),
+            'Memory (MB)': round((end_memory - start_memory) / (1024 * 1024), 2),
+            'Support': min_support_ratio,
+            'Confidence': min_confidence,
+            'Delta Rows': self.last_delta_rows,
+            'Rescanned Itemsets': self.last_rescanned,
+        }
+        return frequent_itemsets, rules, performance_data
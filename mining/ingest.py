@@ -0,0 +1,519 @@
+"""
+CSV ingestion: reads transaction exports, cleans every basket and appends
+it straight into a TransactionStore.
+
+Files are streamed in bounded-size chunks of rows, so peak memory depends
+on the chunk size, not on the file size. The preprocessing counters are
+accumulated across chunks in an ImportStats.
+
+Each chunk is cleaned either by the vectorized pipeline
+(clean_chunk_vectorized, the default) or by the original per-row loop
+(clean_transactions). Both produce the same store contents and counters.
+"""
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from mining.store import TransactionStore
+
+# Rows per chunk when streaming a CSV
+DEFAULT_CHUNK_ROWS = 50_000
+
+# Files at least this large are imported with import_csv_parallel() by the app
+PARALLEL_IMPORT_MIN_BYTES = 64 * 1024 * 1024
+
+# Separates the rows of a chunk when it is tokenized as one byte string
+ROW_MARK = '\x1e'
+_ROW_MARK_BYTE = ord(ROW_MARK)
+
+# _BYTE_MASKS[n] keeps the first n bytes of a little-endian 8-byte word
+_BYTE_MASKS = np.array([(1 << 8 * n) - 1 for n in range(9)], dtype=np.uint64)
+_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+class ImportStats:
+    """Running preprocessing counters for one import (see SupermarketApp._generate_report)."""
+
+    def __init__(self):
+        self.total_initial = 0
+        self.removed_empty = 0
+        self.removed_single = 0
+        self.duplicates = 0
+        self.invalids = 0
+        self.valid_transactions = 0
+        self.final_item_count = 0
+        self.final_unique_items = set()    # item ids seen in accepted transactions
+        self.errors = 0
+
+    @property
+    def final_unique_count(self):
+        return len(self.final_unique_items)
+
+    def merge(self, other, item_id_map=None):
+        """
+        Adds the counters of another (partial) import. item_id_map translates
+        the other import's item ids into ids of this import's store.
+        """
+        for name in ('total_initial', 'removed_empty', 'removed_single', 'duplicates',
+                     'invalids', 'valid_transactions', 'final_item_count', 'errors'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        if item_id_map is None:
+            self.final_unique_items.update(other.final_unique_items)
+        else:
+            self.final_unique_items.update(int(item_id_map[i]) for i in other.final_unique_items)
+
+    def report_args(self):
+        """Positional arguments for SupermarketApp._generate_report()."""
+        return (self.total_initial, self.removed_empty, self.removed_single,
+                self.duplicates, self.invalids, self.valid_transactions,
+                self.final_item_count, self.final_unique_count)
+
+
+def read_valid_products(filepath):
+    """
+    Reads the inventory CSV and returns the set of standardized (stripped,
+    lower-cased) product names from its second column.
+    """
+    df_inventory = pd.read_csv(filepath, encoding='utf-8')
+    valid_names = df_inventory.iloc[:, 1].astype(str).str.strip().str.lower()
+    return set(valid_names)
+
+
+def detect_separator(df_items):
+    """Determines the separator used within the 'Items' column from its first rows."""
+    sample_items = df_items.head(10).astype(str).str.cat(sep='')
+
+    if ',' in sample_items:
+        return ','
+    elif '|' in sample_items:
+        return '|'
+    elif ';' in sample_items:
+        return ';'
+    return ','
+
+
+def detect_file_separator(filepath):
+    """
+    detect_separator() on the first 10 rows of a transactions CSV, read on
+    their own so the result does not depend on the chunk size. Raises
+    ValueError if the file has fewer than two columns.
+    """
+    head = pd.read_csv(filepath, header=0, encoding='utf-8', nrows=10)
+    if head.shape[1] < 2:
+        raise ValueError("CSV format error: Expected at least two columns (ID, Items).")
+    return detect_separator(head.iloc[:, 1].fillna(''))
+
+
+def clean_transactions(items_strings, item_separator, valid_products, store, next_id, stats):
+    """
+    Cleans raw item strings one transaction at a time and appends the
+    accepted ones to the store. Returns the next free transaction id.
+    """
+    for items_string in items_strings:
+        stats.total_initial += 1
+        try:
+            # Split the string by the determined separator, filter out empty strings, and trim whitespace
+            raw_items_found = [item.strip().lower() for item in items_string.split(item_separator)]
+
+            # Remove empty strings resulting from extra delimiters like ',,'
+            cleaned_items = [item for item in raw_items_found if item]
+
+            # Tracking empty transactions
+            if not cleaned_items:
+                stats.removed_empty += 1
+                continue
+            items_pre_validation = list(set(cleaned_items))
+
+            # tracking duplicate items
+            stats.duplicates += (len(cleaned_items) - len(items_pre_validation))
+
+            valid_items = []
+            for item in items_pre_validation:
+                if item in valid_products:
+                    valid_items.append(item)
+                else:
+                    # Tracking invalid items
+                    stats.invalids += 1
+
+            item_count = len(valid_items)
+
+            # Removing transactions containing only one item
+            if item_count < 2:
+                # tracking single-item transactions
+                if item_count == 1:
+                    stats.removed_single += 1
+                continue
+
+            row = store.append(next_id, valid_items)
+            next_id += 1
+
+            # Updating final dataset statistics
+            stats.valid_transactions += 1
+            stats.final_item_count += item_count
+            stats.final_unique_items.update(store.row_items(row))
+
+        except Exception as e:
+            print(f"Error processing item string '{items_string}': {e}")
+            stats.errors += 1
+
+    return next_id
+
+
+def _tokenize_numpy(items_strings, item_separator):
+    """
+    Tokenizes the whole chunk without a Python object per item. The rows
+    are joined with ROW_MARK, lower-cased and encoded once, and the token
+    boundaries are found with one byte comparison. Every token is then
+    read as a few 8-byte words, zeroed past its end, and the words are
+    hashed. Every token is checked against a representative of its hash,
+    so the codes are exact. Trimming runs once per distinct name.
+
+    Returns (rows, codes, names), or None if the marker or a NUL byte
+    occurs in the data, the separator is not a single byte, or two
+    different tokens share a hash.
+    """
+    separator = item_separator.encode('utf-8')
+    if len(separator) != 1:
+        return None
+    text = ROW_MARK.join(items_strings).lower().encode('utf-8')
+    data = np.frombuffer(text, dtype=np.uint8)
+    is_row_end = data == _ROW_MARK_BYTE
+    # Without NUL bytes the zero-padded words identify a token, length included
+    if np.count_nonzero(is_row_end) != len(items_strings) - 1 or 0 in text:
+        return None
+
+    bounds = np.flatnonzero(is_row_end | (data == separator[0]))
+    starts = np.empty(len(bounds) + 1, dtype=np.int64)
+    starts[0] = 0
+    np.add(bounds, 1, out=starts[1:])
+    lengths = np.empty_like(starts)
+    lengths[:-1] = bounds
+    lengths[-1] = len(text)
+    lengths -= starts
+    rows = np.zeros(len(starts), dtype=np.int64)
+    np.cumsum(is_row_end[bounds], out=rows[1:])
+
+    # One (n_words * 8)-byte window at every byte offset, gathered at the token starts
+    n_words = int(lengths.max()) // 8 + 1
+    padded = np.frombuffer(text + bytes(8 * n_words), dtype=np.uint8)
+    windows = np.ndarray((len(text) + 1,), dtype=f'V{8 * n_words}', buffer=padded, strides=(1,))
+    words = windows[starts].view('<u8').reshape(len(starts), n_words).T.copy()
+    # masks[w, length] keeps the bytes of word w that belong to a token of that length
+    kept = np.clip(np.arange(8 * n_words + 1) - 8 * np.arange(n_words)[:, None], 0, 8)
+    masks = _BYTE_MASKS[kept]
+    hashes = None
+    for word, word_masks in zip(words, masks):
+        word &= word_masks[lengths]
+        hashes = word.copy() if hashes is None else hashes * _HASH_MULTIPLIER ^ word
+
+    raw_codes, distinct = pd.factorize(hashes)
+    representative = np.empty(len(distinct), dtype=np.int64)
+    representative[raw_codes] = np.arange(len(raw_codes))
+    if not all(np.array_equal(word, word[representative][raw_codes]) for word in words):
+        return None
+
+    raw_names = [text[start:start + length].decode('utf-8')
+                 for start, length in zip(starts[representative].tolist(), lengths[representative].tolist())]
+    trimmed_codes, names = pd.factorize(np.array([name.strip() for name in raw_names], dtype=object))
+    return rows, trimmed_codes[raw_codes].astype(np.int64), list(names)
+
+
+def _sorted_unique(values):
+    """np.unique via sort + neighbour comparison (much faster than hashing for int keys)."""
+    values = np.sort(values)
+    if not len(values):
+        return values
+    is_first = np.empty(len(values), dtype=bool)
+    is_first[0] = True
+    np.not_equal(values[1:], values[:-1], out=is_first[1:])
+    return values[is_first]
+
+
+def clean_chunk_vectorized(df_items, item_separator, valid_products, store, next_id, stats):
+    """
+    Batched equivalent of clean_transactions(). The chunk is tokenized in
+    bulk into (row, name code) pairs by _tokenize_numpy(). Trimming and
+    validation then run once per distinct name, and the dedup and
+    per-transaction counting run as integer array operations over one
+    sorted array of (row, item) keys. Returns the next free transaction id.
+    """
+    df_items = df_items.reset_index(drop=True)
+    stats.total_initial += len(df_items)
+
+    # Non-string cells cannot be split; count them as errors like the per-row loop
+    if pd.api.types.infer_dtype(df_items, skipna=False) not in ('string', 'empty'):
+        is_string = df_items.map(lambda value: isinstance(value, str)).to_numpy(dtype=bool)
+        for items_string in df_items[~is_string]:
+            print(f"Error processing item string '{items_string}': not a string")
+            stats.errors += 1
+        df_items = df_items[is_string].astype(object)
+
+    n_rows = len(df_items)
+    if not n_rows:
+        return next_id
+
+    tokens = _tokenize_numpy(df_items.tolist(), item_separator)
+    if tokens is None:
+        stats.total_initial -= n_rows
+        return clean_transactions(df_items, item_separator, valid_products, store, next_id, stats)
+    rows, codes, names = tokens
+    n_names = len(names)
+
+    # Provisional item id per name: the store id if known, otherwise the next ids in
+    # name order. Encoding the new names later keeps this order, so sorting by it
+    # already sorts every basket by its final item ids
+    known = store.n_items
+    id_of_code = np.empty(n_names, dtype=np.int64)
+    n_new = 0
+    for code, name in enumerate(names):
+        item_id = store.item_index.get(name)
+        if item_id is None:
+            item_id = known + n_new
+            n_new += 1
+        id_of_code[code] = item_id
+    id_range = known + n_new
+
+    # Sort key of every name within a row: valid items by item id, then invalid
+    # names, then the empty name left by extra delimiters like ',,'
+    is_empty_code = np.array([name == '' for name in names], dtype=bool)
+    is_valid_code = np.array([name in valid_products for name in names], dtype=bool) & ~is_empty_code
+    empty_key = id_range + n_names
+    key_of_code = np.where(is_valid_code, id_of_code, id_range + np.arange(n_names))
+    key_of_code[is_empty_code] = empty_key
+    shift = empty_key.bit_length()
+
+    # Unique (row, name) pairs, sorted by row then key
+    pair_keys = _sorted_unique((rows << shift) | key_of_code[codes])
+    rows, keys = pair_keys >> shift, pair_keys & ((1 << shift) - 1)
+
+    # Remove empty strings resulting from extra delimiters like ',,'
+    n_found = len(codes) - int(np.bincount(codes, minlength=n_names)[is_empty_code].sum())
+    is_empty = keys == empty_key
+    n_items_found = len(keys) - int(np.count_nonzero(is_empty))
+
+    # Tracking empty transactions (the empty name sorts last, so it starts only empty rows)
+    starts_row = np.empty(len(rows), dtype=bool)
+    starts_row[0] = True
+    np.not_equal(rows[1:], rows[:-1], out=starts_row[1:])
+    stats.removed_empty += int(np.count_nonzero(starts_row & is_empty))
+
+    # tracking duplicate items
+    stats.duplicates += n_found - n_items_found
+
+    # Tracking invalid items
+    is_valid = keys < id_range
+    stats.invalids += n_items_found - int(np.count_nonzero(is_valid))
+    rows, item_ids = rows[is_valid], keys[is_valid]
+
+    # Removing transactions containing only one item (tracking single-item transactions)
+    valid_counts = np.bincount(rows, minlength=n_rows)
+    stats.removed_single += int(np.count_nonzero(valid_counts == 1))
+    accepted = valid_counts[rows] >= 2
+    rows, item_ids = rows[accepted], item_ids[accepted]
+    if not len(rows):
+        return next_id
+
+    # Dictionary-encode the new names that made it into accepted baskets
+    used_ids = _sorted_unique(item_ids)
+    final_id = np.arange(id_range, dtype=np.int64)
+    new_ids = used_ids[used_ids >= known].tolist()
+    if new_ids:
+        code_of_id = np.empty(id_range, dtype=np.int64)
+        code_of_id[id_of_code] = np.arange(n_names)
+        for item_id in new_ids:
+            final_id[item_id] = store.encode_item(names[code_of_id[item_id]])
+        item_ids = final_id[item_ids]
+
+    counts = valid_counts[valid_counts >= 2]
+
+    transaction_ids = np.arange(next_id, next_id + len(counts), dtype=np.int64)
+    store.extend_encoded(transaction_ids, item_ids, counts)
+
+    # Updating final dataset statistics
+    stats.valid_transactions += len(counts)
+    stats.final_item_count += len(item_ids)
+    stats.final_unique_items.update(final_id[used_ids].tolist())
+
+    return next_id + len(counts)
+
+
+def iter_csv_chunks(filepath, chunksize=DEFAULT_CHUNK_ROWS):
+    """
+    Yields the 'Items' column (column 1) of a transactions CSV as Series of
+    at most `chunksize` rows; chunksize=None reads the whole file at once.
+    Raises ValueError if the file has fewer than two columns.
+    """
+    if chunksize is None:
+        chunks = [pd.read_csv(filepath, header=0, encoding='utf-8')]
+    else:
+        chunks = pd.read_csv(filepath, header=0, encoding='utf-8', chunksize=chunksize)
+
+    for df in chunks:
+        # Basic validation: Must have at least two columns (ID, Items)
+        if df.shape[1] < 2:
+            raise ValueError("CSV format error: Expected at least two columns (ID, Items).")
+
+        # .fillna prevents 'nan' strings from appearing in the transactions.
+        yield df.iloc[:, 1].fillna('')
+
+
+@contextmanager
+def _rollback_on_error(store):
+    """Truncates `store` back to its current rows and items if the block raises."""
+    n_rows, n_items = len(store), store.n_items
+    try:
+        yield
+    except BaseException:
+        store.truncate(n_rows, n_items)
+        raise
+
+
+def import_csv(filepath, store, valid_products, first_id=1, chunksize=DEFAULT_CHUNK_ROWS,
+               vectorized=True):
+    """
+    Streams a transactions CSV into `store`, cleaning it chunk by chunk with
+    the vectorized pipeline (or the per-row loop if vectorized=False).
+    Transaction ids are numbered from first_id.
+
+    Returns (stats, next_id). File and format errors propagate
+    (FileNotFoundError, pandas.errors.EmptyDataError, ValueError), and the
+    rows and items of the chunks imported before the error are removed
+    from `store` again.
+    """
+    clean_chunk = clean_chunk_vectorized if vectorized else clean_transactions
+    stats = ImportStats()
+    next_id = first_id
+    item_separator = detect_file_separator(filepath)
+
+    with _rollback_on_error(store):
+        for df_items in iter_csv_chunks(filepath, chunksize):
+            next_id = clean_chunk(df_items, item_separator, valid_products,
+                                  store, next_id, stats)
+
+    return stats, next_id
+
+
+# --PARALLEL IMPORT--
+
+class _ByteRange(io.RawIOBase):
+    """Read-only file object over bytes [start, end) of a file."""
+
+    def __init__(self, filepath, start, end):
+        self._file = open(filepath, 'rb')
+        self._file.seek(start)
+        self._remaining = end - start
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        read = self._file.readinto(memoryview(buffer)[:size])
+        self._remaining -= read
+        return read
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+
+def split_byte_ranges(filepath, parts):
+    """
+    Splits the data rows of a CSV (everything after the header line) into up
+    to `parts` byte ranges that each start and end on a line boundary.
+    Quoted items containing line breaks are not supported.
+    """
+    size = os.path.getsize(filepath)
+    with open(filepath, 'rb') as f:
+        f.readline()
+        data_start = f.tell()
+
+        boundaries = [data_start]
+        for part in range(1, parts):
+            target = data_start + (size - data_start) * part // parts
+            if target <= boundaries[-1]:
+                continue
+            f.seek(target)
+            f.readline()        # advance to the start of the next line
+            position = f.tell()
+            if boundaries[-1] < position < size:
+                boundaries.append(position)
+        boundaries.append(size)
+
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+def _import_byte_range(filepath, start, end, item_separator, valid_products, chunksize):
+    """
+    Worker: cleans and encodes one byte range into a private store.
+    Returns (item_names, items, offsets, stats) with ids local to the range.
+    """
+    store = TransactionStore()
+    stats = ImportStats()
+    with io.BufferedReader(_ByteRange(filepath, start, end)) as f:
+        for df in pd.read_csv(f, header=None, encoding='utf-8', chunksize=chunksize):
+            if df.shape[1] < 2:
+                raise ValueError("CSV format error: Expected at least two columns (ID, Items).")
+            clean_chunk_vectorized(df.iloc[:, 1].fillna(''), item_separator, valid_products,
+                                   store, 0, stats)
+    items, offsets, _ = store.arrays()
+    return store.item_names, items.copy(), offsets.copy(), stats
+
+
+def import_csv_parallel(filepath, store, valid_products, first_id=1, workers=None,
+                        chunksize=DEFAULT_CHUNK_ROWS):
+    """
+    Imports a transactions CSV using a process pool. The file is split into
+    one byte range per worker on line boundaries. Each worker streams,
+    cleans and encodes its range with a private item dictionary. The partial
+    results are merged in file order, so transaction ids match a serial
+    import_csv() and item ids are deterministic for a given file and worker
+    count.
+
+    Returns (stats, next_id) like import_csv(), and like it leaves `store`
+    unchanged if the import fails.
+    """
+    workers = workers or os.cpu_count() or 1
+
+    # Header, column count and separator come from the first rows, like the serial import
+    item_separator = detect_file_separator(filepath)
+
+    ranges = split_byte_ranges(filepath, workers)
+    stats = ImportStats()
+    next_id = first_id
+
+    with _rollback_on_error(store), \
+            ProcessPoolExecutor(max_workers=min(workers, max(len(ranges), 1))) as pool:
+        futures = [pool.submit(_import_byte_range, filepath, start, end, item_separator,
+                               valid_products, chunksize)
+                   for start, end in ranges]
+
+        # Merge in file order (deterministic ids regardless of which worker finishes first)
+        for future in futures:
+            item_names, items, offsets, part_stats = future.result()
+
+            # Local item id -> global item id
+            id_map = np.array([store.encode_item(name) for name in item_names], dtype=np.int64)
+            stats.merge(part_stats, id_map)
+
+            counts = np.diff(offsets)
+            if not len(counts):
+                continue
+
+            # Re-sort every basket by its global ids
+            rows = np.repeat(np.arange(len(counts), dtype=np.int64), counts)
+            id_range = max(store.n_items, 1)
+            basket_keys = np.sort(rows * id_range + id_map[items])
+
+            store.extend_encoded(np.arange(next_id, next_id + len(counts), dtype=np.int64),
+                                 basket_keys % id_range, counts)
+            next_id += len(counts)
+
+    return stats, next_id
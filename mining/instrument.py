@@ -0,0 +1,157 @@
+"""
+Optional instrumentation of a mining run: per-phase timers, counters,
+itemsets per level, peak allocation (tracemalloc) and a cProfile hook.
+
+The mining functions report to the recorder returned by active(), which is
+per thread. Outside of a recording() block this is a do-nothing recorder.
+Recorders installed inside one another each see every report, so an
+instrumented run inside a background job (mining.jobs) still reports
+progress to the job. Reports are made
+per phase, per level or per search node, never per basket or per TID, so
+an uninstrumented run only pays for a few no-op method calls.
+
+Phases are not nested: each one times a disjoint part of the run, so
+their sum is close to the total. Worker processes of the parallel
+algorithms do not report back. For those runs only the phases timed in
+the calling process are recorded.
+"""
+
+import cProfile
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+
+class Instrumentation:
+    """
+    Collects what the mining code reports during one run. trace_memory
+    records the peak allocation with tracemalloc (slows the run down
+    noticeably). profile runs cProfile, and report() includes the top
+    `profile_limit` functions by cumulative time.
+    """
+
+    enabled = True
+
+    def __init__(self, trace_memory=False, profile=False, profile_limit=20):
+        self.trace_memory = trace_memory
+        self.profile_limit = profile_limit
+        self.profiler = cProfile.Profile() if profile else None
+        self.phases = {}        # phase name -> seconds, in the order first seen
+        self.counters = {}      # counter name -> total
+        self.levels = {}        # name -> {itemset size -> count}
+        self.peak_bytes = None
+        self.outer = DISABLED   # recorder that was active when this one was installed
+        self._started_tracing = False
+
+    @contextmanager
+    def phase(self, name):
+        """Adds the time spent in the block to phase `name`."""
+        with self.outer.phase(name):
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def count(self, name, n=1):
+        self.outer.count(name, n)
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def level(self, name, k, n):
+        """Records n for level (itemset size) k of `name`, e.g. candidates per level."""
+        self.outer.level(name, k, n)
+        per_level = self.levels.setdefault(name, {})
+        per_level[k] = per_level.get(k, 0) + n
+
+    def start(self):
+        if self.trace_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                self._started_tracing = True
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    def stop(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self.trace_memory:
+            self.peak_bytes = tracemalloc.get_traced_memory()[1]
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def report(self):
+        """Everything recorded, as plain data for performance_data."""
+        report = {
+            'Phases (ms)': {name: round(seconds * 1000, 2) for name, seconds in self.phases.items()},
+            'Counters': dict(self.counters),
+            'Levels': {name: dict(sorted(per_level.items())) for name, per_level in self.levels.items()},
+        }
+        if self.peak_bytes is not None:
+            report['Peak Memory (MB)'] = round(self.peak_bytes / (1024 * 1024), 2)
+        if self.profiler is not None:
+            out = io.StringIO()
+            pstats.Stats(self.profiler, stream=out).sort_stats('cumulative').print_stats(self.profile_limit)
+            report['Profile'] = out.getvalue()
+        return report
+
+
+class _Disabled:
+    """Recorder used when nothing is being recorded; every method is a no-op."""
+
+    enabled = False
+    _no_phase = nullcontext()
+
+    def phase(self, name):
+        return self._no_phase
+
+    def count(self, name, n=1):
+        pass
+
+    def level(self, name, k, n):
+        pass
+
+
+DISABLED = _Disabled()
+_local = threading.local()
+
+
+def active():
+    """The recorder the mining code running in this thread should report to."""
+    return getattr(_local, 'recorder', DISABLED)
+
+
+@contextmanager
+def recording(recorder):
+    """
+    Makes `recorder` the active one in this thread for the block. With
+    None the current recorder is kept (and yielded).
+    """
+    previous = active()
+    if recorder is None:
+        yield previous
+        return
+    recorder.outer = previous
+    _local.recorder = recorder
+    recorder.start()
+    try:
+        yield recorder
+    finally:
+        recorder.stop()
+        _local.recorder = previous
+
+
+@contextmanager
+def suspended():
+    """Turns recording off for the block, like for work done in a worker process."""
+    previous = active()
+    _local.recorder = DISABLED
+    try:
+        yield
+    finally:
+        _local.recorder = previous
@@ -0,0 +1,134 @@
+"""
+Background mining jobs with progress reports and cancellation.
+
+A JobRunner runs function calls (e.g. ResultCache.run or a RuleIndex
+build) on a worker thread. While a job runs, a JobRecorder is the active
+mining.instrument recorder on that thread. It turns the phase and level
+reports of the algorithms into progress messages, and raises Cancelled at
+the next report once the job is cancelled. Cancellation is cooperative.
+A running job stops at the next report, at the latest when its current
+level or equivalence class is done. Work already handed to worker
+processes (parallel mining) runs to completion first.
+
+Nothing here touches a GUI. Progress messages are queued, and the owner
+drains them from its own thread with MiningJob.poll(). Tk does this with
+after(), since Tk widgets must only be used from the main thread.
+"""
+
+import queue
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from contextlib import nullcontext
+
+from mining.instrument import DISABLED, recording
+
+
+class Cancelled(Exception):
+    """Raised inside a job (and by MiningJob.result()) once the job was cancelled."""
+
+
+class JobRecorder:
+    """Instrumentation recorder that reports progress for a job and stops it when cancelled."""
+
+    _no_phase = nullcontext()
+
+    def __init__(self, job):
+        self.job = job
+        self.outer = DISABLED
+
+    def _check(self):
+        if self.job.cancel_requested.is_set():
+            raise Cancelled(self.job.label)
+
+    def phase(self, name):
+        self._check()
+        self.job.report(name)
+        return self._no_phase
+
+    def count(self, name, n=1):
+        self._check()
+
+    def level(self, name, k, n):
+        self._check()
+        if name == 'candidates':
+            self.job.report(f"level {k}: {n:,} candidates")
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class MiningJob:
+    """One function call submitted to a JobRunner."""
+
+    def __init__(self, label, function, args, kwargs):
+        self.label = label
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.cancel_requested = threading.Event()
+        self.messages = queue.SimpleQueue()
+        self.future = None
+
+    def _execute(self):
+        if self.cancel_requested.is_set():
+            raise Cancelled(self.label)
+        with recording(JobRecorder(self)):
+            return self.function(*self.args, **self.kwargs)
+
+    def report(self, message):
+        """Queues a progress message (called from the worker thread)."""
+        self.messages.put(message)
+
+    def poll(self):
+        """Drains the progress messages queued since the last poll, oldest first."""
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def cancel(self):
+        """Asks the job to stop. A job that has not started yet never runs."""
+        self.cancel_requested.set()
+        self.future.cancel()
+
+    @property
+    def cancelled(self):
+        return self.cancel_requested.is_set()
+
+    def done(self):
+        return self.future.done()
+
+    def result(self):
+        """The function's return value. Raises Cancelled, or the function's own exception."""
+        try:
+            return self.future.result()
+        except CancelledError:
+            raise Cancelled(self.label) from None
+
+
+class JobRunner:
+    """
+    Runs MiningJobs on background threads. With the default single worker,
+    jobs run one at a time in submission order, so they never mine over the
+    same caches at the same time.
+    """
+
+    def __init__(self, max_workers=1):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='mining')
+
+    def submit(self, label, function, *args, **kwargs):
+        """Starts function(*args, **kwargs) in the background and returns its MiningJob."""
+        job = MiningJob(label, function, args, kwargs)
+        job.future = self.executor.submit(job._execute)
+        return job
+
+    def shutdown(self, jobs=()):
+        """Cancels the given jobs and stops the worker threads without waiting for them."""
+        for job in jobs:
+            job.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,349 @@
+"""
+Out-of-core Eclat for transaction histories larger than RAM.
+
+outofcore_eclat() never holds the dataset, its vertical layout or the
+result in memory:
+
+  1. The baskets are read in row blocks (from a .tstore file with plain
+     reads, see mining.datafile.iter_row_chunks) to count item supports.
+  2. A second pass writes the TID-list of every frequent item into a spill
+     file, one sorted list after another.
+  3. If the bitsets of all frequent items fit in the memory budget after
+     all, they are read back and mined with the bitset Eclat. Otherwise
+     the first-level equivalence classes are mined one at a time, rarest
+     item first as in mining.parallel. A class whose bitsets fit in the
+     memory budget is built from the spill file and mined in memory with
+     the bitset Eclat. A larger class gets its own spill file holding the
+     TID-lists of its members, and is split into its subclasses the same
+     way, so every step works on a bounded amount of data.
+  4. Itemsets are handed to a `sink` in batches as they are found, e.g. an
+     ItemsetWriter that appends them to a JSON Lines file.
+
+TID-lists are always read in blocks of a bounded size and intersected with
+a block-wise merge. Peak memory therefore depends on `memory_budget` and
+on the number of items, but not on the number of baskets. The spill files
+live in a temporary directory (under `spill_dir` if given) that is removed
+when mining ends.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from mining import instrument
+from mining.bitset import eclat_bitset_recursive, popcount
+from mining.datafile import iter_row_chunks, read_header
+
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+MIN_MEMORY_BUDGET = 1024 * 1024
+
+# Rough bytes per basket item entry while the spill file is written (item, row, sort order)
+_BYTES_PER_ENTRY = 32
+# Rough bytes per itemset buffered before it is handed to the sink
+_BYTES_PER_ITEMSET = 256
+# Bitset copies alive at once while a class is mined in memory, relative to its own bitsets
+_DFS_COPIES = 8
+
+
+class TidFile:
+    """Sorted TID-lists stored one after another in a file, read back in blocks."""
+
+    def __init__(self, path, dtype):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.file = open(path, 'w+b')
+        self.starts = []    # position (in TIDs) of every list
+        self.counts = []    # length of every list
+        self.end = 0        # TIDs written so far
+
+    def reserve(self, counts):
+        """Lays out lists of the given lengths, to be filled with write_at()."""
+        counts = np.asarray(counts, dtype=np.int64)
+        self.starts = (np.cumsum(counts) - counts).tolist()
+        self.counts = counts.tolist()
+        self.end = int(counts.sum())
+        self.file.truncate(self.end * self.dtype.itemsize)
+
+    def write_at(self, position, tids):
+        self.file.seek(position * self.dtype.itemsize)
+        self.file.write(np.ascontiguousarray(tids, dtype=self.dtype).tobytes())
+
+    def append(self, blocks):
+        """Writes a list given as consecutive sorted blocks after the last one; returns its length."""
+        start = self.end
+        for tids in blocks:
+            self.write_at(self.end, tids)
+            self.end += len(tids)
+        self.starts.append(start)
+        self.counts.append(self.end - start)
+        return self.end - start
+
+    def drop_last(self):
+        """Forgets the last appended list; the next one overwrites it."""
+        self.end = self.starts.pop()
+        self.counts.pop()
+
+    def read(self, k, start=0, count=None):
+        """TIDs [start, start + count) of list k."""
+        if count is None:
+            count = self.counts[k] - start
+        self.file.seek((self.starts[k] + start) * self.dtype.itemsize)
+        return np.frombuffer(self.file.read(count * self.dtype.itemsize), dtype=self.dtype)
+
+    def reader(self, k):
+        return lambda start, count: self.read(k, start, count)
+
+    def close(self):
+        """Closes and deletes the file."""
+        self.file.close()
+        os.remove(self.path)
+
+
+class ItemsetWriter:
+    """
+    Sink for outofcore_eclat() that appends every itemset to a JSON Lines
+    file as {"items": [product names], "support": count}.
+    """
+
+    def __init__(self, filepath, item_names):
+        self.item_names = item_names
+        self.file = open(filepath, 'w', encoding='utf-8')
+
+    def __call__(self, itemsets):
+        names = self.item_names
+        for itemset, support in itemsets.items():
+            record = {'items': sorted(names[i] for i in itemset), 'support': support}
+            self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _ItemsetBuffer(dict):
+    """Collects itemsets (as the in-memory miners do) and passes them on in batches of `limit`."""
+
+    def __init__(self, emit, limit):
+        super().__init__()
+        self.emit = emit
+        self.limit = limit
+
+    def __setitem__(self, itemset, support):
+        super().__setitem__(itemset, support)
+        if len(self) >= self.limit:
+            self.flush()
+
+    def flush(self):
+        if self:
+            self.emit({tuple(sorted(itemset)): support for itemset, support in self.items()})
+            self.clear()
+
+
+def _row_chunks(source, rows_per_chunk):
+    """Yields (first_row, items, offsets) blocks of a .tstore path or a TransactionStore."""
+    if isinstance(source, (str, os.PathLike)):
+        yield from iter_row_chunks(source, rows_per_chunk)
+        return
+    items, offsets, _ = source.arrays()
+    for first_row in range(0, len(source), rows_per_chunk):
+        stop = min(first_row + rows_per_chunk, len(source))
+        yield (first_row, items[offsets[first_row]:offsets[stop]],
+               offsets[first_row:stop + 1] - offsets[first_row])
+
+
+def _intersect_blocks(read_a, n_a, read_b, n_b, block):
+    """
+    Yields the intersection of two sorted TID-lists in order, reading at
+    most `block` TIDs of each at a time. read_x(start, count) returns a
+    slice of a list.
+    """
+    start_a = start_b = 0
+    while start_a < n_a and start_b < n_b:
+        a = read_a(start_a, min(block, n_a - start_a))
+        b = read_b(start_b, min(block, n_b - start_b))
+        position = np.minimum(np.searchsorted(b, a), len(b) - 1)
+        common = a[b[position] == a]
+        if len(common):
+            yield common
+        # Everything up to the smaller of the two last TIDs is done on both sides
+        if a[-1] <= b[-1]:
+            start_a += len(a)
+            start_b += int(np.searchsorted(b, a[-1], side='right'))
+        else:
+            start_b += len(b)
+            start_a += int(np.searchsorted(a, b[-1], side='right'))
+
+
+def _spill_item_tid_lists(source, min_support_ratio, memory_budget, workdir):
+    """
+    Passes 1 and 2: counts item supports, then writes the TID-lists of the
+    frequent items to a TidFile in ascending support order.
+
+    Returns (tids, item_ids, N): list k of `tids` belongs to item item_ids[k].
+    """
+    if isinstance(source, (str, os.PathLike)):
+        _, _, N, n_entries, n_items, _ = read_header(source)
+    else:
+        N, n_items = len(source), source.n_items
+        n_entries = len(source.items)
+    entries_per_chunk = max(1, memory_budget // 4 // _BYTES_PER_ENTRY)
+    rows_per_chunk = max(1, entries_per_chunk * N // max(n_entries, 1))
+
+    supports = np.zeros(n_items, dtype=np.int64)
+    for _, items, _ in _row_chunks(source, rows_per_chunk):
+        supports += np.bincount(items, minlength=n_items)
+
+    min_support_count = min_support_ratio * N
+    frequent = np.flatnonzero(supports >= max(min_support_count, 1))
+    item_ids = frequent[np.lexsort((frequent, supports[frequent]))]
+    rank = np.full(n_items, -1, dtype=np.int64)
+    rank[item_ids] = np.arange(len(item_ids))
+
+    tids = TidFile(os.path.join(workdir, 'items.tid'), np.int32 if N < 2**31 else np.int64)
+    tids.reserve(supports[item_ids])
+    cursor = np.array(tids.starts, dtype=np.int64)
+    for first_row, items, offsets in _row_chunks(source, rows_per_chunk):
+        rows = np.repeat(np.arange(first_row, first_row + len(offsets) - 1, dtype=np.int64), np.diff(offsets))
+        lists = rank[items]
+        keep = lists >= 0
+        # A stable sort by list keeps the rows of each list ascending
+        order = np.argsort(lists[keep], kind='stable')
+        lists, rows = lists[keep][order], rows[keep][order]
+        present, first, counts = np.unique(lists, return_index=True, return_counts=True)
+        for k, at, n in zip(present.tolist(), first.tolist(), counts.tolist()):
+            tids.write_at(cursor[k], rows[at:at + n])
+            cursor[k] += n
+    return tids, item_ids.tolist(), N
+
+
+def _load_bitsets(tids, n_words, block):
+    """Reads every list of `tids` into packed bitsets over the rows, `block` TIDs at a time."""
+    bits = np.zeros((len(tids.counts), n_words), dtype=np.uint64)
+    for k, count in enumerate(tids.counts):
+        for start in range(0, count, block):
+            rows = tids.read(k, start, min(block, count - start)).astype(np.int64)
+            np.bitwise_or.at(bits[k], rows >> 6, np.left_shift(np.uint64(1), (rows & 63).astype(np.uint64)))
+    return bits
+
+
+def _mine_class(prefix, tids, class_items, min_support_count, memory_budget, block, workdir, found):
+    """
+    Mines every frequent itemset starting with prefix + (class_items[i],)
+    for each member i, given the TID-lists of the members in `tids`.
+    """
+    recorder = instrument.active()
+    n = len(class_items)
+    recorder.count('intersections', n * (n - 1) // 2)
+
+    for i in range(n):
+        support = tids.counts[i]
+        itemset = prefix + (class_items[i],)
+        n_words = (support + 63) // 64
+        # The TID-list, the bitsets of the later members, and room for the copies and
+        # popcount temporaries the DFS below them makes
+        in_memory = support * 8 + _DFS_COPIES * (n - i - 1) * n_words * 8 <= memory_budget
+
+        if in_memory:
+            tid_list = tids.read(i)
+            in_list = lambda start, count: tid_list[start:start + count]
+            child_items, child_bits = [], []
+            for j in range(i + 1, n):
+                # Bit p stands for the p-th TID of this class's list
+                mask = np.zeros(n_words * 64, dtype=bool)
+                n_common = 0
+                for common in _intersect_blocks(in_list, support, tids.reader(j), tids.counts[j], block):
+                    mask[np.searchsorted(tid_list, common)] = True
+                    n_common += len(common)
+                if n_common >= min_support_count:
+                    child_items.append(class_items[j])
+                    child_bits.append(np.packbits(mask, bitorder='little').view(np.uint64))
+            del tid_list
+            found[itemset] = support
+            if child_items:
+                bits = np.stack(child_bits)
+                del child_bits
+                eclat_bitset_recursive(itemset, np.array(child_items), bits, popcount(bits),
+                                       min_support_count, found)
+            continue
+
+        # Too large: spill the members' TID-lists within this class and split it again
+        found[itemset] = support
+        child = TidFile(os.path.join(workdir, f'class{len(itemset)}.tid'), tids.dtype)
+        try:
+            child_items = []
+            for j in range(i + 1, n):
+                blocks = _intersect_blocks(tids.reader(i), support, tids.reader(j), tids.counts[j], block)
+                if child.append(blocks) >= min_support_count:
+                    child_items.append(class_items[j])
+                else:
+                    child.drop_last()
+            recorder.count('spilled classes')
+            recorder.count('bytes spilled', child.end * child.dtype.itemsize)
+            if child_items:
+                _mine_class(itemset, child, child_items, min_support_count, memory_budget, block, workdir, found)
+        finally:
+            child.close()
+
+
+def outofcore_eclat(source, min_support_ratio=0.2, memory_budget=DEFAULT_MEMORY_BUDGET, spill_dir=None,
+                    sink=None):
+    """
+    Eclat over a .tstore file path (see mining.datafile) or a
+    TransactionStore, within about `memory_budget` bytes of working memory.
+    Only a path keeps the input itself out of memory: a store's columns
+    (even memory-mapped ones) stay resident once read.
+
+    Without a sink, returns (frequent_itemsets, N) like eclat(), which only
+    helps when the result fits in memory. Otherwise sink(itemsets) is called
+    with dicts of id tuples -> support as they are found, and the return
+    value is (number of itemsets, N).
+    """
+    if memory_budget < MIN_MEMORY_BUDGET:
+        raise ValueError(f"memory_budget must be at least {MIN_MEMORY_BUDGET} bytes, got {memory_budget!r}")
+    recorder = instrument.active()
+    # TIDs per block read from a spill file; two blocks and their temporaries stay well within the budget
+    block = max(1024, memory_budget // 128)
+
+    frequent_itemsets = {}
+    n_found = 0
+
+    def emit(itemsets):
+        nonlocal n_found
+        n_found += len(itemsets)
+        if sink is None:
+            frequent_itemsets.update(itemsets)
+        else:
+            sink(itemsets)
+
+    workdir = tempfile.mkdtemp(prefix='eclat-', dir=spill_dir)
+    tids = None
+    try:
+        with recorder.phase('encode'):
+            tids, item_ids, N = _spill_item_tid_lists(source, min_support_ratio, memory_budget, workdir)
+            recorder.count('bytes spilled', tids.end * tids.dtype.itemsize)
+        found = _ItemsetBuffer(emit, max(1, memory_budget // 4 // _BYTES_PER_ITEMSET))
+        with recorder.phase('search'):
+            n_words = (N + 63) // 64
+            if _DFS_COPIES * len(item_ids) * n_words * 8 <= memory_budget:
+                # Small enough after all: the bitsets of every frequent item fit in the budget
+                bits = _load_bitsets(tids, n_words, block)
+                eclat_bitset_recursive(tuple(), np.array(item_ids), bits, popcount(bits),
+                                       min_support_ratio * N, found)
+                del bits
+            else:
+                _mine_class(tuple(), tids, item_ids, min_support_ratio * N, memory_budget, block, workdir, found)
+            found.flush()
+    finally:
+        if tids is not None:
+            tids.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return (frequent_itemsets if sink is None else n_found), N
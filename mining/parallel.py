@@ -0,0 +1,325 @@
+"""
+Process-pool parallel mining.
+
+parallel_eclat() splits the Eclat search tree at its first level. The
+frequent items are ordered by ascending support, and the equivalence class
+of item i holds every frequent itemset whose first item in that order is
+i, so no two classes share any work. In item-id order the class of a very
+common item can hold most of the search space. Rare-items-first keeps
+every class small, because a class only extends its item with the more
+frequent items after it.
+
+Each worker process receives the TID-lists (or bitsets) of the frequent
+items once, through the pool initializer, and then mines whole classes by
+position. Classes are submitted largest-first by estimated cost, and each
+idle worker takes the next one, so one expensive class does not leave the
+other cores idle at the end of the run.
+
+Apriori is parallelised over the data instead of the search space:
+
+count_distribution_apriori()  splits the rows into one partition per worker.
+    Each worker process keeps its partition for the whole run, and every
+    level's candidates are counted on all partitions at once. The counts
+    are summed before the next level is generated.
+son_apriori()  is the two-pass SON / Partition algorithm. Pass 1 mines each
+    partition on its own at the same relative support. An itemset that is
+    frequent overall is frequent in at least one partition, so the union of
+    the local results is a complete candidate set. Pass 2 counts those
+    candidates over every partition. Only one partition per worker is in
+    memory at a time, so with a memory-mapped store (mining.datafile) the
+    data never has to fit in RAM.
+
+parallel_rules_gen() fans rule generation out by itemset.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from mining import instrument
+from mining.apriori import apriori, apriori_gen
+from mining.bitset import BitsetCounter, eclat_bitset_extend, encode_data_bitset, popcount
+from mining.eclat import declat_extend, eclat_recursive
+from mining.rules import RuleTable, rules_for_itemsets
+from mining.vertical import check_backend, encode_data_vertical
+
+# State shared by every task a worker runs, set once by the pool initializer
+_worker_state = {}
+
+
+def _init_eclat_worker(state):
+    _worker_state.clear()
+    _worker_state.update(state)
+
+
+def _mine_eclat_class(i):
+    """Mines the first-level class of frequent item number i. Runs in a worker process."""
+    state = _worker_state
+    min_support_count = state['min_support_count']
+    frequent_sets = {}
+
+    if state['mode'] == 'bitset':
+        eclat_bitset_extend(tuple(), state['items'], state['bits'], state['supports'], i,
+                            min_support_count, frequent_sets)
+    elif state['mode'] == 'declat':
+        declat_extend(tuple(), state['members'], i, False, min_support_count, frequent_sets,
+                      state['switch'])
+    else:
+        members = state['members']
+        item_A, support_A, tid_set_A = members[i]
+        frequent_sets[(item_A,)] = support_A
+
+        new_tid_set_map = {}
+        for item_B, _, tid_set_B in members[i + 1:]:
+            intersect_tid_set = tid_set_A.intersection(tid_set_B)
+            if len(intersect_tid_set) >= min_support_count:
+                new_tid_set_map[item_B] = intersect_tid_set
+
+        if new_tid_set_map:
+            eclat_recursive((item_A,), new_tid_set_map, state['N'], min_support_count, frequent_sets)
+
+    # Classes are enumerated in support order; keys are sorted by item id like eclat()
+    return {tuple(sorted(itemset)): support for itemset, support in frequent_sets.items()}
+
+
+def class_costs(supports):
+    """
+    Estimated work of each first-level class, given the supports of the
+    frequent items in class order: the class of item i intersects it with
+    every later item, and each intersection costs about min(s_i, s_j).
+    """
+    supports = np.asarray(supports, dtype=np.int64)
+    costs = np.zeros(len(supports), dtype=np.int64)
+    for i in range(len(supports) - 1):
+        costs[i] = np.minimum(supports[i + 1:], supports[i]).sum()
+    return costs
+
+
+def parallel_eclat(store, min_support_ratio=0.2, backend='tidset', diffsets='auto', workers=None):
+    """
+    Eclat with the first-level equivalence classes mined in a pool of
+    `workers` processes (default: one per CPU). Same arguments and result
+    as mining.eclat.eclat().
+    """
+    check_backend(backend)
+    if diffsets not in (True, False, 'auto'):
+        raise ValueError(f"diffsets must be True, False or 'auto', got {diffsets!r}")
+    workers = workers or os.cpu_count() or 1
+    recorder = instrument.active()
+
+    if backend == 'bitset':
+        if diffsets is True:
+            raise ValueError("Diffsets are only supported with the 'tidset' backend.")
+        min_support_count = min_support_ratio * len(store)
+        with recorder.phase('encode'):
+            item_ids, bits, N = encode_data_bitset(store, min_support_count)
+            supports = popcount(bits)
+        order = np.lexsort((item_ids, supports))
+        item_ids, bits, supports = item_ids[order], bits[order], supports[order]
+        state = {'mode': 'bitset', 'items': item_ids, 'bits': bits, 'supports': supports}
+    else:
+        with recorder.phase('encode'):
+            item_tid_sets, N = encode_data_vertical(store)
+        min_support_count = min_support_ratio * N
+        members = sorted((len(tids), item, tids) for item, tids in item_tid_sets.items()
+                         if len(tids) >= min_support_count)
+        members = [(item, support, tids) for support, item, tids in members]
+        supports = [support for _, support, _ in members]
+        state = {'mode': 'declat' if diffsets else 'eclat', 'members': members,
+                 'switch': 'auto' if diffsets == 'auto' else 'always'}
+
+    state['min_support_count'] = min_support_count
+    state['N'] = N
+    frequent_itemsets = {}
+    if not len(supports):
+        return frequent_itemsets, N
+
+    # Largest classes first; the pool hands the next class to whichever worker is free
+    costs = class_costs(supports)
+    order = sorted(range(len(costs)), key=lambda i: -costs[i])
+
+    with recorder.phase('search'), ProcessPoolExecutor(max_workers=min(workers, len(order)),
+                                                       initializer=_init_eclat_worker,
+                                                       initargs=(state,)) as pool:
+        for class_itemsets in pool.map(_mine_eclat_class, order):
+            frequent_itemsets.update(class_itemsets)
+
+    return frequent_itemsets, N
+
+
+# --DATA-PARALLEL APRIORI--
+
+def row_ranges(n_rows, parts):
+    """Splits rows [0, n_rows) into at most `parts` contiguous (start, stop) ranges of similar size."""
+    bounds = np.linspace(0, n_rows, max(1, min(parts, n_rows)) + 1).astype(np.int64).tolist()
+    return list(zip(bounds, bounds[1:]))
+
+
+def _init_partition_worker(partition):
+    _worker_state.clear()
+    _worker_state['partition'] = partition
+    _worker_state['counter'] = BitsetCounter(partition)
+
+
+def _partition_item_supports():
+    """Support of every item in this worker's partition. Runs in a worker process."""
+    partition = _worker_state['partition']
+    items, _, _ = partition.arrays()
+    return np.bincount(items, minlength=partition.n_items)
+
+
+def _partition_supports(candidates):
+    """Supports of a (C, k) candidate array in this worker's partition. Runs in a worker process."""
+    return _worker_state['counter'].supports(candidates)
+
+
+def count_distribution_apriori(store, min_support_ratio=0.2, workers=None):
+    """
+    Apriori with every level counted in parallel over one row partition per
+    worker process (count distribution). Returns (frequent_itemsets, N)
+    like mining.apriori.apriori().
+    """
+    N = len(store)
+    min_support_count = min_support_ratio * N
+    workers = workers or os.cpu_count() or 1
+    recorder = instrument.active()
+
+    # One single-process pool per partition, so each partition stays in its own worker
+    pools = [ProcessPoolExecutor(max_workers=1, initializer=_init_partition_worker,
+                                 initargs=(store.row_slice(start, stop),))
+             for start, stop in row_ranges(N, workers)]
+    try:
+        with recorder.phase('encode'):
+            futures = [pool.submit(_partition_item_supports) for pool in pools]
+            supports = sum(future.result() for future in futures)
+        frequent_itemsets = {(item,): support for item, support in enumerate(supports.tolist())
+                             if support and support >= min_support_count}
+
+        Lk_minus_1 = sorted(frequent_itemsets)
+        while Lk_minus_1:
+            with recorder.phase('candidate generation'):
+                Ck = apriori_gen(Lk_minus_1, recorder)
+            if not Ck:
+                break
+            recorder.level('candidates', len(Ck[0]), len(Ck))
+
+            # Count on every partition at once, then reduce
+            with recorder.phase('support counting'):
+                candidates = np.array(Ck, dtype=np.int64)
+                futures = [pool.submit(_partition_supports, candidates) for pool in pools]
+                supports = sum(future.result() for future in futures)
+
+            Lk_minus_1 = []
+            for candidate, support in zip(Ck, supports.tolist()):
+                if support >= min_support_count:
+                    Lk_minus_1.append(candidate)
+                    frequent_itemsets[candidate] = support
+    finally:
+        for pool in pools:
+            pool.shutdown()
+
+    return frequent_itemsets, N
+
+
+def _son_local_itemsets(partition, min_support_ratio):
+    """SON pass 1: itemsets frequent within one partition."""
+    return list(apriori(partition, min_support_ratio, backend='bitset')[0])
+
+
+def _son_count(partition, candidates):
+    """SON pass 2: supports of the global candidates within one partition."""
+    return BitsetCounter(partition).count(candidates)
+
+
+def _map_partitions(function, store, ranges, workers, *args):
+    """
+    Yields function(partition, *args) for each row range, in order. At most
+    `workers` partitions are materialised at a time; workers=1 runs in this
+    process.
+    """
+    if workers == 1:
+        for start, stop in ranges:
+            with instrument.suspended():
+                result = function(store.row_slice(start, stop), *args)
+            yield result
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for start, stop in ranges:
+            pending.append(pool.submit(function, store.row_slice(start, stop), *args))
+            if len(pending) >= workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def son_apriori(store, min_support_ratio=0.2, partitions=4, workers=1):
+    """
+    Two-pass SON / Partition Apriori over `partitions` row partitions,
+    processed by `workers` processes (1 = in this process, None = one per
+    CPU). Returns (frequent_itemsets, N) like mining.apriori.apriori().
+    """
+    N = len(store)
+    min_support_count = min_support_ratio * N
+    workers = workers or os.cpu_count() or 1
+    ranges = row_ranges(N, partitions)
+    recorder = instrument.active()
+
+    # Pass 1: the union of the locally frequent itemsets is the global candidate set
+    candidates = set()
+    with recorder.phase('local mining'):
+        for local_itemsets in _map_partitions(_son_local_itemsets, store, ranges, workers,
+                                              min_support_ratio):
+            candidates.update(local_itemsets)
+    candidates = sorted(candidates)
+    recorder.count('global candidates', len(candidates))
+
+    # Pass 2: exact global supports of the candidates
+    supports = dict.fromkeys(candidates, 0)
+    if candidates:
+        with recorder.phase('support counting'):
+            for partition_counts in _map_partitions(_son_count, store, ranges, workers, candidates):
+                for itemset, support in partition_counts.items():
+                    supports[itemset] += support
+
+    frequent_itemsets = {itemset: support for itemset, support in supports.items()
+                         if support >= min_support_count}
+    return frequent_itemsets, N
+
+
+# --PARALLEL RULE GENERATION--
+
+def _init_rules_worker(frequent_itemsets, N, min_confidence):
+    _worker_state.clear()
+    _worker_state.update(frequent_itemsets=frequent_itemsets, N=N, min_confidence=min_confidence)
+
+
+def _rules_for_chunk(itemsets):
+    """Rules of one chunk of itemsets. Runs in a worker process."""
+    state = _worker_state
+    return rules_for_itemsets(itemsets, state['frequent_itemsets'], state['N'], state['min_confidence'])
+
+
+def parallel_rules_gen(frequent_itemsets, N, min_confidence, workers=None):
+    """
+    apriori_rules_gen() with the itemsets split across `workers` processes
+    (None = one per CPU). Every worker gets the support table once. The
+    itemsets are dealt out largest first, since an itemset of size k can
+    produce up to 2^k - 2 rules. Returns one RuleTable.
+    """
+    workers = workers or os.cpu_count() or 1
+    itemsets = sorted((itemset for itemset in frequent_itemsets if len(itemset) >= 2),
+                      key=len, reverse=True)
+    if workers == 1 or not itemsets:
+        return rules_for_itemsets(itemsets, frequent_itemsets, N, min_confidence)
+
+    # Round-robin over size-sorted itemsets gives every chunk a similar mix of sizes
+    n_chunks = workers * 4
+    chunks = [chunk for chunk in (itemsets[i::n_chunks] for i in range(n_chunks)) if chunk]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_rules_worker,
+                             initargs=(frequent_itemsets, N, min_confidence)) as pool:
+        return RuleTable.concat(list(pool.map(_rules_for_chunk, chunks)))
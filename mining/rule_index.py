@@ -0,0 +1,139 @@
+"""
+Precomputed index of association rules by antecedent item.
+
+For every item that appears in some rule's antecedent the index keeps one
+entry per consequent product: the rule with the highest confidence that
+links the two. Each item's entries are sorted once, by confidence and then
+by lift (both descending), so a recommendation lookup is a dict hit plus a
+slice instead of a full re-mine and a scan over every rule.
+
+BasketRuleIndex answers the same question for a whole basket. It keys the
+rules by their complete antecedent, and a query collects the rules whose
+antecedent is contained in the basket.
+"""
+
+from itertools import combinations
+from math import comb
+
+from mining.engine import run_algorithm
+
+
+class RuleIndex:
+    """Rules grouped by antecedent item, best consequents first."""
+
+    def __init__(self, rules, top_k=None, source=None):
+        best = {}  # item -> {consequent product -> best rule}
+        for rule in rules:
+            for item in rule['antecedents']:
+                per_item = best.setdefault(item, {})
+                for product in rule['consequents']:
+                    current = per_item.get(product)
+                    if current is None or rule['confidence'] > current['confidence']:
+                        per_item[product] = rule
+
+        self.by_item = {}
+        for item, per_item in best.items():
+            ranked = sorted(per_item.items(),
+                            key=lambda entry: (-entry[1]['confidence'], -entry[1]['lift']))
+            self.by_item[item] = ranked[:top_k]
+
+        self.n_rules = len(rules)
+        self.top_k = top_k
+        self.source = source    # (store version, support, confidence, algorithm) it was mined from
+
+    @classmethod
+    def build(cls, store, min_support_ratio, min_confidence, algorithm='FP-Growth', top_k=None,
+              cache=None):
+        """
+        Mines `store` with the given algorithm and thresholds and indexes the
+        rules. With a ResultCache the rules are taken from it when possible.
+        """
+        runner = cache.run if cache is not None else run_algorithm
+        _, rules, _ = runner(algorithm, store, min_support_ratio, min_confidence)
+        return cls(rules or [], top_k=top_k,
+                   source=(store.version, min_support_ratio, min_confidence, algorithm))
+
+    def is_current(self, store, min_support_ratio, min_confidence, algorithm='FP-Growth'):
+        """True if the index was built from this exact store state and thresholds."""
+        return self.source == (store.version, min_support_ratio, min_confidence, algorithm)
+
+    def lookup(self, item, k=None):
+        """Returns up to k (consequent product, rule) pairs for `item`, best first."""
+        return self.by_item.get(item, [])[:k]
+
+    @property
+    def antecedent_items(self):
+        """Sorted items that appear in the antecedent of at least one rule."""
+        return sorted(self.by_item)
+
+
+class BasketRuleIndex:
+    """
+    Rules grouped by their whole antecedent, best consequents first, for
+    recommending products to a basket of several items.
+    """
+
+    def __init__(self, rules, top_k=None, source=None):
+        best = {}  # antecedent tuple -> {consequent product -> best rule}
+        for rule in rules:
+            antecedent = tuple(sorted(rule['antecedents']))
+            per_antecedent = best.setdefault(antecedent, {})
+            for product in rule['consequents']:
+                current = per_antecedent.get(product)
+                if current is None or (rule['confidence'], rule['lift']) > (current['confidence'], current['lift']):
+                    per_antecedent[product] = rule
+
+        # antecedent -> [(product, confidence, lift, support)], best first
+        self.by_antecedent = {}
+        for antecedent, per_antecedent in best.items():
+            ranked = sorted(((product, rule['confidence'], rule['lift'], rule['support'])
+                             for product, rule in per_antecedent.items()),
+                            key=lambda entry: (-entry[1], -entry[2]))
+            self.by_antecedent[antecedent] = ranked[:top_k]
+
+        self.antecedent_sets = [(frozenset(antecedent), antecedent) for antecedent in self.by_antecedent]
+        self.antecedent_items = {item for antecedent in self.by_antecedent for item in antecedent}
+        self.max_antecedent = max(map(len, self.by_antecedent), default=0)
+        self.n_rules = len(rules)
+        self.top_k = top_k
+        self.source = source
+
+    @classmethod
+    def build(cls, store, min_support_ratio, min_confidence, algorithm='FP-Growth', top_k=None,
+              cache=None):
+        """Mines `store` and indexes the rules, like RuleIndex.build()."""
+        runner = cache.run if cache is not None else run_algorithm
+        _, rules, _ = runner(algorithm, store, min_support_ratio, min_confidence)
+        return cls(rules or [], top_k=top_k,
+                   source=(store.version, min_support_ratio, min_confidence, algorithm))
+
+    def matching_antecedents(self, basket):
+        """The indexed antecedents contained in `basket` (a set of items)."""
+        items = sorted(basket & self.antecedent_items)
+        max_size = min(self.max_antecedent, len(items))
+        # Look every subset of the basket up, unless that is more work than testing every antecedent
+        if sum(comb(len(items), size) for size in range(1, max_size + 1)) <= len(self.antecedent_sets):
+            return [subset for size in range(1, max_size + 1) for subset in combinations(items, size)
+                    if subset in self.by_antecedent]
+        return [antecedent for antecedent_set, antecedent in self.antecedent_sets if antecedent_set <= basket]
+
+    def recommend(self, basket, k=None):
+        """
+        Up to k products to suggest for `basket`, best first. Each product is
+        scored by the strongest rule whose antecedent the basket contains.
+        Products already in the basket are skipped.
+        """
+        basket = set(basket)
+        best = {}  # product -> (confidence, lift, support, antecedent)
+        for antecedent in self.matching_antecedents(basket):
+            for product, confidence, lift, support in self.by_antecedent[antecedent]:
+                if product in basket:
+                    continue
+                current = best.get(product)
+                if current is None or (confidence, lift) > current[:2]:
+                    best[product] = (confidence, lift, support, antecedent)
+
+        ranked = sorted(best.items(), key=lambda entry: (-entry[1][0], -entry[1][1], entry[0]))[:k]
+        return [{'product': product, 'confidence': confidence, 'lift': lift, 'support': support,
+                 'antecedents': list(antecedent)}
+                for product, (confidence, lift, support, antecedent) in ranked]
@@ -0,0 +1,172 @@
+"""
+Association rule generation from frequent itemsets.
+
+Rules are generated level-wise per itemset (Agrawal & Srikant's
+ap-genrules). Confidence is anti-monotone in the consequent: moving an item
+from the antecedent to the consequent can only lower it. So consequents
+start as single items, and only the (m+1)-item consequents whose m-item
+subsets all passed are generated (apriori_gen) and tested. Antecedent
+subsets whose rules cannot pass are never enumerated.
+
+The rules are kept in a RuleTable: NumPy columns plus a bitmask per rule
+saying which items of its source itemset form the consequent, instead of
+a dict and two tuples per rule. Iterating a RuleTable still yields the
+familiar rule dicts.
+"""
+
+import itertools
+from array import array
+from math import comb
+
+import numpy as np
+
+from mining import instrument
+from mining.apriori import apriori_gen
+
+
+class RuleTable:
+    """
+    Columnar table of association rules. Row r is the rule whose itemset is
+    itemsets[itemset_index[r]], split into consequent (the positions set in
+    consequent_mask[r]) and antecedent (the other positions).
+    """
+
+    def __init__(self, itemsets, itemset_index, consequent_mask, support, confidence, lift):
+        self.itemsets = itemsets
+        self.itemset_index = itemset_index
+        self.consequent_mask = consequent_mask
+        self.support = support
+        self.confidence = confidence
+        self.lift = lift
+
+    @classmethod
+    def empty(cls):
+        return cls([], np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.uint64),
+                   np.zeros(0), np.zeros(0), np.zeros(0))
+
+    @classmethod
+    def concat(cls, tables):
+        """Joins several tables (e.g. from worker processes) into one."""
+        tables = [table for table in tables if len(table)]
+        if not tables:
+            return cls.empty()
+        itemsets, offsets = [], []
+        for table in tables:
+            offsets.append(len(itemsets))
+            itemsets.extend(table.itemsets)
+        return cls(
+            itemsets,
+            np.concatenate([table.itemset_index + offset for table, offset in zip(tables, offsets)]),
+            np.concatenate([table.consequent_mask for table in tables]),
+            np.concatenate([table.support for table in tables]),
+            np.concatenate([table.confidence for table in tables]),
+            np.concatenate([table.lift for table in tables]),
+        )
+
+    def __len__(self):
+        return len(self.itemset_index)
+
+    def __getitem__(self, row):
+        return self.rule(row)
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self.rule(row)
+
+    def rule(self, row):
+        """Row `row` as a dict with antecedents, consequents, support, confidence and lift."""
+        itemset = self.itemsets[self.itemset_index[row]]
+        mask = int(self.consequent_mask[row])
+        antecedent = tuple(sorted(item for position, item in enumerate(itemset) if not mask >> position & 1))
+        consequent = tuple(sorted(item for position, item in enumerate(itemset) if mask >> position & 1))
+        return {
+            'antecedents': antecedent,
+            'consequents': consequent,
+            'support': float(self.support[row]),
+            'confidence': float(self.confidence[row]),
+            'lift': float(self.lift[row]),
+        }
+
+    def decode(self, names):
+        """Same rules with item ids replaced by names[id]; only the itemsets are rewritten."""
+        itemsets = [tuple(names[item] for item in itemset) for itemset in self.itemsets]
+        return RuleTable(itemsets, self.itemset_index, self.consequent_mask,
+                         self.support, self.confidence, self.lift)
+
+
+def rules_for_itemsets(itemsets, frequent_itemsets, N, min_confidence):
+    """
+    Generates the rules of the given itemsets (sorted tuples, each at least
+    two items) with support counts looked up in frequent_itemsets, which
+    must contain every subset of them. Returns a RuleTable.
+    """
+    sources = []
+    itemset_index = array('i')
+    consequent_mask = array('Q')
+    supports, confidences, lifts = array('d'), array('d'), array('d')
+    tested = 0
+
+    for itemset in itemsets:
+        support_itemset = frequent_itemsets[itemset] / N
+        position = {item: i for i, item in enumerate(itemset)}
+        source = len(sources)
+        has_rules = False
+
+        # Level-wise over the consequent size; only passing consequents are extended
+        consequents = [(item,) for item in itemset]
+        while consequents and len(consequents[0]) < len(itemset):
+            passed = []
+            tested += len(consequents)
+            for consequent in consequents:
+                antecedent = tuple(item for item in itemset if item not in consequent)
+
+                # Retrieve support for the antecedent (A)
+                support_A_count = frequent_itemsets.get(antecedent)
+                if support_A_count is None:
+                    continue
+
+                # Calculate Confidence: Confidence(A -> B) = Support(A U B) / Support(A)
+                confidence = support_itemset / (support_A_count / N)
+                if confidence < min_confidence:
+                    continue
+                passed.append(consequent)
+
+                # Lift(A -> B) = Confidence(A -> B) / Support(B)
+                support_B_count = frequent_itemsets.get(consequent)
+                support_B = support_B_count / N if support_B_count else 0
+                lift = confidence / support_B if support_B > 0 else 0
+
+                mask = 0
+                for item in consequent:
+                    mask |= 1 << position[item]
+                itemset_index.append(source)
+                consequent_mask.append(mask)
+                supports.append(support_itemset)
+                confidences.append(confidence)
+                lifts.append(lift)
+                has_rules = True
+
+            if len(passed) == len(consequents) and len(passed) == comb(len(itemset), len(passed[0])):
+                # Nothing was pruned: every (m+1)-subset is a candidate
+                consequents = list(itertools.combinations(itemset, len(passed[0]) + 1))
+            else:
+                consequents = apriori_gen(passed)
+
+        if has_rules:
+            sources.append(itemset)
+
+    instrument.active().count('rules tested', tested)
+    return RuleTable(
+        sources,
+        np.frombuffer(itemset_index, dtype=np.int32),
+        np.frombuffer(consequent_mask, dtype=np.uint64),
+        np.frombuffer(supports, dtype=np.float64),
+        np.frombuffer(confidences, dtype=np.float64),
+        np.frombuffer(lifts, dtype=np.float64),
+    )
+
+
+def apriori_rules_gen(frequent_itemsets, N, min_confidence):
+    """Generates association rules from frequent itemsets based on minimum confidence."""
+    itemsets = [itemset for itemset in frequent_itemsets if len(itemset) >= 2]
+    return rules_for_itemsets(itemsets, frequent_itemsets, N, min_confidence)
@@ -0,0 +1,163 @@
+"""
+Approximate mining on a random sample of the transactions, for quickly
+trying out thresholds on large stores.
+
+The sample size follows from the Chernoff-Hoeffding bound. If n baskets
+are drawn uniformly at random, the support an itemset has in the sample
+is within epsilon of its support in the whole store with probability at
+least 1 - delta whenever
+
+    n >= ln(2 / delta) / (2 * epsilon ** 2)
+
+e.g. 18,445 baskets for epsilon = 0.01 and delta = 0.05, however large
+the store is. The bound holds for each itemset on its own. For all of m
+itemsets at once, pass n_itemsets=m (union bound).
+
+Without verification the sample is mined at the requested support, and
+its supports are scaled up to the full store. They are estimates, each
+within +/- 'Support Error' of the true support (at the stated confidence
+level). Itemsets close to the threshold may be missing or spurious.
+
+verify=True follows Toivonen (1996):
+  - the sample is mined at the support lowered by epsilon, so a truly
+    frequent itemset is very unlikely to be missed;
+  - one pass over the full store then counts those itemsets exactly,
+    plus their negative border (the infrequent itemsets whose subsets
+    are all frequent);
+  - itemsets below the real threshold are dropped.
+If no border itemset turns out frequent, the result is exactly what a
+full run would return. Otherwise the itemsets found are still exact, but
+some of their supersets may be missing; this is reported as 'Possibly
+Incomplete', and mining the full data again gives the complete result.
+"""
+
+import math
+
+import numpy as np
+
+from mining import instrument
+from mining.apriori import apriori, apriori_gen
+from mining.bitset import BitsetCounter
+from mining.eclat import eclat
+from mining.fpgrowth import fp_growth
+from mining.store import TransactionStore
+
+# Algorithms the sample can be mined with
+SAMPLE_MINERS = {
+    'Apriori': apriori,
+    'Eclat': eclat,
+    'FP-Growth': fp_growth,
+}
+
+# Rows counted at a time by the verification pass (bitsets of one chunk at a time)
+VERIFY_CHUNK_ROWS = 1_000_000
+
+
+def sample_size(epsilon, delta, n_itemsets=1):
+    """Baskets needed to estimate n_itemsets supports within epsilon with probability 1 - delta."""
+    if not 0 < epsilon < 1 or not 0 < delta < 1:
+        raise ValueError(f"epsilon and delta must be between 0 and 1, got {epsilon!r} and {delta!r}")
+    return math.ceil(math.log(2 * n_itemsets / delta) / (2 * epsilon ** 2))
+
+
+def support_error(n, delta, n_itemsets=1):
+    """The epsilon a sample of n baskets guarantees with probability 1 - delta (inverse of sample_size)."""
+    if n < 1:
+        raise ValueError(f"The sample must have at least one basket, got {n!r}")
+    return math.sqrt(math.log(2 * n_itemsets / delta) / (2 * n))
+
+
+def sample_rows(store, n, seed=0):
+    """
+    A new store of n rows of `store` drawn uniformly without replacement,
+    kept in their original order. Item ids are unchanged.
+    """
+    items, offsets, ids = store.arrays()
+    rows = np.sort(np.random.default_rng(seed).choice(len(store), n, replace=False))
+
+    lengths = offsets[rows + 1] - offsets[rows]
+    sample_offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(lengths, out=sample_offsets[1:])
+    # Position of every sampled item in the full items column
+    positions = np.repeat(offsets[rows] - sample_offsets[:-1], lengths) + np.arange(sample_offsets[-1])
+
+    sample = TransactionStore.from_columns(store.item_names, items[positions], sample_offsets, ids[rows])
+    del items, offsets, ids
+    return sample
+
+
+def negative_border(frequent_itemsets, n_items):
+    """
+    Itemsets that are not in frequent_itemsets (a downward-closed dict of
+    sorted id tuples) although every subset of them is: the single items
+    that are missing, and each level's Apriori candidates that are missing.
+    """
+    border = [(item,) for item in range(n_items) if (item,) not in frequent_itemsets]
+    by_size = {}
+    for itemset in frequent_itemsets:
+        by_size.setdefault(len(itemset), []).append(itemset)
+    for itemsets in by_size.values():
+        border.extend(candidate for candidate in apriori_gen(sorted(itemsets))
+                      if candidate not in frequent_itemsets)
+    return border
+
+
+def count_supports(store, itemsets, chunk_rows=VERIFY_CHUNK_ROWS):
+    """Exact supports of the itemsets in `store`, counted chunk_rows rows at a time."""
+    totals = dict.fromkeys(itemsets, 0)
+    if not totals:
+        return totals
+    for start in range(0, len(store), chunk_rows):
+        counter = BitsetCounter(store.row_slice(start, min(start + chunk_rows, len(store))))
+        for itemset, count in counter.count(list(totals)).items():
+            totals[itemset] += count
+    return totals
+
+
+def approximate_itemsets(store, min_support_ratio=0.2, epsilon=0.01, delta=0.05, verify=False,
+                         sample_algorithm='FP-Growth', seed=0, report=None):
+    """
+    Frequent itemsets of `store` estimated from a random sample (see the
+    module docstring). Returns (frequent_itemsets, N) like the exact
+    algorithms, with supports scaled to all N baskets (exact ones if
+    verify=True). `report`, a dict, receives the sample size, the support
+    error and, with verify, the outcome of the verification pass.
+    """
+    try:
+        find_itemsets = SAMPLE_MINERS[sample_algorithm]
+    except KeyError:
+        raise ValueError(f"Unknown sample_algorithm '{sample_algorithm}'. "
+                         f"Choose from: {', '.join(SAMPLE_MINERS)}")
+    recorder = instrument.active()
+    report = report if report is not None else {}
+    N = len(store)
+    if not N:
+        raise ValueError("Cannot sample an empty store.")
+    n = min(sample_size(epsilon, delta), N)
+    error = support_error(n, delta) if n < N else 0.0
+
+    with recorder.phase('sample'):
+        sample = sample_rows(store, n, seed) if n < N else store
+    # Lowered threshold for verification, but never below one basket of the sample
+    threshold = max(min_support_ratio - error, 1 / n) if verify else min_support_ratio
+    sample_itemsets, _ = find_itemsets(sample, threshold)
+
+    report.update({'Sample Size': n, 'Support Error': round(error, 6), 'Confidence Level': 1 - delta,
+                   'Verified': verify})
+    if not verify:
+        return {itemset: round(count * N / n) for itemset, count in sample_itemsets.items()}, N
+
+    with recorder.phase('verify'):
+        border = negative_border(sample_itemsets, store.n_items)
+        recorder.count('border itemsets', len(border))
+        supports = count_supports(store, list(sample_itemsets) + border)
+
+    min_support_count = min_support_ratio * N
+    frequent_itemsets = {itemset: supports[itemset] for itemset in sample_itemsets
+                         if supports[itemset] >= min_support_count}
+    missed = {itemset: supports[itemset] for itemset in border if supports[itemset] >= min_support_count}
+    # Border itemsets that are frequent after all are exact too; only their supersets may be missing
+    frequent_itemsets.update(missed)
+    report.update({'Sample Itemsets': len(sample_itemsets), 'Border Itemsets': len(border),
+                   'Possibly Incomplete': bool(missed)})
+    return frequent_itemsets, N
@@ -0,0 +1,185 @@
+"""
+Local recommendation service for POS terminals.
+
+RecommendationServer answers basket queries from a BasketRuleIndex that is
+built once, before the server starts accepting connections. The protocol
+is newline-delimited JSON over TCP (asyncio streams). Each request is one
+line and gets one response line, in order, so a client can pipeline
+requests on one connection:
+
+    {"id": 1, "basket": ["milk", "bread"], "k": 3}
+        -> {"id": 1, "version": 1, "recommendations": [{"product": ..., "confidence": ...}, ...]}
+    {"id": 2, "baskets": [["milk"], ["eggs", "butter"]]}
+        -> {"id": 2, "version": 1, "results": [[...], [...]]}
+    {"op": "reload"}   rebuilds the index from its source and swaps it in
+    {"op": "info"}     rule count, index version and requests served
+
+A batch is answered from a single index, even if a reload finishes while
+it is being processed. A reload builds the new index on a worker thread
+while the old one keeps serving, then replaces it with one assignment.
+There is no downtime, and no request sees a half-built index. Item names
+are matched case-insensitively, like the rest of the app. A request line
+longer than max_request_bytes is skipped and answered with
+{"error": "request too large"}.
+"""
+
+import asyncio
+import json
+import time
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Longest request line (and, for query(), response line) in bytes
+MAX_REQUEST_BYTES = 16 * 2**20
+
+
+class RecommendationServer:
+    """
+    Serves recommendations from the index returned by load_index(), a
+    callable that is run again (on a worker thread) for every reload.
+    """
+
+    def __init__(self, load_index, host=DEFAULT_HOST, port=DEFAULT_PORT, default_k=5,
+                 max_request_bytes=MAX_REQUEST_BYTES):
+        self.load_index = load_index
+        self.host = host
+        self.port = port
+        self.default_k = default_k
+        self.max_request_bytes = max_request_bytes
+        self.index = None
+        self.version = 0
+        self.loaded_at = None
+        self.requests = 0
+        self.server = None
+        self._reload_lock = None
+        self._connections = {}  # handler task -> its stream writer
+
+    def swap(self, index):
+        """Replaces the index used for new requests; requests already running keep the old one."""
+        self.index = index
+        self.version += 1
+        self.loaded_at = time.time()
+
+    async def reload(self):
+        """Builds a new index off the event loop and swaps it in. Concurrent reloads run one at a time."""
+        async with self._reload_lock:
+            index = await asyncio.get_running_loop().run_in_executor(None, self.load_index)
+            self.swap(index)
+        return self.version
+
+    def handle_request(self, request):
+        """The response to one decoded (non-reload) request."""
+        index, version = self.index, self.version
+        response = {'id': request.get('id'), 'version': version}
+        op = request.get('op', 'recommend')
+
+        if op == 'info':
+            response.update(rules=index.n_rules, antecedents=len(index.by_antecedent),
+                            loaded_at=self.loaded_at, requests=self.requests)
+            return response
+        if op != 'recommend':
+            response['error'] = f"Unknown op {op!r}."
+            return response
+
+        k = request.get('k', self.default_k)
+        if 'baskets' in request:
+            response['results'] = [index.recommend(_normalize(basket), k) for basket in request['baskets']]
+        elif 'basket' in request:
+            response['recommendations'] = index.recommend(_normalize(request['basket']), k)
+        else:
+            response['error'] = "A request needs 'basket' or 'baskets'."
+        return response
+
+    async def _handle_connection(self, reader, writer):
+        self._connections[asyncio.current_task()] = writer
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b'\n')
+                except asyncio.IncompleteReadError as e:
+                    line = e.partial  # a last request without a newline, or b'' at EOF
+                except asyncio.LimitOverrunError:
+                    await _skip_line(reader)
+                    line = None
+                if line == b'':
+                    break
+                request = None
+                try:
+                    if line is None:
+                        response = {'id': None, 'error': "request too large"}
+                    else:
+                        request = json.loads(line)
+                        if not isinstance(request, dict):
+                            raise ValueError("a request must be a JSON object")
+                        if request.get('op') == 'reload':
+                            response = {'id': request.get('id'), 'version': await self.reload()}
+                        else:
+                            response = self.handle_request(request)
+                except Exception as e:
+                    # A bad request (or a failed reload) only fails that request
+                    response = {'id': request.get('id') if isinstance(request, dict) else None,
+                                'error': f"{type(e).__name__}: {e}"}
+                self.requests += 1
+                writer.write(json.dumps(response).encode('utf-8') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            del self._connections[asyncio.current_task()]
+            writer.close()
+
+    async def start(self):
+        """Builds the first index, then starts listening. Returns the asyncio server."""
+        self._reload_lock = asyncio.Lock()
+        self.swap(await asyncio.get_running_loop().run_in_executor(None, self.load_index))
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port,
+                                                 limit=self.max_request_bytes)
+        # With port=0 the OS picks a free port
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        try:
+            await self.server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """Stops listening, closes open connections and waits for their handlers to finish."""
+        self.server.close()
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self.server.wait_closed()
+
+
+async def _skip_line(reader):
+    """Discards the rest of an over-long line, up to and including its newline."""
+    while True:
+        try:
+            await reader.readuntil(b'\n')
+            return
+        except asyncio.LimitOverrunError as e:
+            await reader.readexactly(e.consumed)
+        except asyncio.IncompleteReadError:
+            return
+
+
+def _normalize(basket):
+    if isinstance(basket, str) or not isinstance(basket, (list, tuple)):
+        raise ValueError("a basket must be a list of product names")
+    return {str(item).strip().lower() for item in basket}
+
+
+async def query(request, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Sends one request on a new connection and returns the decoded response."""
+    reader, writer = await asyncio.open_connection(host, port, limit=MAX_REQUEST_BYTES)
+    try:
+        writer.write(json.dumps(request).encode('utf-8') + b'\n')
+        await writer.drain()
+        return json.loads(await reader.readline())
+    finally:
+        writer.close()
+        await writer.wait_closed()
@@ -0,0 +1,190 @@
+"""
+Compact, columnar transaction dataset.
+
+Items are dictionary-encoded to small ints and baskets are kept CSR-style:
+one flat `items` array holding every basket back to back (each basket
+sorted by item id), an `offsets` array where basket `row` spans
+items[offsets[row]:offsets[row + 1]], and an `ids` column with the
+transaction id of every row. That is a few bytes per item instead of a
+dict plus a list of strings per transaction.
+
+Every store carries a `version` that changes whenever baskets are added,
+so caches built from it (e.g. a RuleIndex) can tell when they are stale.
+Versions come from one global counter and are never reused, even across
+stores.
+"""
+
+import itertools
+from array import array
+
+import numpy as np
+
+_versions = itertools.count(1)
+
+
+class TransactionStore:
+    """Integer-encoded, array-backed store of transactions."""
+
+    def __init__(self):
+        self.item_names = []        # item id -> product name
+        self.item_index = {}        # product name -> item id
+        self.items = array('i')     # flat item ids of every basket
+        self.offsets = array('q', [0])
+        self.ids = array('q')       # transaction id per row
+        self.version = next(_versions)
+
+    @classmethod
+    def from_columns(cls, item_names, items, offsets, ids):
+        """
+        Wraps existing columns, e.g. read-only NumPy memory maps from
+        mining.datafile.open_store(). They are copied into growable arrays
+        the first time a basket is appended.
+        """
+        store = cls()
+        store.item_names = list(item_names)
+        store.item_index = {name: item_id for item_id, name in enumerate(store.item_names)}
+        store.items, store.offsets, store.ids = items, offsets, ids
+        return store
+
+    @classmethod
+    def from_baskets(cls, baskets, first_id=1):
+        """Builds a store from an iterable of item-name lists, numbering ids from first_id."""
+        store = cls()
+        for transaction_id, basket in enumerate(baskets, start=first_id):
+            store.append(transaction_id, basket)
+        return store
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def n_items(self):
+        """Number of distinct items in the dictionary."""
+        return len(self.item_names)
+
+    def encode_item(self, name):
+        """Returns the id of an item name, adding it to the dictionary if new."""
+        item_id = self.item_index.get(name)
+        if item_id is None:
+            item_id = len(self.item_names)
+            self.item_index[name] = item_id
+            self.item_names.append(name)
+        return item_id
+
+    def append(self, transaction_id, item_names):
+        """Adds one basket of item names (duplicates are dropped). Returns its row index."""
+        encoded = sorted({self.encode_item(name) for name in item_names})
+        return self.append_encoded(transaction_id, encoded)
+
+    def _ensure_growable(self):
+        """Copies NumPy-backed (e.g. memory-mapped) columns into array.array before appending."""
+        if not isinstance(self.items, array):
+            self.items = array('i', np.asarray(self.items, dtype=np.int32).tobytes())
+            self.offsets = array('q', np.asarray(self.offsets, dtype=np.int64).tobytes())
+            self.ids = array('q', np.asarray(self.ids, dtype=np.int64).tobytes())
+
+    def append_encoded(self, transaction_id, item_ids):
+        """Adds one basket that is already encoded, de-duplicated and sorted."""
+        self._ensure_growable()
+        self.items.extend(item_ids)
+        self.offsets.append(len(self.items))
+        self.ids.append(transaction_id)
+        self.version = next(_versions)
+        return len(self.ids) - 1
+
+    def extend_encoded(self, transaction_ids, items, counts):
+        """
+        Bulk-appends baskets given as NumPy arrays: the transaction id of each
+        basket, the flat item ids of all baskets (each basket sorted) and the
+        item count of each basket.
+        """
+        self._ensure_growable()
+        base = self.offsets[-1]
+        self.items.frombytes(np.ascontiguousarray(items, dtype=np.int32).tobytes())
+        self.offsets.frombytes((base + np.cumsum(counts, dtype=np.int64)).tobytes())
+        self.ids.frombytes(np.ascontiguousarray(transaction_ids, dtype=np.int64).tobytes())
+        self.version = next(_versions)
+
+    def truncate(self, n_rows, n_items=None):
+        """
+        Drops every row from n_rows on, and with n_items every dictionary
+        entry from that item id on, e.g. to undo a failed import.
+        """
+        if n_rows < len(self):
+            self._ensure_growable()
+            del self.items[self.offsets[n_rows]:]
+            del self.offsets[n_rows + 1:]
+            del self.ids[n_rows:]
+        if n_items is not None:
+            for name in self.item_names[n_items:]:
+                del self.item_index[name]
+            del self.item_names[n_items:]
+        self.version = next(_versions)
+
+    def row_slice(self, start, stop):
+        """A new store holding copies of rows [start, stop); item ids are unchanged."""
+        items, offsets, ids = self.arrays()
+        sliced = TransactionStore.from_columns(
+            self.item_names,
+            items[offsets[start]:offsets[stop]].copy(),
+            offsets[start:stop + 1] - offsets[start],
+            ids[start:stop].copy(),
+        )
+        del items, offsets, ids
+        return sliced
+
+    def row_items(self, row):
+        """Encoded item ids of the basket at `row`."""
+        basket = self.items[self.offsets[row]:self.offsets[row + 1]]
+        return basket if isinstance(basket, array) else basket.tolist()
+
+    def row_count(self, row):
+        """Number of unique items in the basket at `row`."""
+        return self.offsets[row + 1] - self.offsets[row]
+
+    def rows_containing(self, item_ids):
+        """
+        Rows (ascending) whose basket holds at least one of item_ids, found
+        with one vectorized pass over the items column.
+        """
+        items, offsets, _ = self.arrays()
+        positions = np.flatnonzero(np.isin(items, np.asarray(item_ids, dtype=np.int32)))
+        # Each item occurs at most once per basket, so only several ids can repeat a row
+        rows = np.searchsorted(offsets, positions, side='right') - 1
+        del items, offsets
+        return np.unique(rows) if len(item_ids) > 1 else rows
+
+    def decode(self, item_ids):
+        """Maps item ids back to product names."""
+        names = self.item_names
+        return [names[i] for i in item_ids]
+
+    def transaction(self, row):
+        """Returns (transaction_id, item_names) for the basket at `row`."""
+        return int(self.ids[row]), self.decode(self.row_items(row))
+
+    def iter_baskets(self, start=0, stop=None):
+        """Yields the encoded basket of every row in [start, stop)."""
+        items, offsets = self.items, self.offsets
+        stop = len(self) if stop is None else stop
+        if isinstance(items, array):
+            for row in range(start, stop):
+                yield items[offsets[row]:offsets[row + 1]]
+        else:
+            # NumPy-backed columns: yield plain int lists, cheaper to hash and compare
+            bounds = np.asarray(offsets[start:stop + 1]).tolist()
+            for begin, end in zip(bounds, bounds[1:]):
+                yield items[begin:end].tolist()
+
+    def arrays(self):
+        """
+        Zero-copy NumPy views of the (items, offsets, ids) columns. Drop the
+        views before appending again: array.array cannot grow while exported.
+        """
+        return (np.frombuffer(self.items, dtype=np.int32),
+                np.frombuffer(self.offsets, dtype=np.int64),
+                np.frombuffer(self.ids, dtype=np.int64))
+
+    def nbytes(self):
+        """Approximate memory held by the array columns."""
+        return sum(np.asarray(a).itemsize * len(a) for a in (self.items, self.offsets, self.ids))
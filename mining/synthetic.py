@@ -0,0 +1,108 @@
+"""
+Synthetic market-basket datasets in the style of the IBM Quest generator
+(Agrawal & Srikant, 1994), for benchmarks and scaling tests.
+
+A pool of potentially frequent itemsets ("patterns") is drawn first:
+  - pattern sizes are Poisson around avg_pattern_length;
+  - each pattern reuses an exponentially distributed fraction (mean
+    `correlation`) of the previous pattern's items, so patterns overlap;
+  - pattern weights are exponential, so a few patterns dominate;
+  - every pattern has a corruption level around `corruption`.
+
+Each transaction has a Poisson(avg_length) size and is filled with
+patterns picked by weight. Items are dropped from a pattern while a
+uniform draw stays below its corruption level. A pattern that does not
+fit is added anyway half of the time; otherwise it starts the next
+transaction.
+
+`skew` sets how popular items are when patterns are drawn. 0 picks items
+uniformly, as the original generator does. With larger values, item j is
+picked with weight 1 / (j + 1) ** skew.
+
+The same arguments and seed always give the same store.
+"""
+
+import numpy as np
+
+from mining.store import TransactionStore
+
+
+def quest_store(n_transactions=10000, avg_length=10, n_items=1000, avg_pattern_length=4,
+                n_patterns=None, skew=0.0, correlation=0.5, corruption=0.5, seed=0):
+    """
+    Generates a TransactionStore of n_transactions baskets over items named
+    'item0' ... 'item{n_items - 1}'. n_patterns defaults to 2 * n_items.
+    Datasets are usually named after their parameters: T10I4D100K has
+    avg_length=10, avg_pattern_length=4 and n_transactions=100_000.
+    """
+    if n_transactions < 1 or n_items < 1 or avg_length <= 0 or avg_pattern_length <= 0:
+        raise ValueError("n_transactions, n_items, avg_length and avg_pattern_length must be positive.")
+    rng = np.random.default_rng(seed)
+    n_patterns = n_patterns or 2 * n_items
+
+    item_weights = 1.0 / np.arange(1, n_items + 1) ** skew
+    item_weights /= item_weights.sum()
+
+    # --POTENTIALLY FREQUENT ITEMSETS--
+    patterns = []
+    previous = np.zeros(0, dtype=np.int64)
+    sizes = np.clip(rng.poisson(avg_pattern_length, n_patterns), 1, n_items)
+    for size in sizes.tolist():
+        n_reused = min(int(round(rng.exponential(correlation) * size)), size, len(previous))
+        pattern = set(rng.choice(previous, n_reused, replace=False).tolist()) if n_reused else set()
+        while len(pattern) < size:
+            pattern.update(rng.choice(n_items, size - len(pattern), p=item_weights).tolist())
+        patterns.append(list(pattern))
+        previous = np.fromiter(pattern, dtype=np.int64)
+
+    pattern_weights = rng.exponential(1.0, n_patterns)
+    pattern_weights /= pattern_weights.sum()
+    corruption_levels = np.clip(rng.normal(corruption, 0.1, n_patterns), 0.0, 1.0)
+
+    # --TRANSACTIONS--
+    lengths = np.maximum(rng.poisson(avg_length, n_transactions), 1)
+    # Patterns are drawn in blocks; a transaction needs about avg_length / avg_pattern_length of them
+    block = max(1024, int(n_transactions * avg_length / avg_pattern_length) // 8)
+    draws, position = rng.choice(n_patterns, block, p=pattern_weights), 0
+
+    items, counts = [], []
+    carried = None
+    for length in lengths.tolist():
+        basket = set()
+        while len(basket) < length:
+            if carried is not None:
+                pattern, carried = carried, None
+            else:
+                if position == block:
+                    draws, position = rng.choice(n_patterns, block, p=pattern_weights), 0
+                chosen = int(draws[position])
+                position += 1
+
+                # Corrupt the pattern: drop items while a uniform draw stays below its level
+                pattern = patterns[chosen]
+                level = corruption_levels[chosen]
+                n_dropped = 0
+                while n_dropped < len(pattern) and rng.random() < level:
+                    n_dropped += 1
+                if n_dropped:
+                    pattern = rng.permutation(pattern)[n_dropped:].tolist()
+                if not pattern:
+                    continue
+
+            if len(basket) + len(pattern) > length and basket and rng.random() < 0.5:
+                carried = pattern
+                break
+            basket.update(pattern)
+
+        basket = sorted(basket)
+        items.extend(basket)
+        counts.append(len(basket))
+
+    # Only items that occur go into the dictionary; ids stay in item-number order
+    items = np.asarray(items, dtype=np.int64)
+    used, items = np.unique(items, return_inverse=True)
+    store = TransactionStore()
+    for j in used.tolist():
+        store.encode_item(f'item{j}')
+    store.extend_encoded(np.arange(1, n_transactions + 1), items, counts)
+    return store
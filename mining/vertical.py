@@ -0,0 +1,24 @@
+from collections import defaultdict
+
+# Vertical representations the algorithms can count supports with:
+#   'tidset' - a Python set of transaction rows per item
+#   'bitset' - packed uint64 bit arrays per item (see mining.bitset)
+BACKENDS = ('tidset', 'bitset')
+
+
+def check_backend(backend):
+    """Raises ValueError for an unknown vertical backend name."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}'. Choose from: {', '.join(BACKENDS)}")
+
+
+def encode_data_vertical(store):
+    """Converts a TransactionStore into vertical TID-set format (item id -> set of rows)."""
+
+    item_transaction_map = defaultdict(set)
+
+    for t_id, items in enumerate(store.iter_baskets()):
+        for item in items:
+            item_transaction_map[item].add(t_id)
+
+    return item_transaction_map, len(store)